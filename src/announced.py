@@ -0,0 +1,106 @@
+import heapq
+import itertools
+from collections.abc import MutableMapping
+from datetime import datetime, timedelta, timezone
+
+# How long after the event an announced key is kept (matches the old cleanup buffer)
+EXPIRY_BUFFER = timedelta(days=1)
+
+
+def _parse_event_date(date_str):
+    parsed = datetime.fromisoformat(date_str)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+class AnnouncedIndex(MutableMapping):
+    """Announced notification keys with their event dates, ordered by expiry.
+
+    Behaves like the plain ``{key: event_date_iso}`` dict it replaces, but parses
+    each date once on insert and keeps a min-heap of expiry timestamps
+    (``event_date + 1 day``), so pop_expired() only touches entries that are due.
+
+    Legacy entries without a date expire ``legacy_ttl`` after they were recorded
+    (``recorded_at`` from the store, otherwise the time they were inserted);
+    with ``legacy_ttl=None`` they are kept forever. Entries with an unparsable
+    date expire immediately.
+    """
+
+    def __init__(self, entries=None, clock=None, legacy_ttl=None, recorded_at=None):
+        self._clock = clock
+        self.legacy_ttl = legacy_ttl
+        self._entries = {}  # key -> (date_str, parsed_date or None, expiry_ts or None)
+        self._heap = []  # (expiry_ts, seq, key); stale entries are skipped on pop
+        self._seq = itertools.count()
+        recorded_at = recorded_at or {}
+        for key, date_str in (entries or {}).items():
+            self._insert(key, date_str, recorded_at.get(key))
+
+    def _now(self):
+        return self._clock.now() if self._clock else datetime.now(timezone.utc)
+
+    def _insert(self, key, date_str, recorded_at=None):
+        parsed = None
+        if date_str is None:
+            if self.legacy_ttl is None:
+                expiry_ts = None
+            else:
+                expiry_ts = ((recorded_at or self._now()) + self.legacy_ttl).timestamp()
+        else:
+            try:
+                parsed = _parse_event_date(date_str)
+                expiry_ts = (parsed + EXPIRY_BUFFER).timestamp()
+            except (TypeError, ValueError):
+                expiry_ts = float("-inf")
+        self._entries[key] = (date_str, parsed, expiry_ts)
+        if expiry_ts is not None:
+            heapq.heappush(self._heap, (expiry_ts, next(self._seq), key))
+
+    def __getitem__(self, key):
+        return self._entries[key][0]
+
+    def __setitem__(self, key, date_str):
+        self._insert(key, date_str)
+
+    def __delitem__(self, key):
+        del self._entries[key]
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def event_date(self, key):
+        """Parsed event date of ``key`` (None for legacy entries)."""
+        return self._entries[key][1]
+
+    def next_expiry(self):
+        self._drop_stale()
+        if not self._heap:
+            return None
+        expiry_ts = self._heap[0][0]
+        return None if expiry_ts == float("-inf") else datetime.fromtimestamp(expiry_ts, timezone.utc)
+
+    def pop_expired(self, now):
+        """Removes and returns [(key, date_str), ...] for entries that expired before ``now``."""
+        now_ts = now.timestamp()
+        expired = []
+        while True:
+            self._drop_stale()
+            if not self._heap or self._heap[0][0] >= now_ts:
+                return expired
+            _, _, key = heapq.heappop(self._heap)
+            expired.append((key, self._entries.pop(key)[0]))
+
+    def _drop_stale(self):
+        while self._heap:
+            expiry_ts, _, key = self._heap[0]
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] == expiry_ts:
+                return
+            heapq.heappop(self._heap)
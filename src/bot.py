@@ -1,32 +1,16 @@
 import discord
 from discord.ext import commands
 import logging
+import time
 
-import os
-from logging.handlers import RotatingFileHandler
-
-# Create logs directory if it doesn't exist
-if not os.path.exists("data/logs"):
-    os.makedirs("data/logs")
+from src.config import LOG_QUEUE_SIZE, LOG_JSON, COMMAND_SYNC_FORCE, COMMAND_SYNC_GUILD_ID
+from src.logging_setup import setup_logging, shutdown_logging
+from src.command_sync import sync_commands
+from src import startup_profile
 
 # Configure ROOT logger to capture ALL logs from all modules
-# This ensures CPTChecker, EventBridge, and all other loggers write to the log file
-root_logger = logging.getLogger()
-root_logger.setLevel(logging.INFO)
-
-# File Handler - writes to data/logs/bot.log
-file_handler = RotatingFileHandler("data/logs/bot.log", maxBytes=5*1024*1024, backupCount=5)
-file_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-file_handler.setFormatter(file_formatter)
-file_handler.setLevel(logging.INFO)
-root_logger.addHandler(file_handler)
-
-# Console Handler - writes to stdout/stderr
-console_handler = logging.StreamHandler()
-console_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-console_handler.setFormatter(console_formatter)
-console_handler.setLevel(logging.INFO)
-root_logger.addHandler(console_handler)
+# Records go through a bounded queue; a background thread writes data/logs/bot.log and the console
+setup_logging("data/logs", level=logging.INFO, queue_size=LOG_QUEUE_SIZE, json_format=LOG_JSON)
 
 # Get logger for this module
 logger = logging.getLogger("DiscordBot")
@@ -34,8 +18,8 @@ logger = logging.getLogger("DiscordBot")
 # Log that logging is configured
 logger.info("=" * 80)
 logger.info("Logging system initialized")
-logger.info(f"Log file: data/logs/bot.log")
-logger.info(f"Log level: INFO")
+logger.info("Log file: data/logs/bot.log")
+logger.info("Log level: INFO (%s format)", "JSON" if LOG_JSON else "text")
 logger.info("=" * 80)
 
 class EventManagerBot(commands.Bot):
@@ -45,28 +29,43 @@ class EventManagerBot(commands.Bot):
         super().__init__(command_prefix="!", intents=intents, help_command=None)
 
     async def setup_hook(self):
+        setup_start = time.perf_counter()
         logger.info("Starting bot setup...")
         
         # Load cogs here
         logger.info("Loading cogs...")
-        await self.load_extension("src.cogs.cpt_checker")
+        with startup_profile.phase("load_extension:src.cogs.cpt_checker"):
+            await self.load_extension("src.cogs.cpt_checker")
         logger.info("✓ Loaded cpt_checker")
-        await self.load_extension("src.cogs.event_bridge")
+        with startup_profile.phase("load_extension:src.cogs.event_bridge"):
+            await self.load_extension("src.cogs.event_bridge")
         logger.info("✓ Loaded event_bridge")
         
         # Sync commands with Discord (global sync might take an hour, instant for guild)
-        # For development, syncing universally is fine but be aware of rate limits.
+        # Skipped when the command tree hash matches the last sync (data/command_sync.json),
+        # unless COMMAND_SYNC_FORCE is set; COMMAND_SYNC_GUILD_ID syncs to one guild for development.
         try:
-            logger.info("Syncing commands with Discord...")
-            synced = await self.tree.sync()
-            logger.info(f"✓ Synced {len(synced)} command(s)")
+            with startup_profile.phase("sync_commands"):
+                synced = await sync_commands(self.tree, guild_id=COMMAND_SYNC_GUILD_ID, force=COMMAND_SYNC_FORCE)
+            if synced is not None:
+                logger.info("✓ Synced %s command(s)", synced)
         except Exception as e:
-            logger.error(f"✗ Failed to sync commands: {e}")
-            
-        logger.info("Bot setup complete. All cogs loaded.")
+            logger.error("✗ Failed to sync commands: %s", e)
+
+        startup_profile.mark("setup_hook")
+        logger.info("Bot setup complete. All cogs loaded in %.0fms.", (time.perf_counter() - setup_start) * 1000)
+
+    async def close(self):
+        await super().close()
+        # Flush queued log records before the process exits
+        shutdown_logging()
 
     async def on_ready(self):
         logger.info("=" * 80)
-        logger.info(f"Bot is ready! Logged in as {self.user} (ID: {self.user.id})")
-        logger.info(f"Connected to {len(self.guilds)} guild(s)")
+        logger.info("Bot is ready! Logged in as %s (ID: %s)", self.user, self.user.id)
+        logger.info("Connected to %d guild(s)", len(self.guilds))
         logger.info("=" * 80)
+        # on_ready fires again after reconnects; the profile is only written the first time
+        profile_path = startup_profile.finish()
+        if profile_path:
+            logger.info("Startup profile written to %s", profile_path)
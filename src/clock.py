@@ -0,0 +1,42 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+
+class SystemClock:
+    """Wall clock used in production: timezone-aware UTC now() and asyncio sleep."""
+
+    def now(self):
+        return datetime.now(timezone.utc)
+
+    async def sleep(self, seconds):
+        await asyncio.sleep(seconds)
+
+
+class ManualClock:
+    """Clock that only moves when advance() is called.
+
+    Lets tests (and the mock API) fast-forward time instead of patching datetime:
+    sleep() returns once the clock has been advanced past the requested deadline.
+    """
+
+    def __init__(self, now=None):
+        self._now = now or datetime.now(timezone.utc)
+        self._tick = asyncio.Event()
+
+    def now(self):
+        return self._now
+
+    async def sleep(self, seconds):
+        deadline = self._now + timedelta(seconds=seconds)
+        while self._now < deadline:
+            tick = self._tick
+            await tick.wait()
+
+    def set(self, now):
+        self._now = now
+        # Wake every sleeper; each re-checks its deadline against the new time
+        self._tick.set()
+        self._tick = asyncio.Event()
+
+    def advance(self, **delta):
+        self.set(self._now + timedelta(**delta))
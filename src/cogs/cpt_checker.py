@@ -2,244 +2,1009 @@ from discord.ext import commands, tasks
 import discord
 import logging
 import aiohttp
+import asyncio
+import json
 import os
+import time
 from datetime import datetime, timedelta, timezone
 from src.config import TRAINING_API_URL, CPT_CHANNEL_ID, TRAINING_API_TOKEN, FIR_PREFIXES, CPT_ROLE_ID
+from src.config import (TRAINING_API_CONN_LIMIT, TRAINING_API_KEEPALIVE, TRAINING_API_DNS_TTL,
+                        TRAINING_API_TIMEOUT, TRAINING_API_CONNECT_TIMEOUT, CPT_STREAM_PARSE, CPT_REFRESH_HOURS,
+                        CPT_STORE_BACKEND, CPT_STORE_PATH, CPT_LEGACY_TTL_DAYS,
+                        OUTBOX_MAX_AGE_HOURS, OUTBOX_REPLAY_CONCURRENCY)
+from src.config import CPT_SEND_CONCURRENCY, DISCORD_CHANNEL_RATE_LIMIT, DISCORD_CHANNEL_RATE_PERIOD
+from src.config import CPT_DIGEST_MODE, CPT_DIGEST_MAX_MESSAGES, CPT_EDIT_IN_PLACE, CPT_INCREMENTAL
+from src.config import (TRAINING_API_MAX_PAGES, USE_MOCK_API, MOCK_API_SCENARIO, MOCK_API_CPTS, MOCK_API_PAGE_SIZE,
+                        MOCK_API_DELAY, MOCK_API_SEED, MOCK_API_TIME_SHIFT_HOURS, MOCK_API_PORT, MOCK_STATE_DIR)
+from src.config import (PAYLOAD_LOG_MAX_BYTES, PAYLOAD_LOG_EVERY, PAYLOAD_LOG_ON_CHANGE, PAYLOAD_LOG_GZIP,
+                        PAYLOAD_LOG_KEEP)
+from src.json_stream import iter_json_array
+from src.fir_matcher import FIRMatcher
+from src.clock import SystemClock
+from src.scheduler import NotificationScheduler
+from src.storage import DEFAULT_STORE_PATHS, create_announced_store, write_json_atomic
+from src.announced import AnnouncedIndex
+from src.outbox import Outbox, find_delivered_message
+from src.metrics import (ANNOUNCED_ENTRIES, CPTS_TOTAL, DISCORD_SEND_SECONDS, FEED_CHANGES_TOTAL, FETCH_BYTES,
+                         FETCH_SECONDS)
+from src.log_context import new_correlation_id
+from src.payload_log import PayloadLogger
+from src.rate_limit import RateLimiter
+from src.message_packing import pack_messages
+from src.cpt_messages import CPT_MESSAGES_FILE, CPTMessageStore, embed_hash
+from src.cpt_diff import CPTDiffer
+from src.cpt_record import CPT
 
 logger = logging.getLogger("CPTChecker")
 
 # Constants
 MAX_ERROR_RESPONSE_LENGTH = 500  # Maximum characters to log from error responses
+STREAM_CHUNK_SIZE = 64 * 1024  # Bytes read per chunk in streaming mode
+MAX_EMBED_DESCRIPTION_LENGTH = 4096  # Discord limit for an embed description
+CPT_SNAPSHOT_FILE = "data/cpt_snapshot.json"  # Last API response body + validators (ETag / Last-Modified)
+CPT_OUTBOX_FILE = "data/outbox/cpt.jsonl"  # Journal of notifications that were intended but not confirmed sent
+
+
+def _build_trace_config():
+    """Builds an aiohttp TraceConfig that records a latency breakdown per request.
+
+    The timings are written into the dict passed as ``trace_request_ctx``:
+    ``dns`` and ``connect`` are only present when a new connection had to be
+    opened (``connect`` covers TCP and, for HTTPS, the TLS handshake, because
+    aiohttp does not report the handshake separately). ``first_byte`` is the
+    time from request start until the response headers arrived.
+    """
+    async def on_request_start(session, ctx, params):
+        ctx.trace_request_ctx["_start"] = time.perf_counter()
+        ctx.trace_request_ctx["reused_connection"] = False
+
+    async def on_dns_resolvehost_start(session, ctx, params):
+        ctx.trace_request_ctx["_dns_start"] = time.perf_counter()
+
+    async def on_dns_resolvehost_end(session, ctx, params):
+        ctx.trace_request_ctx["dns"] = time.perf_counter() - ctx.trace_request_ctx["_dns_start"]
+
+    async def on_connection_create_start(session, ctx, params):
+        ctx.trace_request_ctx["_connect_start"] = time.perf_counter()
+
+    async def on_connection_create_end(session, ctx, params):
+        ctx.trace_request_ctx["connect"] = time.perf_counter() - ctx.trace_request_ctx["_connect_start"]
+
+    async def on_connection_reuseconn(session, ctx, params):
+        ctx.trace_request_ctx["reused_connection"] = True
+
+    async def on_request_end(session, ctx, params):
+        ctx.trace_request_ctx["first_byte"] = time.perf_counter() - ctx.trace_request_ctx["_start"]
+
+    trace_config = aiohttp.TraceConfig(trace_config_ctx_factory=_TraceContext)
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_dns_resolvehost_start.append(on_dns_resolvehost_start)
+    trace_config.on_dns_resolvehost_end.append(on_dns_resolvehost_end)
+    trace_config.on_connection_create_start.append(on_connection_create_start)
+    trace_config.on_connection_create_end.append(on_connection_create_end)
+    trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+    trace_config.on_request_end.append(on_request_end)
+    return trace_config
+
+
+def next_page_url(data):
+    """URL of the next page of a paginated API response (``links.next`` or ``next_page_url``), else None."""
+    if not isinstance(data, dict):
+        return None
+    links = data.get("links")
+    if isinstance(links, dict) and links.get("next"):
+        return links["next"]
+    return data.get("next_page_url")
+
+
+def notification_windows(cpt_date):
+    """Returns {notification_type: (start, end)} for a CPT date.
+
+    Mirrors the rules in process_cpt: "3day" while the CPT is 2-4 calendar days
+    away (UTC day boundaries), "today" during the last 12 hours before it.
+    """
+    cpt_day = datetime.combine(cpt_date.date(), datetime.min.time(), tzinfo=timezone.utc)
+    return {
+        "3day": (cpt_day - timedelta(days=4), cpt_day - timedelta(days=1)),
+        "today": (cpt_date - timedelta(hours=12), cpt_date),
+    }
+
+
+def state_path(path):
+    """Where the state file ``path`` (normally under data/) lives for this run.
+
+    With USE_MOCK_API it is moved under MOCK_STATE_DIR, so the synthetic feed,
+    whose ids overlap real ones, never reads or writes the production state.
+    """
+    if not USE_MOCK_API:
+        return path
+    relative = os.path.relpath(path, "data")
+    if relative.startswith(os.pardir) or os.path.isabs(relative):
+        relative = os.path.basename(path)
+    return os.path.join(MOCK_STATE_DIR, relative)
+
+
+def notification_times(cpt):
+    """Times at which process_cpt's result for an unchanged CPT can change.
+
+    These are the window starts from notification_windows plus the midnights
+    inside the "3day" window, where its title ("in N Tagen") changes.
+    """
+    if cpt.date is None:
+        return ()
+    windows = notification_windows(cpt.date)
+    start = windows["3day"][0]
+    return [start, start + timedelta(days=1), start + timedelta(days=2), windows["today"][0]]
+
+
+class _TraceContext:
+    """Trace context that tolerates requests made without a ``trace_request_ctx``."""
+    def __init__(self, trace_request_ctx=None):
+        self.trace_request_ctx = trace_request_ctx if trace_request_ctx is not None else {}
+
 
 class CPTChecker(commands.Cog):
-    def __init__(self, bot):
+    def __init__(self, bot, clock=None):
         self.bot = bot
+        self.clock = clock or SystemClock()
+        # Exact fire times of upcoming "3day"/"today" notifications, keyed like cpts_announced
+        self.scheduler = NotificationScheduler(self.clock)
+        self.scheduler_task = None
+        # Dateless entries from the old list format expire after this TTL (None = keep forever)
+        self.legacy_ttl = timedelta(days=CPT_LEGACY_TTL_DAYS) if CPT_LEGACY_TTL_DAYS > 0 else None
         self.cpts_announced = {} # Keep track of announced IDs to avoid duplicates in a single run: {key: expiry_date_iso}
+        self._store = None  # Opened on first use (see store), not while the bot is starting up
+        ANNOUNCED_ENTRIES.set_function(lambda: len(self.cpts_announced))
+        self.outbox = Outbox(state_path(CPT_OUTBOX_FILE), max_age=OUTBOX_MAX_AGE_HOURS * 3600)
+        # Spaces out sends to stay under Discord's per-channel message limit
+        self.channel_limiter = RateLimiter(DISCORD_CHANNEL_RATE_LIMIT, DISCORD_CHANNEL_RATE_PERIOD)
+        # Posted message per CPT, edited in place on later changes (CPT_EDIT_IN_PLACE)
+        self.cpt_messages = CPTMessageStore(state_path(CPT_MESSAGES_FILE))
+        # Previous full feed by CPT id, so a refresh only evaluates what changed (CPT_INCREMENTAL)
+        self.cpt_diff = CPTDiffer(due_times=notification_times)
+        self.stream_complete = False  # Whether the last stream_cpts() read the whole response
+        self.evaluation_lock = asyncio.Lock()  # One process_cpts/process_feed run at a time
         self.cpt_check_loop.start()
         self.fir_prefixes = FIR_PREFIXES
+        self.fir_matcher = FIRMatcher(self.fir_prefixes)
+        self.api_url = TRAINING_API_URL
+        self.stream_parse = CPT_STREAM_PARSE
+        self.session = None  # Shared aiohttp.ClientSession, created in cog_load
+        self.mock_api = None  # Local MockTrainingAPI when USE_MOCK_API is set, started in cog_load
+        self.last_fetch_timings = {}  # Latency breakdown of the last fetch (seconds)
+        # Raw API bodies go to data/logs/payloads/ (sampled, capped); the main log only gets size + hash
+        self.payload_log = PayloadLogger("cpts", directory=state_path("data/logs/payloads"),
+                                         max_bytes=PAYLOAD_LOG_MAX_BYTES, every=PAYLOAD_LOG_EVERY,
+                                         on_change=PAYLOAD_LOG_ON_CHANGE, compress=PAYLOAD_LOG_GZIP,
+                                         keep=PAYLOAD_LOG_KEEP)
+        # Conditional GET state: validators and parsed body of the last 200 response.
+        # The snapshot file is read on first access of cached_cpts, not in cog_load.
+        self.snapshot_path = state_path(CPT_SNAPSHOT_FILE)
+        self.api_etag = None
+        self.api_last_modified = None
+        self._cached_cpts = None
+        self._snapshot_loaded = False
 
-    def cog_unload(self):
+    async def cog_load(self):
+        self.session = self.create_session()
+        if USE_MOCK_API:
+            await self.start_mock_api()
+
+    async def cog_unload(self):
         self.cpt_check_loop.cancel()
+        if self.scheduler_task:
+            self.scheduler_task.cancel()
+            self.scheduler_task = None
+        if self._store is not None:
+            self._store.close()
+        await self.outbox.flush()
+        if self.mock_api:
+            await self.mock_api.stop()
+            self.mock_api = None
+        if self.session and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+    async def start_mock_api(self):
+        """Serves the CPT feed from a local MockTrainingAPI and points api_url at it."""
+        from src.mock_api import MockTrainingAPI, parse_script
+
+        self.mock_api = MockTrainingAPI(parse_script(MOCK_API_SCENARIO), count=MOCK_API_CPTS, seed=MOCK_API_SEED,
+                                        page_size=MOCK_API_PAGE_SIZE, delay=MOCK_API_DELAY,
+                                        time_shift=timedelta(hours=MOCK_API_TIME_SHIFT_HOURS), clock=self.clock)
+        self.api_url = await self.mock_api.start(port=MOCK_API_PORT)
+        logger.warning("USE_MOCK_API is set: CPTs come from the mock training API at %s, not %s",
+                       self.api_url, TRAINING_API_URL)
+
+    def create_session(self):
+        """Creates the long-lived, pooled HTTP session used for the training API."""
+        connector = aiohttp.TCPConnector(
+            limit=TRAINING_API_CONN_LIMIT,
+            keepalive_timeout=TRAINING_API_KEEPALIVE,
+            ttl_dns_cache=TRAINING_API_DNS_TTL,
+        )
+        timeout = aiohttp.ClientTimeout(total=TRAINING_API_TIMEOUT, connect=TRAINING_API_CONNECT_TIMEOUT)
+        return aiohttp.ClientSession(connector=connector, timeout=timeout, trace_configs=[_build_trace_config()])
+
+    def get_session(self):
+        # Fallback for callers that run before cog_load (e.g. tests) or after the session was closed
+        if self.session is None or self.session.closed:
+            self.session = self.create_session()
+        return self.session
 
     async def fetch_cpts(self):
         """Fetches CPTs from API."""
 
+        timings = {}
+        result = "error"
+        start = time.perf_counter()
         try:
-            headers = {}
-            if TRAINING_API_TOKEN:
-                headers["Authorization"] = f"Bearer {TRAINING_API_TOKEN}"
-                logger.info(f"Using Bearer token authentication (token length: {len(TRAINING_API_TOKEN)})")
-            else:
-                logger.warning("No TRAINING_API_TOKEN configured - API may reject request")
-            
-            logger.info(f"Fetching CPTs from {TRAINING_API_URL}")
-            async with aiohttp.ClientSession() as session:
-                async with session.get(TRAINING_API_URL, headers=headers) as response:
+            headers = self.build_request_headers()
+            page_headers = dict(headers)
+
+            # Only send validators if we still have the body they describe
+            if self.cached_cpts is not None:
+                if self.api_etag:
+                    headers["If-None-Match"] = self.api_etag
+                if self.api_last_modified:
+                    headers["If-Modified-Since"] = self.api_last_modified
+
+            logger.info("Fetching CPTs from %s", self.api_url)
+            session = self.get_session()
+            async with session.get(self.api_url, headers=headers, trace_request_ctx=timings) as response:
+                if response.status == 304 and self.cached_cpts is not None:
+                    result = "not_modified"
+                    logger.info("CPTs not modified since last fetch, reusing %d cached CPTs", len(self.cached_cpts),
+                                extra={"status": response.status, "cpt_count": len(self.cached_cpts)})
+                    return self.cached_cpts
+                if response.status != 200:
+                    logger.error("Failed to fetch CPTs: HTTP %s", response.status, extra={"status": response.status})
+                    response_text = await response.text()
+                    logger.error("Response body: %s", response_text[:MAX_ERROR_RESPONSE_LENGTH])
+                    return self.fallback_to_snapshot()
+                body_start = time.perf_counter()
+                body = await response.read()
+                data = await response.json()
+                timings["body"] = time.perf_counter() - body_start
+                await self.payload_log.record(body)
+                cpts = data.get("data", [])
+                size = len(body)
+
+            # Paginated responses (Laravel style) link to the next page; validators only apply to the first
+            next_url = next_page_url(data)
+            pages = 1
+            while next_url and pages < TRAINING_API_MAX_PAGES:
+                async with session.get(next_url, headers=page_headers) as page_response:
+                    if page_response.status != 200:
+                        logger.error("Failed to fetch CPT page %d: HTTP %s", pages + 1, page_response.status,
+                                     extra={"status": page_response.status})
+                        return self.fallback_to_snapshot()
+                    page_body = await page_response.read()
+                    page = await page_response.json()
+                size += len(page_body)
+                cpts.extend(page.get("data", []))
+                next_url = next_page_url(page)
+                pages += 1
+            if next_url:
+                logger.warning("Stopped after %d pages (TRAINING_API_MAX_PAGES), CPT list is incomplete", pages)
+
+            FETCH_BYTES.set(size)
+            result = "ok"
+            logger.info("Fetched %d CPTs from API (%d page(s))", len(cpts), pages,
+                        extra={"status": response.status, "cpt_count": len(cpts)})
+            if cpts:
+                logger.debug("Sample CPT data: %s", cpts[0])
+            self.update_snapshot(cpts, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+            return self.cached_cpts
+        except Exception as e:
+            logger.error("Error fetching CPTs: %s", e, exc_info=True)
+            return self.fallback_to_snapshot()
+        finally:
+            FETCH_SECONDS.labels(result).observe(time.perf_counter() - start)
+            self.record_fetch_timings(timings)
+
+    async def stream_cpts(self):
+        """Fetches CPTs from the API and yields them one by one while the body is parsed.
+
+        Unlike fetch_cpts, the response is never held in memory as a whole, so no
+        snapshot is kept and requests are unconditional. Paginated responses are
+        followed like in fetch_cpts; their ``links`` come after the data, so the
+        next page is requested once the current one is consumed. Errors end the
+        stream early. stream_complete is only set once the last page was read.
+        """
+        timings = {}
+        count = 0
+        result = "error"
+        start = time.perf_counter()
+        payload = self.payload_log.capture()
+        self.stream_complete = False
+
+        async def counted(chunks):
+            async for chunk in chunks:
+                payload.update(chunk)
+                yield chunk
+
+        try:
+            headers = self.build_request_headers()
+            logger.info("Streaming CPTs from %s", self.api_url)
+            session = self.get_session()
+            url = self.api_url
+            pages = 0
+            body_start = None
+            while True:
+                # Only the first request is traced, as in fetch_cpts
+                trace = {"trace_request_ctx": timings} if not pages else {}
+                async with session.get(url, headers=headers, **trace) as response:
                     if response.status != 200:
-                        logger.error(f"Failed to fetch CPTs: HTTP {response.status}")
+                        logger.error("Failed to fetch CPT page %d: HTTP %s", pages + 1, response.status,
+                                     extra={"status": response.status})
                         response_text = await response.text()
-                        logger.error(f"Response body: {response_text[:MAX_ERROR_RESPONSE_LENGTH]}")
-                        return []
-                    data = await response.json()
-                    logger.info(f"Raw API response: {data}")
-                    cpts = data.get("data", [])
-                    logger.info(f"Fetched {len(cpts)} CPTs from API")
-                    if cpts:
-                        logger.info(f"Sample CPT data: {cpts[0]}")
-                    return cpts
+                        logger.error("Response body: %s", response_text[:MAX_ERROR_RESPONSE_LENGTH])
+                        return
+                    body_start = body_start or time.perf_counter()
+                    rest = {}
+                    chunks = counted(response.content.iter_chunked(STREAM_CHUNK_SIZE))
+                    async for data in iter_json_array(chunks, key="data", rest=rest):
+                        count += 1
+                        cpt = self.ingest(data)
+                        if cpt is not None:
+                            yield cpt
+                pages += 1
+                url = next_page_url(rest)
+                if not url or pages >= TRAINING_API_MAX_PAGES:
+                    break
+            timings["body"] = time.perf_counter() - body_start
+            FETCH_BYTES.set(payload.size)
+            await self.payload_log.finish(payload)
+            result = "ok"
+            if url:
+                # An incomplete feed: leave stream_complete False so nothing is treated as removed
+                logger.warning("Stopped after %d pages (TRAINING_API_MAX_PAGES), CPT list is incomplete", pages)
+                return
+            self.stream_complete = True
+            logger.info("Streamed %d CPTs from API (%d page(s))", count, pages,
+                        extra={"status": response.status, "cpt_count": count})
         except Exception as e:
-            logger.error(f"Error fetching CPTs: {e}", exc_info=True)
+            logger.error("Error streaming CPTs after %d items: %s", count, e, exc_info=True)
+        finally:
+            FETCH_SECONDS.labels(result).observe(time.perf_counter() - start)
+            self.record_fetch_timings(timings)
+
+    def build_request_headers(self):
+        headers = {}
+        if TRAINING_API_TOKEN:
+            headers["Authorization"] = f"Bearer {TRAINING_API_TOKEN}"
+            logger.info("Using Bearer token authentication (token length: %d)", len(TRAINING_API_TOKEN))
+        else:
+            logger.warning("No TRAINING_API_TOKEN configured - API may reject request")
+        return headers
+
+    def fallback_to_snapshot(self):
+        """Returns the cached CPT list after a failed fetch, or [] if there is none."""
+        if self.cached_cpts is None:
             return []
+        logger.warning("Using cached CPT snapshot (%d CPTs) after failed fetch", len(self.cached_cpts))
+        return self.cached_cpts
+
+    def update_snapshot(self, cpts, etag, last_modified):
+        """Keeps the parsed records in memory and the raw ``cpts`` (API schema) on disk."""
+        self.cached_cpts = self.parse_cpts(cpts)
+        self.api_etag = etag
+        self.api_last_modified = last_modified
+        self.save_snapshot(cpts)
+
+    def ingest(self, data):
+        """Parses one API entry into a CPT record (records pass through); None for entries that are not objects."""
+        if isinstance(data, CPT):
+            return data
+        if not isinstance(data, dict):
+            logger.warning("Skipping CPT entry that is not an object: %r", data)
+            return None
+        return CPT.from_api(data, self.fir_matcher)
 
-    @tasks.loop(hours=3)
+    def parse_cpts(self, cpts):
+        records = []
+        for data in cpts:
+            cpt = self.ingest(data)
+            if cpt is not None:
+                records.append(cpt)
+        return records
+
+    @property
+    def cached_cpts(self):
+        if not self._snapshot_loaded:
+            self.load_snapshot()
+        return self._cached_cpts
+
+    @cached_cpts.setter
+    def cached_cpts(self, cpts):
+        self._snapshot_loaded = True
+        self._cached_cpts = cpts
+
+    def load_snapshot(self):
+        """Loads the last API response and its validators from disk."""
+        self._snapshot_loaded = True
+        try:
+            if not os.path.exists(self.snapshot_path):
+                logger.info("No CPT snapshot found, first fetch will be unconditional")
+                return
+            with open(self.snapshot_path, "r") as f:
+                snapshot = json.load(f)
+            if not isinstance(snapshot, dict) or not isinstance(snapshot.get("data"), list):
+                logger.warning("CPT snapshot format unrecognized, ignoring it")
+                return
+            self.cached_cpts = self.parse_cpts(snapshot["data"])
+            self.api_etag = snapshot.get("etag")
+            self.api_last_modified = snapshot.get("last_modified")
+            logger.info("Loaded CPT snapshot with %d CPTs (fetched at %s, etag=%s)",
+                        len(self.cached_cpts), snapshot.get('fetched_at'), self.api_etag)
+        except Exception as e:
+            logger.error("Failed to load CPT snapshot: %s", e, exc_info=True)
+
+    def save_snapshot(self, cpts):
+        try:
+            write_json_atomic(self.snapshot_path, {
+                "etag": self.api_etag,
+                "last_modified": self.api_last_modified,
+                "fetched_at": self.clock.now().isoformat(),
+                "data": cpts,
+            })
+            logger.debug("Saved CPT snapshot (%d CPTs) to disk", len(cpts))
+        except Exception as e:
+            logger.error("Failed to save CPT snapshot: %s", e, exc_info=True)
+
+    def record_fetch_timings(self, timings):
+        """Stores and logs the latency breakdown (in ms) of the last fetch."""
+        self.last_fetch_timings = {k: v for k, v in timings.items() if not k.startswith("_")}
+        if not self.last_fetch_timings:
+            return
+        parts = ", ".join(
+            f"{phase}={self.last_fetch_timings[phase] * 1000:.1f}ms"
+            for phase in ("dns", "connect", "first_byte", "body")
+            if phase in self.last_fetch_timings
+        )
+        reused = "reused" if self.last_fetch_timings.get("reused_connection") else "new"
+        logger.info("Fetch latency (%s connection): %s", reused, parts,
+                    extra={f"{phase}_ms": round(value * 1000, 1) for phase, value in self.last_fetch_timings.items()
+                           if phase != "reused_connection"})
+
+    @tasks.loop(hours=CPT_REFRESH_HOURS)
     async def cpt_check_loop(self):
+        new_correlation_id("run-")
         logger.info("=" * 80)
-        logger.info("Starting scheduled CPT check (runs every 3 hours)")
+        logger.info("Starting scheduled CPT refresh (runs every %g hours)", CPT_REFRESH_HOURS)
         logger.info("=" * 80)
         # self.load_announced_cpts() # Removed to prevent overwriting in-memory state
         self.cleanup_old_cpts()
-        cpts = await self.fetch_cpts()
-        await self.process_cpts(cpts)
+        if self.stream_parse:
+            await self.process_feed(self.stream_cpts())
+        else:
+            cpts = await self.fetch_cpts()
+            await self.process_feed(cpts)
         self.save_announced_cpts()
         logger.info("CPT check complete")
         logger.info("=" * 80)
 
     async def process_cpts(self, cpts):
-        now = datetime.now(timezone.utc)
-        logger.info(f"Processing {len(cpts)} CPTs (current time: {now.isoformat()})")
-        
-        processed_count = 0
-        notified_count = 0
-        filtered_count = 0
-        
-        for cpt in cpts:
-            position = cpt.get("position", "")
-            
-            # Check if position starts with any of the allowed prefixes
-            is_in_fir = False
-            for prefix in self.fir_prefixes:
-                if position.startswith(prefix):
-                    is_in_fir = True
-                    break
-            
-            if not is_in_fir:
-                filtered_count += 1
-                logger.info(f"CPT {cpt.get('id')} position '{position}' not in FIR (allowed prefixes: {self.fir_prefixes}), skipping")
-                continue
+        """Filters CPTs and sends due notifications.
 
-            processed_count += 1
+        ``cpts`` is either a list or, in streaming mode, an async iterable that
+        yields CPTs while the API response is still being parsed. Entries are
+        CPT records; raw API dicts are parsed on the way in (ingest).
+        Classification runs first; the due notifications are then sent
+        concurrently (send_due).
 
-            cpt_date_str = cpt.get("date")
-            if not cpt_date_str:
-                logger.warning(f"CPT {cpt.get('id')} has no date, skipping")
-                continue
+        The refresh loop, the scheduler and /testcpt can overlap, and a key is
+        only recorded as announced once its send completed, so runs hold
+        evaluation_lock: otherwise two runs could both send the same key.
+        """
+        async with self.evaluation_lock:
+            return await self._process_cpts(cpts)
 
-            try:
-                cpt_date = datetime.fromisoformat(cpt_date_str)
-            except ValueError:
-                logger.error(f"CPT {cpt.get('id')} has invalid date format: {cpt_date_str}")
-                continue
-            
-            time_diff = cpt_date - now
-            hours_left = time_diff.total_seconds() / 3600
-            
-            # Calculate days difference ignoring time of day
-            # This ensures notifications are sent based on calendar days, not exact hours
-            # Example: If CPT is on 20th at 7 PM, notification is sent on 17th morning (3 days)
-            cpt_date_day = cpt_date.date()
-            now_day = now.date()
-            days_diff = (cpt_date_day - now_day).days
-
-            cpt_id = str(cpt.get("id"))
-            
-            logger.info(f"CPT {cpt_id} ({position}): date={cpt_date.isoformat()}, "
-                        f"hours_left={hours_left:.1f}, days_diff={days_diff}")
-            
-            # Notification Types
-            notification_type = None
-            title = ""
-
-            # "Today/Now" Notification (approx 0 to 12 hours before)
-            if 0 < hours_left <= 12:
-                notification_type = "today"
-                title = "CPT Heute!"
-                logger.debug(f"CPT {cpt_id}: Triggering 'today' notification (hours_left={hours_left:.1f})")
-            
-            # "Upcoming" Notification (only when 2-4 days before)
-            # Send advance notification only within the 2-4 day window to ensure
-            # users receive timely notifications without being spammed too early
-            elif days_diff >= 2 and days_diff <= 4:
-                notification_type = "3day"
-                # Use days_diff for the title calculation
-                if days_diff == 1:
-                    title = "CPT Morgen!"
-                else:
-                    title = f"CPT in {days_diff} Tagen!"
-                logger.debug(f"CPT {cpt_id}: Triggering '3day' notification (days_diff={days_diff}, hours_left={hours_left:.1f})")
-
-            if notification_type:
-                # Key for persistence: "ID_TYPE" e.g. "139_3day"
-                key = f"{cpt_id}_{notification_type}"
-                
-                # Check if already announced
-                if key not in self.cpts_announced:
-                    logger.info(f"Sending notification for CPT {cpt_id} ({notification_type}): {title}")
-                    if await self.send_notification(cpt, title):
-                        self.cpts_announced[key] = cpt_date_str
-                        notified_count += 1
-                        logger.info(f"Successfully sent notification for CPT {cpt_id}")
-                    else:
-                        logger.error(f"Failed to send notification for CPT {cpt_id}")
+    async def _process_cpts(self, cpts):
+        now = self.clock.now()
+        counts = {"processed": 0, "notified": 0, "filtered": 0}
+        due = {}  # key -> (cpt, title, log_fields), in feed order
+        refresh = {}  # cpt_id -> (cpt, title, log_fields): posted messages whose content changed
+
+        if hasattr(cpts, "__aiter__"):
+            logger.info("Processing streamed CPTs (current time: %s)", now)
+            async for cpt in cpts:
+                cpt = self.ingest(cpt)
+                if cpt is not None:
+                    await self.process_cpt(cpt, now, counts, due, refresh)
+        else:
+            logger.info("Processing %d CPTs (current time: %s)", len(cpts), now)
+            for cpt in cpts:
+                cpt = self.ingest(cpt)
+                if cpt is not None:
+                    await self.process_cpt(cpt, now, counts, due, refresh)
+
+        await self.send_due(due, counts, refresh)
+
+        for outcome, count in counts.items():
+            CPTS_TOTAL.labels(outcome).inc(count)
+        logger.info("Processed %d CPTs in FIR (filtered out %d), sent %d notifications",
+                    counts["processed"], counts["filtered"], counts["notified"], extra=counts)
+        return due
+
+    async def process_feed(self, cpts):
+        """Processes a complete feed; with CPT_INCREMENTAL only what changed since the previous one.
+
+        The feed is diffed against the last one by CPT id and content hash
+        (src.cpt_diff), and process_cpts only sees added and changed CPTs plus
+        unchanged ones whose notification time came up since the previous run,
+        so the work follows the churn rather than the feed size. Rescheduled
+        CPTs lose their announced keys first, so they are notified again for
+        the new date; cancellations are logged. CPTs whose notification failed
+        are dropped from the snapshot, so the next run retries them.
+
+        Without CPT_INCREMENTAL, and for streamed feeds (the diff would keep a
+        record per CPT, which streaming exists to avoid), every CPT is
+        evaluated again, and the scheduled notifications of CPTs missing from
+        a complete feed are cancelled (cancel_missing).
+        """
+        streamed = hasattr(cpts, "__aiter__")
+        async with self.evaluation_lock:
+            if CPT_INCREMENTAL and not streamed:
+                return await self._process_feed(cpts)
+
+            # Only CPTs that already had notifications scheduled can be cancelled; tracking just
+            # those keeps memory independent of the feed size
+            scheduled = {str(cpt.id) for _, cpt in self.scheduler.items()}
+            seen = set()
+            if streamed:
+                async def tracked():
+                    async for cpt in cpts:
+                        cpt = self.ingest(cpt)
+                        if cpt is not None:
+                            if str(cpt.id) in scheduled:
+                                seen.add(str(cpt.id))
+                            yield cpt
+                await self._process_cpts(tracked())
+                complete = self.stream_complete
+            else:
+                cpts = self.parse_cpts(cpts)
+                seen.update(str(cpt.id) for cpt in cpts)
+                await self._process_cpts(cpts)
+                complete = True
+            # An interrupted stream is not a complete feed: missing CPTs may just not have been read
+            if complete:
+                self.cancel_missing(scheduled - seen)
+            return None
+
+    async def _process_feed(self, cpts):
+        diff = self.cpt_diff.begin(self.clock.now())
+
+        def changed(cpt):
+            kind = diff.add(cpt)
+            if kind == "rescheduled":
+                self.invalidate_cpt(diff.previous(cpt.id), cpt)
+            return kind is not None
+
+        evaluate = [cpt for cpt in self.parse_cpts(cpts) if changed(cpt)]
+        due = await self._process_cpts(evaluate + diff.finish().newly_due)
+
+        for key, (cpt, _, _) in due.items():
+            if key not in self.cpts_announced:
+                self.cpt_diff.forget(cpt.id)
+        self.report_feed_diff(diff)
+        return diff
+
+    def invalidate_cpt(self, old, new):
+        """Forgets the announced keys of a rescheduled CPT, so it is notified again for its new date."""
+        cpt_id = str(new.id)
+        keys = [f"{cpt_id}_{notification_type}" for notification_type in ("3day", "today")]
+        announced = [key for key in keys if key in self.cpts_announced]
+        for key in keys:
+            self.scheduler.cancel(key)
+        logger.info("CPT %s rescheduled from %s to %s", cpt_id, old.date_str, new.date_str,
+                    extra={"cpt_id": cpt_id})
+        if announced:
+            for key in announced:
+                del self.cpts_announced[key]
+            self.store.delete(announced)
+
+    def cancel_cpt(self, cpt):
+        """Drops the scheduled notifications of a CPT that was removed from the feed before its date."""
+        cpt_id = str(cpt.id)
+        for notification_type in ("3day", "today"):
+            self.scheduler.cancel(f"{cpt_id}_{notification_type}")
+        logger.warning("CPT %s (%s on %s) was removed from the feed before its date, treating it as cancelled",
+                       cpt_id, cpt.position, cpt.date_str, extra={"cpt_id": cpt_id, "position": cpt.position})
+
+    def cancel_missing(self, missing_ids):
+        """Full refresh: cancels the scheduled notifications of CPTs that are not in the feed anymore."""
+        missing = {}
+        for _, cpt in self.scheduler.items():
+            if str(cpt.id) in missing_ids:
+                missing[str(cpt.id)] = cpt
+        for cpt in missing.values():
+            self.cancel_cpt(cpt)
+
+    def report_feed_diff(self, diff):
+        """Logs and counts the feed diff; cancelled CPTs also lose their scheduled notifications."""
+        for cpt in diff.cancelled:
+            self.cancel_cpt(cpt)
+
+        kinds = {"added": len(diff.added), "changed": len(diff.changed), "rescheduled": len(diff.rescheduled),
+                 "removed": len(diff.removed), "cancelled": len(diff.cancelled), "newly_due": len(diff.newly_due)}
+        for kind, count in kinds.items():
+            FEED_CHANGES_TOTAL.labels(kind).inc(count)
+        logger.info("Feed diff: %d added, %d changed (%d rescheduled), %d removed (%d cancelled), %d newly due, "
+                    "%d unchanged", kinds["added"], kinds["changed"], kinds["rescheduled"], kinds["removed"],
+                    kinds["cancelled"], kinds["newly_due"], diff.unchanged, extra=kinds)
+
+    async def send_due(self, due, counts, refresh=None):
+        """Sends the classified notifications, at most CPT_SEND_CONCURRENCY at a time.
+
+        send_notification waits for the channel's rate limit, so the run takes
+        about as long as the slowest send (or the rate limit) instead of the sum
+        of all sends. Each result is applied to cpts_announced, the store and
+        the scheduler without an await in between, so concurrent sends never see
+        a half-updated state. With CPT_DIGEST_MODE several due notifications
+        are coalesced instead (send_digest).
+
+        With CPT_EDIT_IN_PLACE a due stage of a CPT that already has a message
+        edits that message instead of posting again, and ``refresh`` (CPTs whose
+        rendered embed changed) is applied the same way (send_edits).
+        """
+        if CPT_EDIT_IN_PLACE and (due or refresh):
+            due = await self.send_edits(due, refresh or {}, counts)
+        if not due:
+            return
+        start = time.perf_counter()
+        if CPT_DIGEST_MODE and len(due) > 1:
+            await self.send_digest(due, counts)
+        else:
+            semaphore = asyncio.Semaphore(CPT_SEND_CONCURRENCY)
+
+            async def send(key, cpt, title, log_fields):
+                async with semaphore:
+                    sent = await self.send_notification(cpt, title, key=key)
+                if sent:
+                    self.mark_announced(key, cpt, counts, log_fields)
                 else:
-                    logger.debug(f"CPT {cpt_id} already announced as {notification_type}, skipping")
+                    logger.error("Failed to send notification for CPT %s", log_fields["cpt_id"], extra=log_fields)
+
+            await asyncio.gather(*(send(key, *notification) for key, notification in due.items()))
+        # The run's "done" records were written in the background; wait for them (one fsync for the batch)
+        await self.outbox.flush()
+        logger.info("Sent %d/%d due notification(s) in %.0fms", counts["notified"], len(due),
+                    (time.perf_counter() - start) * 1000)
+
+    async def send_edits(self, due, refresh, counts):
+        """Edits the tracked messages of ``refresh`` and of due stages; returns the due keys that still need a post.
+
+        A stage edit counts as announced without a new post or ping. If the
+        message was deleted in Discord its entry is dropped and the stage is
+        posted again.
+        """
+        edits = {key: notification for key, notification in due.items() if self.cpt_messages.get(notification[0].id)}
+        if not edits and not refresh:
+            return due
+        remaining = {key: notification for key, notification in due.items() if key not in edits}
+        semaphore = asyncio.Semaphore(CPT_SEND_CONCURRENCY)
+        edited = 0
+
+        async def edit(key, cpt, title, log_fields):
+            nonlocal edited
+            async with semaphore:
+                result = await self.edit_notification(cpt, title)
+            if result:
+                edited += 1
+                if key:
+                    self.mark_announced(key, cpt, counts, log_fields)
+            elif result is None and key:
+                remaining[key] = (cpt, title, log_fields)
             else:
-                logger.debug(f"CPT {cpt_id}: No notification needed (hours_left={hours_left:.1f})")
-        
-        logger.info(f"Processed {processed_count} CPTs in FIR (filtered out {filtered_count}), sent {notified_count} notifications")
+                logger.error("Failed to edit notification for CPT %s", log_fields["cpt_id"], extra=log_fields)
 
-    def load_announced_cpts(self):
+        await asyncio.gather(*(edit(key, *notification) for key, notification in edits.items()),
+                             *(edit(None, *notification) for notification in refresh.values()))
+        logger.info("Edited %d/%d posted notification(s) in place", edited, len(edits) + len(refresh))
+        return remaining
+
+    async def edit_notification(self, cpt, title_prefix):
+        """Edits the CPT's tracked message to the current rendering.
+
+        Returns True on success, None if the message no longer exists (the
+        entry is dropped) and False on any other failure.
+        """
+        cpt_id = cpt.id
+        tracked = self.cpt_messages.get(cpt_id)
+        channel = self.bot.get_channel(CPT_CHANNEL_ID)
+        if not channel:
+            logger.error("Channel %s not found.", CPT_CHANNEL_ID, extra={"channel_id": CPT_CHANNEL_ID})
+            return False
         try:
-            if os.path.exists("data/cpts.json"):
-                import json
-                with open("data/cpts.json", "r") as f:
-                    data = json.load(f)
-                    
-                    # Migration Logic: Convert list to dict if necessary
-                    if isinstance(data, list):
-                        logger.info("Migrating cpts.json from list to dict format.")
-                        # We don't have dates for old entries, so we can't efficiently clean them up yet.
-                        # We'll just migrate them with a dummy past date or keep them as keys with None, 
-                        # but to be safe and allow cleanup, we might just clear them or set a far future date?
-                        # Better approach: Set them to expiring soon or just keep them without date 
-                        # and let cleanup handle 'None' if we wanted, but simplest is to just start fresh 
-                        # OR migrate as keys with a flag. 
-                        # Let's map them to a localized "now" so they eventually get cleaned up if we implement a timeout, 
-                        # or just don't clean them up if they lack a date?
-                        # DECISION: Convert to dict with None date. Cleanup will skip or remove None dates?
-                        # Actually, if we don't know the date, we can't verify if it's passed.
-                        # Let's just import them as keys.
-                        self.cpts_announced = {k: None for k in data}
-                    elif isinstance(data, dict):
-                        self.cpts_announced = data
-                        logger.info(f"Loaded {len(self.cpts_announced)} previously announced CPTs")
-                    else:
-                        logger.warning("cpts.json format unrecognized. Starting with empty record.")
-                        self.cpts_announced = {}
+            _, embed = self.build_notification(cpt, title_prefix)
+            await self.channel_limiter.acquire(CPT_CHANNEL_ID)
+            start = time.perf_counter()
+            await channel.get_partial_message(tracked["message_id"]).edit(embed=embed)
+            DISCORD_SEND_SECONDS.labels(CPT_CHANNEL_ID).observe(time.perf_counter() - start)
+        except discord.NotFound:
+            logger.warning("Message %s of CPT %s was deleted, posting a new one", tracked["message_id"], cpt_id,
+                           extra={"channel_id": CPT_CHANNEL_ID, "cpt_id": cpt_id})
+            self.cpt_messages.remove(cpt_id)
+            return None
+        except Exception as e:
+            logger.error("Failed to edit notification: %s", e, exc_info=True,
+                         extra={"channel_id": CPT_CHANNEL_ID, "cpt_id": cpt_id})
+            return False
+        self.cpt_messages.record(cpt_id, tracked["message_id"], embed_hash(embed), title_prefix, cpt.date_str)
+        logger.info("Edited notification %s in channel %s: %s", tracked["message_id"], CPT_CHANNEL_ID, title_prefix,
+                    extra={"channel_id": CPT_CHANNEL_ID, "cpt_id": cpt_id})
+        return True
+
+    def mark_announced(self, key, cpt, counts, log_fields):
+        self.cpts_announced[key] = cpt.date_str
+        self.store.upsert(key, cpt.date_str)
+        self.scheduler.cancel(key)
+        counts["notified"] += 1
+        logger.info("Successfully sent notification for CPT %s", log_fields["cpt_id"], extra=log_fields)
+
+    async def send_digest(self, due, counts):
+        """Sends due notifications grouped by type, up to 10 embeds per message, with one role ping per run.
+
+        The ping goes on the first message that is sent successfully. If a type
+        needs more than CPT_DIGEST_MAX_MESSAGES messages, the last one is a
+        single summary embed listing the remaining CPTs (build_overflow_embed).
+        Every key is journaled in the outbox like a single send, so a digest
+        interrupted by a restart is replayed as single notifications.
+        """
+        by_type = {}
+        for key, (cpt, title, log_fields) in due.items():
+            by_type.setdefault(key.rsplit("_", 1)[1], []).append((key, cpt, title, log_fields))
+
+        ping = f"<@&{CPT_ROLE_ID}>" if CPT_ROLE_ID else ""
+        for notification_type, items in by_type.items():
+            entries = [(item, "", [self.build_notification(item[1], item[2])[1]]) for item in items]
+            groups = pack_messages(entries)
+            overflow = []
+            if len(groups) > CPT_DIGEST_MAX_MESSAGES:
+                keep = max(CPT_DIGEST_MAX_MESSAGES - 1, 0)
+                overflow = [entry[0] for group in groups[keep:] for entry in group]
+                groups = groups[:keep]
+
+            messages = [([entry[0] for entry in group], [entry[2][0] for entry in group]) for group in groups]
+            if overflow:
+                logger.warning("Digest of %d '%s' notifications exceeds %d messages, summarizing the last %d",
+                               len(items), notification_type, CPT_DIGEST_MAX_MESSAGES, len(overflow))
+                messages.append((overflow, [self.build_overflow_embed(overflow)]))
+
+            for message_items, embeds in messages:
+                if await self.send_digest_message(ping, embeds, message_items):
+                    ping = ""
+                    for key, cpt, _, log_fields in message_items:
+                        self.mark_announced(key, cpt, counts, log_fields)
+                else:
+                    for _, _, _, log_fields in message_items:
+                        logger.error("Failed to send notification for CPT %s", log_fields["cpt_id"], extra=log_fields)
+
+    def build_overflow_embed(self, items):
+        """Summary embed for digest overflow: one line per CPT, cut off at Discord's description limit."""
+        lines = []
+        length = 0
+        for index, (_, cpt, title, _) in enumerate(items):
+            line = f"• {cpt.position} – {cpt.date:%d.%m. %H:%M} UTC – {cpt.trainee_name} ({cpt.course_name})"
+            if length + len(line) + 1 > MAX_EMBED_DESCRIPTION_LENGTH - 40:
+                lines.append(f"… und {len(items) - index} weitere")
+                break
+            lines.append(line)
+            length += len(line) + 1
+        return discord.Embed(title=f"Weitere CPTs ({len(items)})", description="\n".join(lines),
+                             color=discord.Color.blurple())
+
+    async def send_digest_message(self, content, embeds, items):
+        """Sends one digest message; returns False if it could not be sent."""
+        for key, cpt, title, _ in items:
+            self.record_intent(key, title, cpt)
+        await self.outbox.flush()  # The intents must be on disk before the send
+
+        channel = self.bot.get_channel(CPT_CHANNEL_ID)
+        if not channel:
+            logger.error("Channel %s not found.", CPT_CHANNEL_ID, extra={"channel_id": CPT_CHANNEL_ID})
+            return False
+        try:
+            await self.channel_limiter.acquire(CPT_CHANNEL_ID)
+            start = time.perf_counter()
+            await channel.send(content=content, embeds=embeds)
+            DISCORD_SEND_SECONDS.labels(CPT_CHANNEL_ID).observe(time.perf_counter() - start)
+            for key, _, _, _ in items:
+                self.outbox.mark_done(f"cpt:{key}")
+            logger.info("Sent digest of %d notification(s) in %d embed(s) to channel %s", len(items), len(embeds),
+                        CPT_CHANNEL_ID, extra={"channel_id": CPT_CHANNEL_ID})
+            return True
+        except Exception as e:
+            logger.error("Failed to send digest: %s", e, exc_info=True, extra={"channel_id": CPT_CHANNEL_ID})
+            return False
+
+    async def process_cpt(self, cpt, now, counts, due, refresh=None):
+        position = cpt.position
+
+        if not cpt.in_fir:
+            counts["filtered"] += 1
+            logger.info("CPT %s position '%s' not in FIR (allowed prefixes: %s), skipping",
+                        cpt.id, position, self.fir_prefixes, extra={"cpt_id": cpt.id, "position": position})
+            return
+
+        counts["processed"] += 1
+
+        cpt_date = cpt.date
+        if cpt_date is None:
+            if cpt.raw_date:
+                logger.error("CPT %s has invalid date format: %s", cpt.id, cpt.raw_date, extra={"cpt_id": cpt.id})
             else:
-                logger.info("No existing cpts.json found, starting fresh")
-                self.cpts_announced = {}
+                logger.warning("CPT %s has no date, skipping", cpt.id, extra={"cpt_id": cpt.id})
+            return
+
+        time_diff = cpt_date - now
+        hours_left = time_diff.total_seconds() / 3600
+
+        # Calculate days difference ignoring time of day
+        # This ensures notifications are sent based on calendar days, not exact hours
+        # Example: If CPT is on 20th at 7 PM, notification is sent on 17th morning (3 days)
+        cpt_date_day = cpt_date.date()
+        now_day = now.date()
+        days_diff = (cpt_date_day - now_day).days
+
+        cpt_id = str(cpt.id)
+        log_fields = {"cpt_id": cpt_id, "position": position, "hours_left": round(hours_left, 1)}
+
+        logger.info("CPT %s (%s): date=%s, hours_left=%.1f, days_diff=%d",
+                    cpt_id, position, cpt.date_str, hours_left, days_diff, extra=log_fields)
+
+        # Notification Types
+        notification_type = None
+        title = ""
+
+        # "Today/Now" Notification (approx 0 to 12 hours before)
+        if 0 < hours_left <= 12:
+            notification_type = "today"
+            title = "CPT Heute!"
+            logger.debug("CPT %s: Triggering 'today' notification (hours_left=%.1f)", cpt_id, hours_left, extra=log_fields)
+
+        # "Upcoming" Notification (only when 2-4 days before)
+        # Send advance notification only within the 2-4 day window to ensure
+        # users receive timely notifications without being spammed too early
+        elif days_diff >= 2 and days_diff <= 4:
+            notification_type = "3day"
+            # Use days_diff for the title calculation
+            if days_diff == 1:
+                title = "CPT Morgen!"
+            else:
+                title = f"CPT in {days_diff} Tagen!"
+            logger.debug("CPT %s: Triggering '3day' notification (days_diff=%d, hours_left=%.1f)",
+                         cpt_id, days_diff, hours_left, extra=log_fields)
+
+        key = None
+        if notification_type:
+            # Key for persistence: "ID_TYPE" e.g. "139_3day"
+            key = f"{cpt_id}_{notification_type}"
 
+            # Check if already announced (or already due earlier in this run, for duplicated feed entries)
+            if key not in self.cpts_announced and key not in due:
+                logger.info("Sending notification for CPT %s (%s): %s", cpt_id, notification_type, title, extra=log_fields)
+                due[key] = (cpt, title, log_fields)
+            else:
+                logger.debug("CPT %s already announced as %s, skipping", cpt_id, notification_type, extra=log_fields)
+        else:
+            logger.debug("CPT %s: No notification needed (hours_left=%.1f)", cpt_id, hours_left, extra=log_fields)
+
+        if CPT_EDIT_IN_PLACE and refresh is not None and hours_left > 0 and key not in due:
+            self.check_posted_message(cpt, cpt_id, title, refresh, log_fields)
+
+        self.schedule_notifications(cpt, cpt_id, cpt_date, now)
+
+    def check_posted_message(self, cpt, cpt_id, title, refresh, log_fields):
+        """Queues an edit if the CPT's posted message no longer matches its current rendering.
+
+        Compares embed hashes only, so unchanged CPTs cost no API call.
+        """
+        tracked = self.cpt_messages.get(cpt_id)
+        if not tracked or cpt_id in refresh:
+            return
+        title = title or tracked["title"]
+        if embed_hash(self.build_notification(cpt, title)[1]) != tracked["hash"]:
+            logger.info("CPT %s changed since it was posted, editing message %s", cpt_id, tracked["message_id"],
+                        extra=log_fields)
+            refresh[cpt_id] = (cpt, title, log_fields)
+
+    def schedule_notifications(self, cpt, cpt_id, cpt_date, now):
+        """Queues the exact fire time of every notification stage that has not started yet."""
+        for notification_type, (start, end) in notification_windows(cpt_date).items():
+            key = f"{cpt_id}_{notification_type}"
+            if key in self.cpts_announced or start <= now:
+                self.scheduler.cancel(key)
+                continue
+            self.scheduler.schedule(key, start, cpt)
+
+    async def fire_scheduled(self, due):
+        """Scheduler callback: re-evaluates the CPTs whose notification window just opened."""
+        new_correlation_id("sched-")
+        cpts = list({str(cpt.id): cpt for _, cpt in due}.values())
+        logger.info("%d scheduled notification(s) due: %s", len(due), ", ".join(key for key, _ in due))
+        await self.process_cpts(cpts)
+        self.save_announced_cpts()
+
+    @property
+    def store(self):
+        if self._store is None:
+            backend = (CPT_STORE_BACKEND or "json").lower()
+            path = CPT_STORE_PATH or DEFAULT_STORE_PATHS.get(backend)
+            self._store = create_announced_store(backend, state_path(path) if path else None,
+                                                 legacy_json_path=state_path(DEFAULT_STORE_PATHS["json"]))
+        return self._store
+
+    @store.setter
+    def store(self, store):
+        self._store = store
+
+    @property
+    def cpts_announced(self):
+        return self._cpts_announced
+
+    @cpts_announced.setter
+    def cpts_announced(self, entries):
+        # Always keep the announced state in an expiry-ordered index, whatever mapping is assigned
+        if not isinstance(entries, AnnouncedIndex):
+            entries = AnnouncedIndex(entries, clock=self.clock, legacy_ttl=self.legacy_ttl)
+        self._cpts_announced = entries
+
+    def load_announced_cpts(self):
+        try:
+            self.cpts_announced = AnnouncedIndex(self.store.load(), clock=self.clock, legacy_ttl=self.legacy_ttl,
+                                                 recorded_at=self.store.load_recorded_at())
+            logger.info("Loaded %d previously announced CPTs", len(self.cpts_announced))
         except Exception as e:
-            logger.error(f"Failed to load announced CPTs: {e}", exc_info=True)
+            logger.error("Failed to load announced CPTs: %s", e, exc_info=True)
             self.cpts_announced = {}
 
     def save_announced_cpts(self):
         try:
-            import json
-            os.makedirs("data", exist_ok=True)
-            with open("data/cpts.json", "w") as f:
-                json.dump(self.cpts_announced, f, indent=2)
-            logger.debug(f"Saved {len(self.cpts_announced)} announced CPTs to disk")
+            self.store.save(self.cpts_announced)
+            self.cpt_messages.save()
+            logger.debug("Saved %d announced CPTs to disk", len(self.cpts_announced))
         except Exception as e:
-            logger.error(f"Failed to save announced CPTs: {e}", exc_info=True)
+            logger.error("Failed to save announced CPTs: %s", e, exc_info=True)
 
     def cleanup_old_cpts(self):
-        """Removes CPTs that have already passed from the announced list."""
+        """Removes CPTs that have already passed from the announced list.
+
+        Only entries whose expiry (event date + 1 day, or the legacy TTL for
+        entries without a date) has passed are touched.
+        """
         try:
-            now = datetime.now(timezone.utc)
-            keys_to_remove = []
-            
-            logger.debug(f"Running cleanup of old CPTs (total tracked: {len(self.cpts_announced)})")
-            
-            for key, date_str in self.cpts_announced.items():
-                if date_str is None:
-                    # Legacy data without date.
-                    # Optional: Remove if we want to enforce cleanup, or keep until manual purge.
-                    # Let's keep them to avoid re-announcing if the bot restarts quickly after migration.
-                    logger.debug(f"Keeping legacy entry without date: {key}")
-                    continue
-                
-                try:
-                    event_date = datetime.fromisoformat(date_str)
-                    # If event is in the past (plus a buffer, e.g., 1 day), remove it
-                    if event_date + timedelta(days=1) < now:
-                        keys_to_remove.append(key)
-                        logger.debug(f"Marking {key} for removal (event date: {event_date.isoformat()})")
-                except ValueError:
-                    # Invalid date format, remove to be safe
-                    logger.warning(f"Invalid date format for {key}: {date_str}, removing")
-                    keys_to_remove.append(key)
-            
-            if keys_to_remove:
-                logger.info(f"Cleaning up {len(keys_to_remove)} old CPT entries.")
-                for k in keys_to_remove:
-                    del self.cpts_announced[k]
-                self.save_announced_cpts()
-            else:
+            now = self.clock.now()
+            logger.debug("Running cleanup of old CPTs (total tracked: %d)", len(self.cpts_announced))
+
+            # Messages of past CPTs are never edited again
+            if self.cpt_messages.remove_expired(now - timedelta(days=1)):
+                self.cpt_messages.save()
+
+            expired = self.cpts_announced.pop_expired(now)
+            if not expired:
                 logger.debug("No old CPT entries to clean up")
-                
+                return
+
+            legacy_keys = []
+            for key, date_str in expired:
+                if date_str is None:
+                    legacy_keys.append(key)
+                    logger.debug("Removing legacy entry without date after TTL: %s", key)
+                else:
+                    logger.debug("Removing %s (event date: %s)", key, date_str)
+
+            logger.info("Cleaning up %d old CPT entries.", len(expired))
+            # Keyed backends drop dated entries with one range delete on the event date index
+            self.store.delete_expired(now - timedelta(days=1))
+            if legacy_keys:
+                self.store.delete(legacy_keys)
+            self.save_announced_cpts()
+
         except Exception as e:
-            logger.error(f"Error during CPT cleanup: {e}", exc_info=True)
+            logger.error("Error during CPT cleanup: %s", e, exc_info=True)
 
     @commands.hybrid_command(name="testcpt", description="Manually triggers the CPT check.")
     async def test_cpt_manual(self, ctx):
@@ -247,7 +1012,7 @@ class CPTChecker(commands.Cog):
         # Defer response since it might take a while
         await ctx.defer()
         
-        logger.info(f"Manual CPT check triggered by user {ctx.author}")
+        logger.info("Manual CPT check triggered by user %s", ctx.author)
         try:
             cpts = await self.fetch_cpts()
             
@@ -258,21 +1023,16 @@ class CPTChecker(commands.Cog):
                 return
 
             # Filter CPTs by FIR
-            filtered_cpts = []
-            for cpt in cpts:
-                position = cpt.get("position", "")
-                is_in_fir = any(position.startswith(prefix) for prefix in self.fir_prefixes)
-                if is_in_fir:
-                    filtered_cpts.append(cpt)
+            filtered_cpts = [cpt for cpt in cpts if cpt.in_fir]
             
-            logger.info(f"Found {len(filtered_cpts)} CPTs in FIR out of {len(cpts)} total CPTs")
+            logger.info("Found %d CPTs in FIR out of %d total CPTs", len(filtered_cpts), len(cpts))
             
             # Create summary of CPTs
             cpt_summary = []
             for cpt in filtered_cpts[:5]:  # Show first 5
-                date_str = cpt.get('date', 'N/A')
-                position = cpt.get('position', 'N/A')
-                trainee = cpt.get('trainee_name', 'N/A')
+                date_str = cpt.date_str or 'N/A'
+                position = cpt.position or 'N/A'
+                trainee = cpt.trainee_name or 'N/A'
                 cpt_summary.append(f"- {position} am {date_str}: {trainee}")
             
             count_before = len(self.cpts_announced)
@@ -298,51 +1058,115 @@ class CPTChecker(commands.Cog):
                 await ctx.send(msg)
 
         except Exception as e:
-            logger.error(f"Error in manual CPT check: {e}", exc_info=True)
+            logger.error("Error in manual CPT check: %s", e, exc_info=True)
             await ctx.send(f"Fehler aufgetreten: {e}")
 
-    async def send_notification(self, cpt, title_prefix):
+    def build_notification(self, cpt, title_prefix):
+        """Returns (content, embed) for a CPT notification."""
+        is_confirmed = cpt.confirmed
+
+        color = discord.Color.green() if is_confirmed else discord.Color.orange()
+
+        embed = discord.Embed(
+            title=f"{title_prefix}: {cpt.course_name}",
+            description=f"Ein neues CPT steht an!",
+            color=color,
+            timestamp=cpt.date.replace(tzinfo=None)
+        )
+        embed.add_field(name="Trainee", value=f"{cpt.trainee_name} ({cpt.trainee_vatsim_id})", inline=True)
+        embed.add_field(name="Position", value=cpt.position, inline=True)
+        embed.add_field(name="Mentor", value=f"{cpt.local_name}", inline=True)
+
+        message = ""
+        role_id = CPT_ROLE_ID
+        if role_id:
+            message = f"<@&{role_id}> "
+        return message, embed
+
+    async def send_notification(self, cpt, title_prefix, key=None):
+        """Sends one CPT notification.
+
+        With a ``key`` (``{cpt_id}_{type}``) the send is journaled in the outbox
+        first, so it is replayed after a restart if it never completed.
+        """
+        outbox_key = f"cpt:{key}" if key else None
+        if outbox_key:
+            self.record_intent(key, title_prefix, cpt)
+            await self.outbox.flush()  # The intent must be on disk before the send
+
         channel = self.bot.get_channel(CPT_CHANNEL_ID)
         if not channel:
-            logger.error(f"Channel {CPT_CHANNEL_ID} not found.")
+            logger.error("Channel %s not found.", CPT_CHANNEL_ID, extra={"channel_id": CPT_CHANNEL_ID})
             return False
 
         try:
-            is_confirmed = cpt.get("confirmed", False)
-
-            color = discord.Color.green() if is_confirmed else discord.Color.orange()
-
-            embed = discord.Embed(
-                title=f"{title_prefix}: {cpt.get('course_name')}",
-                description=f"Ein neues CPT steht an!",
-                color=color,
-                timestamp=datetime.fromisoformat(cpt.get('date')).replace(tzinfo=None)
-            )
-            embed.add_field(name="Trainee", value=f"{cpt.get('trainee_name')} ({cpt.get('trainee_vatsim_id')})", inline=True)
-            embed.add_field(name="Position", value=cpt.get('position'), inline=True)
-            embed.add_field(name="Mentor", value=f"{cpt.get('local_name')}", inline=True)
-            
-            message = ""
-            role_id = CPT_ROLE_ID
-            if role_id:
-                message = f"<@&{role_id}> "
-            
-            await channel.send(content=message, embed=embed)
-            logger.info(f"Sent notification to channel {CPT_CHANNEL_ID}: {title_prefix}")
+            message, embed = self.build_notification(cpt, title_prefix)
+            await self.channel_limiter.acquire(CPT_CHANNEL_ID)
+            start = time.perf_counter()
+            sent = await channel.send(content=message, embed=embed)
+            DISCORD_SEND_SECONDS.labels(CPT_CHANNEL_ID).observe(time.perf_counter() - start)
+            if CPT_EDIT_IN_PLACE:
+                self.cpt_messages.record(cpt.id, sent.id, embed_hash(embed), title_prefix, cpt.date_str)
+            if outbox_key:
+                self.outbox.mark_done(outbox_key)
+            logger.info("Sent notification to channel %s: %s", CPT_CHANNEL_ID, title_prefix,
+                        extra={"channel_id": CPT_CHANNEL_ID, "cpt_id": cpt.id})
             return True
         except Exception as e:
-            logger.error(f"Failed to send notification: {e}", exc_info=True)
+            logger.error("Failed to send notification: %s", e, exc_info=True,
+                         extra={"channel_id": CPT_CHANNEL_ID, "cpt_id": cpt.id})
             return False
 
+    def record_intent(self, key, title, cpt):
+        """Journals a send in the outbox.
+
+        A key that is already pending belongs to an earlier attempt that failed
+        (or is being replayed), so the send goes ahead as its retry. Concurrent
+        sends of one key cannot happen: evaluation runs under evaluation_lock
+        and the outbox is replayed before the refresh loop starts.
+        """
+        if not self.outbox.record_intent(f"cpt:{key}", "cpt", {"key": key, "title": title, "cpt": cpt.to_dict()}):
+            logger.info("Retrying notification %s left pending by an earlier attempt", key, extra={"cpt_id": cpt.id})
+
+    async def replay_outbox(self):
+        """Delivers notifications that were journaled but not confirmed before the last shutdown."""
+        async def replay(record):
+            payload = record["payload"]
+            key, cpt = payload["key"], CPT.from_api(payload["cpt"], self.fir_matcher)
+            if key not in self.cpts_announced:
+                channel = self.bot.get_channel(CPT_CHANNEL_ID)
+                message, embed = self.build_notification(cpt, payload["title"])
+                # The previous attempt may have been sent right before the crash
+                if channel and await find_delivered_message(channel, record["ts"], message, [embed.title], self.bot.user.id):
+                    logger.info("Outbox notification %s was already delivered before restart", key)
+                elif not await self.send_notification(cpt, payload["title"], key=key):
+                    return False
+                self.cpts_announced[key] = cpt.date_str
+                self.store.upsert(key, cpt.date_str)
+            return True
+
+        if await self.outbox.replay(replay, concurrency=OUTBOX_REPLAY_CONCURRENCY):
+            self.save_announced_cpts()
+
     @cpt_check_loop.before_loop
     async def before_cpt_check(self):
+        new_correlation_id("init-")
         logger.info("Waiting for bot to be ready before starting CPT check loop...")
         await self.bot.wait_until_ready()
         logger.info("Bot is ready. Initializing CPT checker...")
         # Load once here to ensure in-memory state is primed before loop starts
         self.load_announced_cpts()
-        logger.info(f"CPT check loop will run every 3 hours")
-        logger.info(f"Monitoring FIR prefixes: {', '.join(self.fir_prefixes)}")
+        await self.replay_outbox()
+        # Act on the cached snapshot right away instead of waiting for the first network round-trip
+        if self.cached_cpts:
+            logger.info("Processing %d CPTs from cached snapshot before first fetch", len(self.cached_cpts))
+            await self.process_feed(self.cached_cpts)
+            self.save_announced_cpts()
+        logger.info("CPT refresh loop will run every %g hours", CPT_REFRESH_HOURS)
+        if self.scheduler_task is None:
+            self.scheduler_task = asyncio.create_task(self.scheduler.run(self.fire_scheduled))
+            logger.info("Notification scheduler started")
+        logger.info("Monitoring FIR prefixes: %s", ", ".join(self.fir_prefixes))
 
 async def setup(bot):
     await bot.add_cog(CPTChecker(bot))
@@ -1,11 +1,67 @@
 from discord.ext import commands
+import asyncio
 import logging
+import time
 from aiohttp import web
 import discord
-from src.config import EVENT_MANAGER_API_TOKEN, EVENT_API_PORT
+from src.config import EVENT_MANAGER_API_TOKEN, EVENT_API_PORT, EVENT_QUEUE_MAX_DEPTH, EVENT_QUEUE_RETRY_AFTER
+from src.config import EVENT_BATCH_MAX_ITEMS, OUTBOX_MAX_AGE_HOURS, OUTBOX_REPLAY_CONCURRENCY
+from src.config import EVENT_IDEMPOTENCY_TTL, EVENT_IDEMPOTENCY_MAX_KEYS
+from src.delivery import Delivery, DeliveryQueue, QueueFull
+from src.message_packing import pack_messages
+from src.idempotency import IdempotencyCache
+from src import metrics
+from src.metrics import (DISCORD_SEND_SECONDS, HTTP_REQUEST_SECONDS, HTTP_REQUESTS, QUEUE_DEPTH,
+                         RateLimitCounter)
+from src.log_context import correlation_id, new_correlation_id
+from src.outbox import Outbox, find_delivered_message
 
 logger = logging.getLogger("EventBridge")
 
+BRIDGE_OUTBOX_FILE = "data/outbox/bridge.jsonl"  # Journal of accepted notifications not yet confirmed sent
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+# Send errors that no retry can fix: missing permissions, deleted channel
+TERMINAL_SEND_ERRORS = (discord.Forbidden, discord.NotFound)
+
+
+class NotificationError(Exception):
+    """Invalid notification payload; carries the HTTP status to report."""
+
+    def __init__(self, status, error):
+        super().__init__(error)
+        self.status = status
+        self.error = error
+
+@web.middleware
+async def metrics_middleware(request, handler):
+    """Records count and latency of every request; the route is the pattern, not the concrete path."""
+    resource = request.match_info.route.resource
+    route = resource.canonical if resource is not None else "unmatched"
+    status = 500
+    start = time.perf_counter()
+    try:
+        response = await handler(request)
+        status = response.status
+        return response
+    except web.HTTPException as ex:
+        status = ex.status
+        raise
+    finally:
+        HTTP_REQUESTS.labels(route, status).inc()
+        HTTP_REQUEST_SECONDS.labels(route, status).observe(time.perf_counter() - start)
+
+@web.middleware
+async def correlation_middleware(request, handler):
+    """Tags all log records of a request with its X-Request-ID (or a generated ID) and echoes it back."""
+    request_id = request.headers.get("X-Request-ID")
+    if request_id and len(request_id) <= 128:
+        correlation_id.set(request_id)
+    else:
+        request_id = new_correlation_id("req-")
+    response = await handler(request)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
 @web.middleware
 async def error_middleware(request, handler):
     """Middleware to handle protocol errors and invalid requests gracefully."""
@@ -17,68 +73,295 @@ async def error_middleware(request, handler):
         raise
     except Exception as e:
         # Log unexpected errors
-        logger.error(f"Unexpected error handling request from {request.remote}: {e}", exc_info=True)
+        logger.error("Unexpected error handling request from %s: %s", request.remote, e, exc_info=True)
         return web.json_response({"error": "Bad Request"}, status=400)
 
 class EventBridge(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.app = web.Application(middlewares=[error_middleware])
-        self.app.router.add_post('/api/notify', self.notify_handler)
+        self._app = None  # Built on first use (start_server), see app
+        self.queue = DeliveryQueue(self.deliver, max_depth=EVENT_QUEUE_MAX_DEPTH)
+        QUEUE_DEPTH.set_function(lambda: self.queue.depth)
+        self.rate_limit_counter = RateLimitCounter()
+        self.outbox = Outbox(BRIDGE_OUTBOX_FILE, max_age=OUTBOX_MAX_AGE_HOURS * 3600)
+        self.idempotency = IdempotencyCache(max_entries=EVENT_IDEMPOTENCY_MAX_KEYS, ttl=EVENT_IDEMPOTENCY_TTL)
+        self.replay_task = None
         self.runner = None
         self.site = None
 
-    async def notify_handler(self, request):
-        # Security check
+    @property
+    def app(self):
+        if self._app is None:
+            self._app = web.Application(middlewares=[metrics_middleware, correlation_middleware, error_middleware])
+            self._app.router.add_post('/api/notify', self.notify_handler)
+            self._app.router.add_post('/api/notify/batch', self.batch_notify_handler)
+            self._app.router.add_get('/api/notify/{delivery_id}', self.delivery_status_handler)
+            self._app.router.add_get('/metrics', self.metrics_handler)
+        return self._app
+
+    def is_authorized(self, request):
         auth_header = request.headers.get("Authorization")
         if auth_header != f"Bearer {EVENT_MANAGER_API_TOKEN}":
-            logger.warning(f"Unauthorized request from {request.remote}")
+            logger.warning("Unauthorized request from %s", request.remote, extra={"status": 401})
+            return False
+        return True
+
+    async def notify_handler(self, request):
+        """Validates a notification and queues it; the Discord send happens in the background."""
+        # Security check
+        if not self.is_authorized(request):
             return web.json_response({"error": "Unauthorized"}, status=401)
+        return await self.idempotent(request, self.accept_notification)
+
+    async def idempotent(self, request, handler):
+        """Runs ``handler(request)`` once per ``Idempotency-Key`` header value.
 
+        A retried request with a key that was already answered gets the stored
+        response (marked with ``Idempotent-Replayed: true``) without queueing
+        anything; a retry that arrives while the first request is still being
+        handled waits for its response. 5xx responses are not stored, so the
+        client can retry them. Requests without the header are handled as usual.
+        """
+        key = request.headers.get("Idempotency-Key")
+        if key is None:
+            return await handler(request)
+        if not key or len(key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+            return web.json_response({"error": f"Idempotency-Key must be 1-{MAX_IDEMPOTENCY_KEY_LENGTH} characters"}, status=400)
+
+        async def respond():
+            response = await handler(request)
+            return response.status, response.body, response.content_type, dict(response.headers)
+
+        (status, body, content_type, headers), replayed = await self.idempotency.run(
+            (request.path, key), respond, cacheable=lambda result: result[0] < 500)
+        if replayed:
+            logger.info("Returning stored response for Idempotency-Key %r (%s)", key, request.path, extra={"status": status})
+        response = web.Response(status=status, body=body, content_type=content_type)
+        for name, value in headers.items():
+            if name.lower() not in ("content-type", "content-length"):
+                response.headers[name] = value
+        if replayed:
+            response.headers["Idempotent-Replayed"] = "true"
+        return response
+
+    async def accept_notification(self, request):
         try:
             data = await request.json()
-            channel_id = data.get("channel_id")
-            message = data.get("message", "")
-            embed_data = data.get("embed")
-            role_id = data.get("role_id")
+            logger.info("Received notification request for channel %s", data.get("channel_id"),
+                        extra={"channel_id": data.get("channel_id")})
 
-            logger.info(f"Received notification request for channel {channel_id}")
+            try:
+                channel_id, message, embeds = self.parse_notification(data)
+            except NotificationError as e:
+                return web.json_response({"error": e.error}, status=e.status)
 
-            if not channel_id:
-                return web.json_response({"error": "channel_id is required"}, status=400)
+            try:
+                delivery = self.enqueue(channel_id, content=message, embeds=embeds)
+            except QueueFull:
+                logger.warning("Delivery queue full (%d pending), rejecting notification for channel %s",
+                               self.queue.depth, channel_id, extra={"channel_id": channel_id, "status": 503})
+                return self.queue_full_response()
+            # "Accepted" means journaled: wait for the fsync (in a worker thread, shared with concurrent requests)
+            await self.outbox.flush()
 
-            channel = self.bot.get_channel(int(channel_id))
-            if not channel:
-                logger.error(f"Channel {channel_id} not found")
-                return web.json_response({"error": "Channel not found"}, status=404)
+            logger.info("Notification %s queued for channel %s (queue depth: %d)", delivery.id, channel_id, self.queue.depth,
+                        extra={"channel_id": channel_id, "delivery_id": delivery.id, "status": 202})
+            return web.json_response({"status": "accepted", "delivery_id": delivery.id}, status=202)
 
-            # Prepend role ping if provided
-            if role_id:
-                message = f"<@&{role_id}> {message}"
+        except Exception as e:
+            logger.error("Error handling notification: %s", e, exc_info=True, extra={"status": 500})
+            return web.json_response({"error": "Internal Server Error"}, status=500)
 
-            embed = None
-            if embed_data:
-                embed = discord.Embed.from_dict(embed_data)
+    def parse_notification(self, data):
+        """Validates one notification object; returns (channel_id, content, embeds)."""
+        if not isinstance(data, dict):
+            raise NotificationError(400, "notification must be an object")
+        channel_id = data.get("channel_id")
+        message = data.get("message", "")
+        embed_data = data.get("embed")
+        role_id = data.get("role_id")
 
-            await channel.send(content=message, embed=embed)
-            logger.info(f"Notification sent to channel {channel_id}")
-            return web.json_response({"status": "ok", "message": "Notification sent"})
+        if not channel_id:
+            raise NotificationError(400, "channel_id is required")
+
+        channel_id = int(channel_id)
+        channel = self.bot.get_channel(channel_id)
+        if not channel:
+            logger.error("Channel %s not found", channel_id, extra={"channel_id": channel_id, "status": 404})
+            raise NotificationError(404, "Channel not found")
+
+        # Prepend role ping if provided
+        if role_id:
+            message = f"<@&{role_id}> {message}"
+
+        embeds = []
+        if embed_data:
+            embeds.append(discord.Embed.from_dict(embed_data))
+        return channel_id, message, embeds
+
+    def enqueue(self, channel_id, content, embeds):
+        """Queues a delivery and journals it, so it survives a restart before it is sent.
+
+        The journal write happens in the background; callers await outbox.flush() before confirming.
+        """
+        delivery = self.queue.submit(channel_id, content=content, embeds=embeds)
+        self.outbox.record_intent(f"bridge:{delivery.id}", "bridge", {
+            "delivery_id": delivery.id,
+            "channel_id": channel_id,
+            "content": content,
+            "embeds": [embed.to_dict() for embed in embeds],
+        })
+        return delivery
+
+    def queue_full_response(self):
+        return web.json_response({"error": "Delivery queue full"}, status=503,
+                                 headers={"Retry-After": str(EVENT_QUEUE_RETRY_AFTER)})
+
+    async def batch_notify_handler(self, request):
+        """Accepts many notifications at once and packs embeds for the same channel into shared messages.
+
+        Body: ``{"notifications": [...]}`` (or a bare list) of objects shaped like
+        /api/notify payloads. Items are grouped by channel; within a channel,
+        neighbouring items with the same message text and one embed each are sent
+        as one message with up to 10 embeds. Every item gets its own result, in request order.
+        """
+        if not self.is_authorized(request):
+            return web.json_response({"error": "Unauthorized"}, status=401)
+        return await self.idempotent(request, self.accept_batch)
+
+    async def accept_batch(self, request):
+        try:
+            data = await request.json()
+            items = data.get("notifications") if isinstance(data, dict) else data
+            if not isinstance(items, list) or not items:
+                return web.json_response({"error": "notifications must be a non-empty list"}, status=400)
+            if len(items) > EVENT_BATCH_MAX_ITEMS:
+                return web.json_response({"error": f"at most {EVENT_BATCH_MAX_ITEMS} notifications per batch"}, status=400)
+
+            logger.info("Received batch of %d notifications", len(items))
+            results = [None] * len(items)
+            by_channel = {}  # channel_id -> [(index, content, embeds)], insertion ordered
+            for index, item in enumerate(items):
+                try:
+                    channel_id, message, embeds = self.parse_notification(item)
+                except (NotificationError, ValueError, TypeError) as e:
+                    status = e.status if isinstance(e, NotificationError) else 400
+                    results[index] = {"index": index, "status": status, "error": getattr(e, "error", str(e))}
+                    continue
+                by_channel.setdefault(channel_id, []).append((index, message, embeds))
+
+            messages_queued = 0
+            for channel_id, entries in by_channel.items():
+                for group in pack_messages(entries):
+                    indices = [index for index, _, _ in group]
+                    embeds = [embed for _, _, item_embeds in group for embed in item_embeds]
+                    try:
+                        delivery = self.enqueue(channel_id, content=group[0][1], embeds=embeds)
+                    except QueueFull:
+                        for index in indices:
+                            results[index] = {"index": index, "status": 503, "error": "Delivery queue full"}
+                        continue
+                    messages_queued += 1
+                    for index in indices:
+                        results[index] = {"index": index, "status": 202, "delivery_id": delivery.id}
+
+            accepted = sum(1 for result in results if result["status"] == 202)
+            if accepted:
+                await self.outbox.flush()
+            logger.info("Batch: %d/%d notifications accepted as %d message(s) across %d channel(s)",
+                        accepted, len(items), messages_queued, len(by_channel))
+            if accepted:
+                return web.json_response({"status": "accepted", "results": results}, status=202)
+            if any(result["status"] == 503 for result in results):
+                return web.json_response({"error": "Delivery queue full", "results": results}, status=503,
+                                         headers={"Retry-After": str(EVENT_QUEUE_RETRY_AFTER)})
+            return web.json_response({"error": "No valid notifications", "results": results}, status=400)
 
         except Exception as e:
-            logger.error(f"Error handling notification: {e}", exc_info=True)
+            logger.error("Error handling notification batch: %s", e, exc_info=True, extra={"status": 500})
             return web.json_response({"error": "Internal Server Error"}, status=500)
 
+    async def delivery_status_handler(self, request):
+        if not self.is_authorized(request):
+            return web.json_response({"error": "Unauthorized"}, status=401)
+        delivery = self.queue.get(request.match_info["delivery_id"])
+        if delivery is None:
+            return web.json_response({"error": "Unknown delivery"}, status=404)
+        return web.json_response(delivery.to_dict())
+
+    async def metrics_handler(self, request):
+        """Prometheus text format. Unauthenticated, like most scrape targets; it exposes counts only."""
+        return web.Response(body=metrics.REGISTRY.render().encode(), headers={"Content-Type": metrics.CONTENT_TYPE})
+
+    async def deliver(self, delivery):
+        """Queue worker callback: performs the actual Discord send.
+
+        Deliveries that can never succeed (channel gone, Forbidden, NotFound)
+        are taken out of the outbox before the error is raised, so they are not
+        replayed on every restart.
+        """
+        channel = self.bot.get_channel(delivery.channel_id)
+        if not channel:
+            self.drop_undeliverable(delivery, "channel not found")
+            raise LookupError(f"Channel {delivery.channel_id} not found")
+        embeds = delivery.embeds
+        start = time.perf_counter()
+        try:
+            if len(embeds) > 1:
+                await channel.send(content=delivery.content, embeds=embeds)
+            else:
+                await channel.send(content=delivery.content, embed=embeds[0] if embeds else None)
+        except TERMINAL_SEND_ERRORS as e:
+            self.drop_undeliverable(delivery, e)
+            raise
+        DISCORD_SEND_SECONDS.labels(delivery.channel_id).observe(time.perf_counter() - start)
+        self.outbox.mark_done(f"bridge:{delivery.id}")
+        logger.info("Notification %s sent to channel %s", delivery.id, delivery.channel_id,
+                    extra={"channel_id": delivery.channel_id, "delivery_id": delivery.id})
+
+    def drop_undeliverable(self, delivery, reason):
+        self.outbox.mark_done(f"bridge:{delivery.id}")
+        logger.warning("Dropping notification %s for channel %s from the outbox: %s", delivery.id,
+                       delivery.channel_id, reason, extra={"channel_id": delivery.channel_id, "delivery_id": delivery.id})
+
+    async def replay_outbox(self):
+        """Delivers notifications that were accepted but not sent before the last shutdown."""
+        await self.bot.wait_until_ready()
+        new_correlation_id("replay-")
+
+        async def replay(record):
+            payload = record["payload"]
+            embeds = [discord.Embed.from_dict(data) for data in payload["embeds"]]
+            channel = self.bot.get_channel(payload["channel_id"])
+            # The previous attempt may have been sent right before the crash
+            if channel and await find_delivered_message(channel, record["ts"], payload["content"],
+                                                        [embed.title for embed in embeds], self.bot.user.id):
+                logger.info("Outbox notification %s was already delivered before restart", payload["delivery_id"])
+                return True
+            delivery = Delivery(payload["channel_id"], payload["content"], embeds, delivery_id=payload["delivery_id"])
+            await self.deliver(delivery)
+            return True
+
+        await self.outbox.replay(replay, concurrency=OUTBOX_REPLAY_CONCURRENCY)
+
     async def start_server(self):
         self.runner = web.AppRunner(self.app, access_log=logger)
         await self.runner.setup()
         self.site = web.TCPSite(self.runner, '0.0.0.0', EVENT_API_PORT)
         await self.site.start()
-        logger.info(f"Event Bridge API started on port {EVENT_API_PORT}")
+        logger.info("Event Bridge API started on port %d", EVENT_API_PORT)
 
     async def cog_load(self):
+        logging.getLogger("discord.http").addHandler(self.rate_limit_counter)
         await self.start_server()
+        self.replay_task = asyncio.create_task(self.replay_outbox())
 
     async def cog_unload(self):
+        if self.replay_task:
+            self.replay_task.cancel()
+        await self.queue.close()
+        await self.outbox.flush()
+        logging.getLogger("discord.http").removeHandler(self.rate_limit_counter)
         if self.site:
             await self.site.stop()
         if self.runner:
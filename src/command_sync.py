@@ -0,0 +1,68 @@
+import hashlib
+import json
+import logging
+import time
+
+import discord
+
+from src.storage import write_json_atomic
+
+logger = logging.getLogger("CommandSync")
+
+COMMAND_SYNC_STATE_FILE = "data/command_sync.json"  # {scope: hash of the last synced command tree}
+
+
+def command_tree_hash(tree, guild=None):
+    """Stable SHA-256 of the payload ``tree.sync(guild=guild)`` would upload.
+
+    Commands are sorted by type and name and keys are sorted, so the hash only
+    changes when the commands do. The discord.py version is included because
+    it shapes the payload.
+    """
+    payload = sorted((command.to_dict(tree) for command in tree.get_commands(guild=guild)),
+                     key=lambda data: (data.get("type", 1), data["name"]))
+    serialized = json.dumps({"discord.py": discord.__version__, "commands": payload},
+                            sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(serialized.encode()).hexdigest()
+
+
+def _load_state(path):
+    try:
+        with open(path, "r") as f:
+            state = json.load(f)
+        return state if isinstance(state, dict) else {}
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning("Could not read command sync state %s (%s), will sync", path, e)
+        return {}
+
+
+async def sync_commands(tree, guild_id=None, force=False, state_path=COMMAND_SYNC_STATE_FILE):
+    """Syncs application commands only if they changed since the last successful sync.
+
+    With ``guild_id`` the global commands are copied to that guild and synced
+    there, which takes effect immediately (for development). ``force`` syncs
+    regardless of the stored hash. Returns the number of synced commands, or
+    None if the sync was skipped.
+    """
+    start = time.perf_counter()
+    guild = discord.Object(id=guild_id) if guild_id else None
+    if guild:
+        tree.copy_global_to(guild=guild)
+    scope = f"guild:{guild_id}" if guild else "global"
+
+    state = _load_state(state_path)
+    tree_hash = command_tree_hash(tree, guild=guild)
+    if not force and state.get(scope) == tree_hash:
+        logger.info("Command tree unchanged (%s, sha256=%s), skipped sync in %.1fms",
+                    scope, tree_hash[:12], (time.perf_counter() - start) * 1000)
+        return None
+
+    reason = "forced" if force else ("changed" if scope in state else "first sync")
+    logger.info("Syncing commands with Discord (%s, %s)...", scope, reason)
+    synced = await tree.sync(guild=guild)
+    state[scope] = tree_hash
+    write_json_atomic(state_path, state, indent=2)
+    logger.info("Synced %d command(s) to %s in %.1fms", len(synced), scope, (time.perf_counter() - start) * 1000)
+    return len(synced)
@@ -9,6 +9,71 @@ TRAINING_API_TOKEN = os.getenv("TRAINING_API_TOKEN") # Bearer Token
 CPT_CHANNEL_ID = int(os.getenv("CPT_CHANNEL_ID", 0))
 EVENT_MANAGER_API_TOKEN = os.getenv("EVENT_MANAGER_API_TOKEN")
 EVENT_API_PORT = int(os.getenv("EVENT_API_PORT", 8081))
+# Serve the CPT feed from a local mock training API (src/mock_api.py) instead of TRAINING_API_URL
 USE_MOCK_API = os.getenv("USE_MOCK_API", "False").lower() == "true"
+MOCK_API_SCENARIO = os.getenv("MOCK_API_SCENARIO", "steady")  # Named scenario or comma-separated steps, one per request
+MOCK_API_CPTS = int(os.getenv("MOCK_API_CPTS", 1000))
+MOCK_API_PAGE_SIZE = int(os.getenv("MOCK_API_PAGE_SIZE", 0))  # 0 = one unpaginated response
+MOCK_API_DELAY = float(os.getenv("MOCK_API_DELAY", 5))  # seconds a "slow" response takes before and while sending
+MOCK_API_SEED = int(os.getenv("MOCK_API_SEED", 0))
+MOCK_API_TIME_SHIFT_HOURS = float(os.getenv("MOCK_API_TIME_SHIFT_HOURS", 0))  # shifts every generated CPT date
+MOCK_API_PORT = int(os.getenv("MOCK_API_PORT", 8082))
+# With USE_MOCK_API all CPT state (announced store, snapshot, outbox, message ids, payload dumps) lives here
+# instead of data/, so synthetic ids never suppress or trigger real notifications
+MOCK_STATE_DIR = os.getenv("MOCK_STATE_DIR", "data/mock")
+# Comma-separated position prefixes; supports wildcards ("EDMM_*_CTR") and exclusions ("!EDDM_DEL")
 FIR_PREFIXES = os.getenv("FIR_PREFIXES", "EDMM,EDDM,EDDN,ETSI,ETSL,ETSN,EDJA,EDMA,EDMO,EDMS,EDMT,EDMV,EDMY,EDDP,EDDC,EDDE").split(",")
 CPT_ROLE_ID = int(os.getenv("CPT_ROLE_ID", 0))
+
+# Training API HTTP client tuning (shared, pooled session in CPTChecker)
+TRAINING_API_CONN_LIMIT = int(os.getenv("TRAINING_API_CONN_LIMIT", 4))
+TRAINING_API_KEEPALIVE = float(os.getenv("TRAINING_API_KEEPALIVE", 300))  # seconds an idle connection is kept open
+TRAINING_API_DNS_TTL = int(os.getenv("TRAINING_API_DNS_TTL", 600))  # seconds DNS results are cached
+TRAINING_API_TIMEOUT = float(os.getenv("TRAINING_API_TIMEOUT", 30))  # total per-request timeout
+TRAINING_API_CONNECT_TIMEOUT = float(os.getenv("TRAINING_API_CONNECT_TIMEOUT", 10))
+TRAINING_API_MAX_PAGES = int(os.getenv("TRAINING_API_MAX_PAGES", 100))  # Pages followed for paginated responses
+# Parse the /cpts response incrementally instead of loading the whole body (for very large feeds)
+CPT_STREAM_PARSE = os.getenv("CPT_STREAM_PARSE", "False").lower() == "true"
+# How often the CPT feed is refreshed; notifications fire at their exact due time independently
+CPT_REFRESH_HOURS = float(os.getenv("CPT_REFRESH_HOURS", 3))
+# Due CPT notifications sent in parallel per run, and Discord's per-channel limit (messages per period in seconds)
+CPT_SEND_CONCURRENCY = int(os.getenv("CPT_SEND_CONCURRENCY", 5))
+DISCORD_CHANNEL_RATE_LIMIT = int(os.getenv("DISCORD_CHANNEL_RATE_LIMIT", 5))  # 0 disables the limiter
+DISCORD_CHANNEL_RATE_PERIOD = float(os.getenv("DISCORD_CHANNEL_RATE_PERIOD", 5))
+# Digest mode: due notifications of one type go out as few multi-embed messages with a single role ping;
+# beyond CPT_DIGEST_MAX_MESSAGES messages per type the rest is summarized in one list embed
+CPT_DIGEST_MODE = os.getenv("CPT_DIGEST_MODE", "False").lower() == "true"
+CPT_DIGEST_MAX_MESSAGES = int(os.getenv("CPT_DIGEST_MAX_MESSAGES", 3))
+# Edit in place: each CPT keeps one message (ids in data/cpt_messages.json) that is edited when its
+# stage or content changes; only a CPT without a posted message gets a new post and ping
+CPT_EDIT_IN_PLACE = os.getenv("CPT_EDIT_IN_PLACE", "False").lower() == "true"
+# Incremental refresh: only CPTs that were added, changed or became due since the previous fetch are evaluated
+# (not with CPT_STREAM_PARSE: the diff keeps every CPT in memory, streamed feeds are evaluated in full)
+CPT_INCREMENTAL = os.getenv("CPT_INCREMENTAL", "True").lower() == "true"
+# Persistence backend for announced CPTs: "json" (data/cpts.json) or "sqlite" (data/cpts.sqlite3, WAL mode)
+CPT_STORE_BACKEND = os.getenv("CPT_STORE_BACKEND", "json")
+CPT_STORE_PATH = os.getenv("CPT_STORE_PATH")  # Optional override of the backend's default file
+# Announced entries without an event date (old list format) are dropped after this many days; 0 keeps them forever
+CPT_LEGACY_TTL_DAYS = float(os.getenv("CPT_LEGACY_TTL_DAYS", 30))
+# Event Bridge delivery queue: max pending notifications, and Retry-After (seconds) sent with 503 when full
+EVENT_QUEUE_MAX_DEPTH = int(os.getenv("EVENT_QUEUE_MAX_DEPTH", 1000))
+EVENT_QUEUE_RETRY_AFTER = int(os.getenv("EVENT_QUEUE_RETRY_AFTER", 5))
+EVENT_BATCH_MAX_ITEMS = int(os.getenv("EVENT_BATCH_MAX_ITEMS", 100))  # Max notifications per /api/notify/batch call
+# Durable outbox (data/outbox/*.jsonl): undelivered notifications older than this are dropped on replay
+OUTBOX_MAX_AGE_HOURS = float(os.getenv("OUTBOX_MAX_AGE_HOURS", 24))
+OUTBOX_REPLAY_CONCURRENCY = int(os.getenv("OUTBOX_REPLAY_CONCURRENCY", 4))
+# Idempotency-Key handling on /api/notify: how long (seconds) and how many keys responses are remembered
+EVENT_IDEMPOTENCY_TTL = int(os.getenv("EVENT_IDEMPOTENCY_TTL", 24 * 3600))
+EVENT_IDEMPOTENCY_MAX_KEYS = int(os.getenv("EVENT_IDEMPOTENCY_MAX_KEYS", 10000))
+# Max log records waiting for the logging thread; records beyond this are dropped (and counted)
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+LOG_JSON = os.getenv("LOG_JSON", "False").lower() == "true"  # One JSON object per log line (file and console)
+# Raw Training API payload dumps (data/logs/payloads/); the main log only records size and SHA-256
+PAYLOAD_LOG_MAX_BYTES = int(os.getenv("PAYLOAD_LOG_MAX_BYTES", 1024 * 1024))  # bytes of the payload kept per dump
+PAYLOAD_LOG_EVERY = int(os.getenv("PAYLOAD_LOG_EVERY", 0))  # also dump every Nth payload (0 = only on change)
+PAYLOAD_LOG_ON_CHANGE = os.getenv("PAYLOAD_LOG_ON_CHANGE", "True").lower() == "true"
+PAYLOAD_LOG_GZIP = os.getenv("PAYLOAD_LOG_GZIP", "True").lower() == "true"
+PAYLOAD_LOG_KEEP = int(os.getenv("PAYLOAD_LOG_KEEP", 10))  # newest dump files kept
+# Application command sync: only when the command tree changed, unless forced; a guild ID syncs there instead (dev)
+COMMAND_SYNC_FORCE = os.getenv("COMMAND_SYNC_FORCE", "False").lower() == "true"
+COMMAND_SYNC_GUILD_ID = int(os.getenv("COMMAND_SYNC_GUILD_ID", 0))
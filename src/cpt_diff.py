@@ -0,0 +1,151 @@
+import hashlib
+import heapq
+import itertools
+import json
+
+
+def content_hash(cpt):
+    """Hash of a CPT record's fields, to tell changed records from unchanged ones.
+
+    Records hash over all their fields; hashes are only compared within one
+    process, so the per-process string hash seed does not matter. A field the
+    API sent as a list or object makes the record unhashable, so those fall
+    back to a digest of the record's JSON.
+    """
+    try:
+        return hash(cpt)
+    except TypeError:
+        serialized = json.dumps(cpt.to_dict(), sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.blake2b(serialized.encode(), digest_size=16).digest()
+
+
+class FeedDiff:
+    """Changes of one feed of CPT records against the previous one, built record by record (see CPTDiffer.begin).
+
+    add() returns "added", "changed" or "rescheduled" for records that need
+    evaluating (records without an id count as added: they cannot be indexed,
+    so they are evaluated every time) and None for the rest. finish() fills
+    ``removed``, ``cancelled`` (removed before their date) and ``newly_due``
+    and makes this feed the new snapshot; a diff that is never finished (e.g.
+    a run that raised part-way) leaves the snapshot as it was.
+    """
+
+    def __init__(self, differ, now):
+        self.differ = differ
+        self.now = now
+        self.added = []
+        self.changed = []  # (old, new)
+        self.rescheduled = []  # (old, new): changed records whose date moved
+        self.removed = []  # records of the previous feed that are gone
+        self.cancelled = []  # removed records whose date had not passed yet
+        self.newly_due = []  # unchanged records that reached a due time since the previous feed
+        self.unchanged = 0
+        self.duplicates = 0
+        self._seen = {}  # id -> (hash, cpt) of this feed
+        self._queued = set()  # ids already returned by add()
+
+    def add(self, cpt):
+        cpt_id = cpt.id
+        if cpt_id is None:
+            self.added.append(cpt)
+            return "added"
+        seen = self._seen
+        if cpt_id in seen:
+            # Duplicated feed entry: the first one is authoritative
+            self.duplicates += 1
+            return None
+
+        previous = self.differ.snapshot.get(cpt_id)
+        if previous is not None and previous[1] is cpt:
+            # Same object as last time (304 or snapshot fallback): nothing to hash
+            seen[cpt_id] = previous
+            self.unchanged += 1
+            return None
+        digest = content_hash(cpt)
+        seen[cpt_id] = (digest, cpt)
+        if previous is not None and previous[0] == digest:
+            self.unchanged += 1
+            return None
+
+        if previous is None:
+            kind = "added"
+            self.added.append(cpt)
+        else:
+            kind = "changed"
+            self.changed.append((previous[1], cpt))
+            if previous[1].date != cpt.date:
+                kind = "rescheduled"
+                self.rescheduled.append((previous[1], cpt))
+        self._queued.add(cpt_id)
+        self.differ.track(cpt_id, digest, cpt, self.now)
+        return kind
+
+    def finish(self):
+        differ = self.differ
+        known = self.unchanged + len(self.changed)
+        if known < len(differ.snapshot):
+            self.removed = [cpt for cpt_id, (_, cpt) in differ.snapshot.items() if cpt_id not in self._seen]
+            self.cancelled = [cpt for cpt in self.removed if self._upcoming(cpt)]
+        self.newly_due = differ.pop_due(self.now, self._seen, skip=self._queued)
+        differ.snapshot = self._seen
+        return self
+
+    def _upcoming(self, cpt):
+        return cpt.date is not None and cpt.date > self.now
+
+    def previous(self, cpt_id):
+        """The record ``cpt_id`` had in the previous feed, or None."""
+        entry = self.differ.snapshot.get(cpt_id)
+        return entry[1] if entry else None
+
+    @property
+    def count(self):
+        """Number of records that need evaluating."""
+        return len(self.added) + len(self.changed) + len(self.newly_due)
+
+
+class CPTDiffer:
+    """Keeps the last complete feed indexed by CPT id and diffs each new feed against it.
+
+    ``due_times(cpt)`` returns the times at which an unchanged CPT has to be
+    evaluated again (e.g. when a notification window opens). They are kept in
+    a heap, so finding the newly due records costs O(due), not O(feed).
+    """
+
+    def __init__(self, due_times=None):
+        self.snapshot = {}  # id (as in the feed) -> (hash, cpt)
+        self.due_times = due_times or (lambda cpt: ())
+        self._due = []  # heap of (time, seq, id, hash); entries of since-changed records are skipped on pop
+        self._seq = itertools.count()
+
+    def __len__(self):
+        return len(self.snapshot)
+
+    def begin(self, now):
+        return FeedDiff(self, now)
+
+    def diff(self, cpts, now):
+        """Diffs a complete feed and makes it the new snapshot."""
+        feed = self.begin(now)
+        for cpt in cpts:
+            feed.add(cpt)
+        return feed.finish()
+
+    def track(self, cpt_id, digest, cpt, now):
+        for due in self.due_times(cpt):
+            if due > now:
+                heapq.heappush(self._due, (due, next(self._seq), cpt_id, digest))
+
+    def pop_due(self, now, current, skip=()):
+        """Removes the due times up to ``now``; returns the records in ``current`` they still belong to."""
+        due = {}
+        while self._due and self._due[0][0] <= now:
+            _, _, cpt_id, digest = heapq.heappop(self._due)
+            entry = current.get(cpt_id)
+            if entry is not None and entry[0] == digest and cpt_id not in skip:
+                due[cpt_id] = entry[1]
+        return list(due.values())
+
+    def forget(self, cpt_id):
+        """Drops a record from the snapshot, so the next feed evaluates it again (e.g. after a failed send)."""
+        self.snapshot.pop(cpt_id, None)
@@ -0,0 +1,87 @@
+import hashlib
+import json
+import logging
+from datetime import datetime, timezone
+
+from src.storage import write_json_atomic
+
+logger = logging.getLogger("CPTMessages")
+
+CPT_MESSAGES_FILE = "data/cpt_messages.json"  # {cpt_id: posted notification message, see CPTMessageStore}
+
+
+def embed_hash(embed):
+    """SHA-256 of an embed's rendered payload; equal hashes mean an edit would change nothing."""
+    serialized = json.dumps(embed.to_dict(), sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(serialized.encode()).hexdigest()
+
+
+class CPTMessageStore:
+    """Remembers the Discord message posted for each CPT, so later changes edit it instead of posting again.
+
+    Entries are ``{cpt_id: {"message_id", "hash", "title", "date"}}``: ``hash``
+    is the embed_hash of what the message currently shows, ``title`` its title
+    prefix and ``date`` the CPT date, used to expire the entry. The file is
+    loaded on first use and rewritten atomically by save() when something changed.
+    """
+
+    def __init__(self, path=CPT_MESSAGES_FILE):
+        self.path = path
+        self._entries = None
+        self._dirty = False
+
+    @property
+    def entries(self):
+        if self._entries is None:
+            self._entries = self._load()
+        return self._entries
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning("Could not read %s (%s), starting without tracked messages", self.path, e)
+            return {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, cpt_id):
+        return self.entries.get(str(cpt_id))
+
+    def record(self, cpt_id, message_id, digest, title, date):
+        self.entries[str(cpt_id)] = {"message_id": message_id, "hash": digest, "title": title, "date": date}
+        self._dirty = True
+
+    def remove(self, cpt_id):
+        if self.entries.pop(str(cpt_id), None) is not None:
+            self._dirty = True
+
+    def remove_expired(self, cutoff):
+        """Forgets messages of CPTs dated before ``cutoff``; returns how many were removed."""
+        expired = []
+        for cpt_id, entry in self.entries.items():
+            try:
+                date = datetime.fromisoformat(entry["date"])
+            except (KeyError, TypeError, ValueError):
+                expired.append(cpt_id)
+                continue
+            if date.tzinfo is None:
+                date = date.replace(tzinfo=timezone.utc)
+            if date < cutoff:
+                expired.append(cpt_id)
+        for cpt_id in expired:
+            del self.entries[cpt_id]
+        if expired:
+            self._dirty = True
+        return len(expired)
+
+    def save(self):
+        if not self._dirty:
+            return
+        write_json_atomic(self.path, self.entries, indent=2)
+        self._dirty = False
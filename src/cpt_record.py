@@ -0,0 +1,72 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+
+@dataclass(slots=True, unsafe_hash=True)
+class CPT:
+    """One CPT from the training API, parsed and validated once when it is fetched.
+
+    ``date`` is the parsed, timezone-aware date (naive dates are taken as UTC)
+    or None if the API sent none or an unparseable one; ``raw_date`` then keeps
+    what was sent, for the log. ``in_fir`` is the FIRMatcher verdict for
+    ``position``. Records are treated as immutable after parsing: the feed
+    diff uses their hash as content hash (see cpt_diff.content_hash for
+    records with list/object fields). Not ``frozen=True``, which makes
+    construction about 6x slower.
+    """
+
+    id: object
+    position: str
+    date: datetime | None
+    in_fir: bool = False
+    confirmed: bool = False
+    course_name: str | None = None
+    trainee_name: str | None = None
+    trainee_vatsim_id: int | None = None
+    local_name: str | None = None
+    raw_date: str | None = None
+
+    @classmethod
+    def from_api(cls, data, fir_matcher=None):
+        """Parses one entry of the API's ``data`` list."""
+        position = data.get("position") or ""
+        raw_date = data.get("date")
+        date = None
+        if raw_date:
+            try:
+                date = datetime.fromisoformat(raw_date)
+            except (TypeError, ValueError):
+                pass
+            else:
+                if date.tzinfo is None:
+                    date = date.replace(tzinfo=timezone.utc)
+        return cls(
+            data.get("id"),
+            position,
+            date,
+            fir_matcher.matches(position) if fir_matcher else False,
+            bool(data.get("confirmed", False)),
+            data.get("course_name"),
+            data.get("trainee_name"),
+            data.get("trainee_vatsim_id"),
+            data.get("local_name"),
+            raw_date if date is None else None,
+        )
+
+    @property
+    def date_str(self):
+        """ISO date as stored with announced keys, or the invalid value that was received."""
+        return self.date.isoformat() if self.date is not None else self.raw_date
+
+    def to_dict(self):
+        """The record in the training API's schema, for the outbox journal and the snapshot file."""
+        return {
+            "id": self.id,
+            "position": self.position,
+            "date": self.date_str,
+            "confirmed": self.confirmed,
+            "course_name": self.course_name,
+            "trainee_name": self.trainee_name,
+            "trainee_vatsim_id": self.trainee_vatsim_id,
+            "local_name": self.local_name,
+        }
@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+
+from src.log_context import correlation_id
+
+logger = logging.getLogger("DeliveryQueue")
+
+
+class QueueFull(Exception):
+    """Raised by DeliveryQueue.submit when the configured maximum depth is reached."""
+
+
+class Delivery:
+    """One message waiting for (or done with) its trip to Discord."""
+
+    __slots__ = ("id", "channel_id", "content", "embeds", "status", "error", "created_at", "completed_at",
+                 "correlation_id")
+
+    def __init__(self, channel_id, content=None, embeds=None, delivery_id=None):
+        self.id = delivery_id or uuid.uuid4().hex
+        self.channel_id = channel_id
+        self.content = content
+        self.embeds = embeds or []
+        self.status = "queued"  # queued -> sending -> sent | failed
+        self.error = None
+        self.created_at = time.time()
+        self.completed_at = None
+        self.correlation_id = correlation_id.get()  # ID of the request that submitted it, for the worker's logs
+
+    def to_dict(self):
+        return {
+            "delivery_id": self.id,
+            "channel_id": str(self.channel_id),
+            "status": self.status,
+            "error": self.error,
+            "created_at": self.created_at,
+            "completed_at": self.completed_at,
+        }
+
+
+class DeliveryQueue:
+    """Bounded in-process queue with one worker lane per channel.
+
+    Messages for the same channel are sent in order by a single worker, so a
+    rate-limited channel (discord.py sleeps through 429s inside ``send``) only
+    delays its own lane. Lanes are created on demand and exit after
+    ``idle_timeout`` seconds without work. The most recent ``history_size``
+    deliveries stay available for status lookups.
+    """
+
+    def __init__(self, send, max_depth=1000, history_size=10000, idle_timeout=60):
+        self._send = send  # async callable(delivery); raising marks the delivery as failed
+        self.max_depth = max_depth
+        self.history_size = history_size
+        self.idle_timeout = idle_timeout
+        self._lanes = {}  # channel_id -> asyncio.Queue
+        self._workers = {}  # channel_id -> asyncio.Task
+        self._deliveries = OrderedDict()  # delivery_id -> Delivery
+        self._depth = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    @property
+    def depth(self):
+        """Number of deliveries that are queued or currently being sent."""
+        return self._depth
+
+    def submit(self, channel_id, content=None, embeds=None, delivery_id=None):
+        if self._depth >= self.max_depth:
+            raise QueueFull(f"Delivery queue is full ({self.max_depth} pending)")
+
+        delivery = Delivery(channel_id, content, embeds, delivery_id)
+        self._remember(delivery)
+        self._depth += 1
+        self._idle.clear()
+
+        lane = self._lanes.get(channel_id)
+        if lane is None:
+            lane = self._lanes[channel_id] = asyncio.Queue()
+            self._workers[channel_id] = asyncio.create_task(self._worker(channel_id, lane))
+        lane.put_nowait(delivery)
+        return delivery
+
+    def get(self, delivery_id):
+        return self._deliveries.get(delivery_id)
+
+    def _remember(self, delivery):
+        self._deliveries[delivery.id] = delivery
+        while len(self._deliveries) > self.history_size:
+            self._deliveries.popitem(last=False)
+
+    async def join(self):
+        """Waits until every submitted delivery has been sent or has failed."""
+        await self._idle.wait()
+
+    async def close(self):
+        for worker in self._workers.values():
+            worker.cancel()
+        await asyncio.gather(*self._workers.values(), return_exceptions=True)
+        self._workers.clear()
+        self._lanes.clear()
+
+    async def _worker(self, channel_id, lane):
+        try:
+            while True:
+                try:
+                    delivery = await asyncio.wait_for(lane.get(), timeout=self.idle_timeout)
+                except asyncio.TimeoutError:
+                    if lane.empty():
+                        return
+                    continue
+                await self._deliver(delivery)
+        finally:
+            if self._lanes.get(channel_id) is lane:
+                del self._lanes[channel_id]
+                del self._workers[channel_id]
+
+    async def _deliver(self, delivery):
+        # Workers outlive requests; log under the ID of the request that queued this delivery
+        correlation_id.set(delivery.correlation_id)
+        delivery.status = "sending"
+        try:
+            await self._send(delivery)
+            delivery.status = "sent"
+        except Exception as e:
+            delivery.status = "failed"
+            delivery.error = str(e)
+            logger.error("Delivery %s to channel %s failed: %s", delivery.id, delivery.channel_id, e, exc_info=True,
+                         extra={"channel_id": delivery.channel_id, "delivery_id": delivery.id})
+        finally:
+            delivery.completed_at = time.time()
+            self._depth -= 1
+            if self._depth == 0:
+                self._idle.set()
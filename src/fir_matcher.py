@@ -0,0 +1,53 @@
+import re
+
+
+class FIRMatcher:
+    """Decides whether a position belongs to the FIR, built once from the FIR_PREFIXES patterns.
+
+    Pattern syntax (all patterns match at the start of the position):
+      - ``EDMM``         plain prefix
+      - ``EDMM_*_CTR``   ``*`` matches any run of characters
+      - ``!EDDM_DEL``    exclusion; wins over every include pattern
+
+    Plain prefixes are checked with a single ``str.startswith(tuple)`` call,
+    wildcard and exclusion patterns with one compiled alternation each, so the
+    cost per position does not grow with the number of Python-level patterns.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = [p.strip() for p in patterns if p and p.strip()]
+        prefixes = []
+        wildcards = []
+        exclusions = []
+        for pattern in self.patterns:
+            if pattern.startswith("!"):
+                exclusions.append(pattern[1:])
+            elif "*" in pattern:
+                wildcards.append(pattern)
+            else:
+                prefixes.append(pattern)
+
+        self._prefixes = tuple(prefixes)
+        self._include_re = self._compile(wildcards)
+        self._exclude_re = self._compile(exclusions)
+
+    @staticmethod
+    def _compile(patterns):
+        if not patterns:
+            return None
+        alternation = "|".join(".*".join(re.escape(part) for part in p.split("*")) for p in patterns)
+        return re.compile(f"(?:{alternation})")
+
+    def matches(self, position):
+        if not position:
+            return False
+        if self._exclude_re is not None and self._exclude_re.match(position):
+            return False
+        if position.startswith(self._prefixes):
+            return True
+        return self._include_re is not None and self._include_re.match(position) is not None
+
+    __call__ = matches
+
+    def __repr__(self):
+        return f"FIRMatcher({self.patterns!r})"
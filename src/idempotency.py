@@ -0,0 +1,71 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+_FAILED = object()  # in-flight result marker: the first attempt raised, waiters retry themselves
+
+
+class IdempotencyCache:
+    """Bounded LRU cache of results keyed by client-supplied idempotency keys.
+
+    ``run(key, func)`` calls ``func`` at most once per key within ``ttl``
+    seconds: later calls get the stored result, and calls that arrive while the
+    first one is still running wait for it instead of starting their own.
+    Results for which ``cacheable(result)`` is false are handed to the waiters
+    but not stored, so a later retry runs again. Once ``max_entries`` is
+    reached the least recently used key is evicted.
+    """
+
+    def __init__(self, max_entries=10000, ttl=24 * 3600, timer=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._timer = timer
+        self._entries = OrderedDict()  # key -> (expires_at, result)
+        self._in_flight = {}  # key -> asyncio.Future
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Stored result for ``key`` or None if unknown or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= self._timer():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key, result):
+        self._entries[key] = (self._timer() + self.ttl, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def run(self, key, func, cacheable=None):
+        """Returns ``(result, replayed)``; ``replayed`` is True if ``func`` was not called for this request."""
+        while True:
+            result = self.get(key)
+            if result is not None:
+                return result, True
+
+            future = self._in_flight.get(key)
+            if future is None:
+                break
+            # shield: a waiter that gets cancelled must not cancel the shared future
+            result = await asyncio.shield(future)
+            if result is not _FAILED:
+                return result, True
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        result = _FAILED
+        try:
+            result = await func()
+            if cacheable is None or cacheable(result):
+                self.put(key, result)
+            return result, False
+        finally:
+            del self._in_flight[key]
+            future.set_result(result)
@@ -0,0 +1,106 @@
+import codecs
+import json
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+class _Buffer:
+    """Text buffer fed from an async iterator of byte chunks."""
+
+    def __init__(self, chunks):
+        self._chunks = chunks.__aiter__()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    async def fill(self):
+        """Reads one more chunk. Returns False once the input is exhausted."""
+        if self.eof:
+            return False
+        # Drop consumed text so the buffer only ever holds the unparsed tail
+        if self.pos:
+            self.text = self.text[self.pos:]
+            self.pos = 0
+        try:
+            chunk = await self._chunks.__anext__()
+        except StopAsyncIteration:
+            self.eof = True
+            self.text += self._utf8.decode(b"", final=True)
+            return False
+        self.text += self._utf8.decode(chunk)
+        return True
+
+    async def peek(self):
+        """Skips whitespace and returns the next character ('' at end of input)."""
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not await self.fill():
+                return ""
+
+    async def expect(self, chars):
+        char = await self.peek()
+        if char == "" or char not in chars:
+            raise ValueError(f"Expected one of {chars!r} at offset {self.pos}, got {char!r}")
+        self.pos += 1
+        return char
+
+    async def value(self):
+        """Decodes one complete JSON value, reading more input as needed."""
+        await self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.text, self.pos)
+                # A number at the very end of the buffer may continue in the next chunk
+                if end < len(self.text) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            await self.fill()
+
+
+async def iter_json_array(chunks, key="data", rest=None):
+    """Yields the items of the array stored under ``key`` in a top-level JSON object.
+
+    ``chunks`` is an async iterable of bytes (e.g. ``response.content.iter_chunked(n)``).
+    Only the item currently being decoded is held in memory, so memory use does
+    not grow with the length of the array. Other top-level values are decoded and
+    discarded, or stored in the ``rest`` dict if one is given; the input is then
+    read to the end, so members after the array (such as pagination ``links``)
+    are included. Raises ``ValueError`` on malformed or truncated input.
+    """
+    buf = _Buffer(chunks)
+    await buf.expect("{")
+    if await buf.peek() == "}":
+        return
+    while True:
+        name = await buf.value()
+        await buf.expect(":")
+        if name == key:
+            break
+        value = await buf.value()
+        if rest is not None:
+            rest[name] = value
+        if await buf.expect(",}") == "}":
+            return
+
+    await buf.expect("[")
+    if await buf.peek() == "]":
+        await buf.expect("]")
+    else:
+        while True:
+            yield await buf.value()
+            if await buf.expect(",]") == "]":
+                break
+    if rest is None:
+        return
+    while await buf.expect(",}") == ",":
+        name = await buf.value()
+        await buf.expect(":")
+        rest[name] = await buf.value()
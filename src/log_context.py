@@ -0,0 +1,26 @@
+import logging
+import uuid
+from contextvars import ContextVar
+
+# ID shared by all log records of one CPT check run or one bridge request
+correlation_id = ContextVar("correlation_id", default=None)
+
+
+def new_correlation_id(prefix=""):
+    """Sets and returns a fresh correlation ID for the current context (task)."""
+    value = prefix + uuid.uuid4().hex[:12]
+    correlation_id.set(value)
+    return value
+
+
+class CorrelationIdFilter(logging.Filter):
+    """Stamps ``record.correlation_id`` from the contextvar.
+
+    Must be attached to a handler that runs in the thread that logged (the
+    QueueHandler), because the contextvar is not visible to the writer thread.
+    """
+
+    def filter(self, record):
+        if not hasattr(record, "correlation_id"):
+            record.correlation_id = correlation_id.get()
+        return True
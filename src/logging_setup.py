@@ -0,0 +1,139 @@
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from src.log_context import CorrelationIdFilter
+from src.metrics import Counter
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+LOG_RECORDS_DROPPED = Counter("log_records_dropped_total", "Log records dropped because the logging queue was full")
+
+# Attributes every LogRecord has; anything else on a record came in through extra=
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, message, correlation_id and all ``extra=`` fields."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and value is not None:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler with a size limit that drops records instead of blocking the caller.
+
+    Uses a ``queue.SimpleQueue``: its put is a single C call without the
+    Python-level mutex of ``queue.Queue``, so the event loop never waits on a
+    lock held by the writer thread. The limit is checked with ``qsize()``; the
+    writer only ever shrinks the queue, so it can't be exceeded. Dropped
+    records are counted, and the next record that fits is preceded by a
+    warning with the number lost in between.
+    """
+
+    def __init__(self, log_queue, max_size):
+        super().__init__(log_queue)
+        self.max_size = max_size
+        self.dropped = 0  # Total since startup
+        self._unreported = 0
+        self.formatter_for_exc = logging.Formatter()
+
+    def prepare(self, record):
+        # Like QueueHandler.prepare, but the traceback stays out of the message,
+        # so JsonFormatter can put it in its own field. Only runs for records
+        # that passed the level check; %-args of suppressed records are never formatted.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = self.formatter_for_exc.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        if self.queue.qsize() >= self.max_size - (1 if self._unreported else 0):
+            self.dropped += 1
+            self._unreported += 1
+            LOG_RECORDS_DROPPED.inc()
+            return
+        if self._unreported:
+            self.queue.put(logging.LogRecord("Logging", logging.WARNING, __file__, 0,
+                                             f"Logging queue was full, dropped {self._unreported} record(s)", None, None))
+            self._unreported = 0
+        self.queue.put(record)
+
+
+def setup_logging(log_dir="data/logs", level=logging.INFO, queue_size=10000, console_stream=None, json_format=False):
+    """Routes all logging through a size-limited queue to a background thread.
+
+    The root logger only gets a DroppingQueueHandler; the rotating file handler
+    (``log_dir``/bot.log) and the console handler are owned by a QueueListener
+    thread, so a log call on the event loop never waits for disk or terminal
+    I/O. With ``json_format`` both handlers write JSON lines (JsonFormatter)
+    instead of plain text. Calling it again replaces the previous setup.
+    Returns the listener.
+    """
+    global _listener
+    shutdown_logging()
+
+    os.makedirs(log_dir, exist_ok=True)
+    formatter = JsonFormatter() if json_format else logging.Formatter(LOG_FORMAT)
+
+    file_handler = RotatingFileHandler(os.path.join(log_dir, "bot.log"), maxBytes=5*1024*1024, backupCount=5)
+    file_handler.setFormatter(formatter)
+    file_handler.setLevel(level)
+
+    console_handler = logging.StreamHandler(console_stream or sys.stderr)
+    console_handler.setFormatter(formatter)
+    console_handler.setLevel(level)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = DroppingQueueHandler(log_queue, queue_size)
+    # Runs on the logging thread, where the correlation ID contextvar is visible
+    queue_handler.addFilter(CorrelationIdFilter())
+
+    root_logger = logging.getLogger()
+    root_logger.setLevel(level)
+    root_logger.addHandler(queue_handler)
+
+    _listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    _listener.queue_handler = queue_handler
+    _listener.start()
+    return _listener
+
+
+def shutdown_logging():
+    """Writes out everything still queued, then closes the file and console handlers."""
+    global _listener
+    if _listener is None:
+        return
+    listener, _listener = _listener, None
+    logging.getLogger().removeHandler(listener.queue_handler)
+    listener.stop()
+    for handler in listener.handlers:
+        handler.flush()
+        handler.close()
+
+
+atexit.register(shutdown_logging)
@@ -7,13 +7,21 @@ import os
 if __name__ == "__main__" and __package__ is None:
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+# STARTUP_PROFILE is read from the process environment: .env is only loaded by src.config
+from src import startup_profile
+if startup_profile.profiling_enabled():
+    startup_profile.start_profiling()
+
 from src.bot import EventManagerBot
 from src.config import DISCORD_TOKEN
 
+startup_profile.mark("imports")
+
 if __name__ == "__main__":
     if not DISCORD_TOKEN:
         logging.error("DISCORD_TOKEN not found in environment variables.")
         exit(1)
 
     bot = EventManagerBot()
-    bot.run(DISCORD_TOKEN)
+    # log_handler=None: logging is already set up (queued) in src.bot; discord.py would add a blocking console handler
+    bot.run(DISCORD_TOKEN, log_handler=None)
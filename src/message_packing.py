@@ -0,0 +1,34 @@
+# Discord limits for a single message
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+
+
+def pack_messages(entries):
+    """Splits one channel's [(id, content, embeds)] into message groups, preserving order.
+
+    Items are merged only if each carries exactly one embed, they share the
+    same message text, and Discord's 10-embed / 6000-character limits hold.
+    """
+    groups = []
+    current = []
+    current_chars = 0
+    for entry in entries:
+        _, content, embeds = entry
+        packable = len(embeds) == 1
+        chars = len(embeds[0]) if packable else 0
+        if (packable and current and current[0][1] == content
+                and len(current) < MAX_EMBEDS_PER_MESSAGE
+                and current_chars + chars <= MAX_EMBED_CHARS_PER_MESSAGE):
+            current.append(entry)
+            current_chars += chars
+            continue
+        if current:
+            groups.append(current)
+        if packable:
+            current, current_chars = [entry], chars
+        else:
+            groups.append([entry])
+            current, current_chars = [], 0
+    if current:
+        groups.append(current)
+    return groups
@@ -0,0 +1,228 @@
+import logging
+import math
+from bisect import bisect_left
+
+# Prometheus text exposition format, version 0.0.4
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Registry:
+    """Collection of metrics rendered together by /metrics."""
+
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Metric:
+    """Base class for a metric family.
+
+    Children are looked up by the tuple of raw label values, so the hot path is a
+    dict lookup and an add; label values are only turned into strings when the
+    registry is rendered. Everything runs on the bot's event loop, so no locks.
+    """
+
+    type = "untyped"
+
+    def __init__(self, name, documentation, labelnames=(), registry=REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        if registry is not None:
+            registry.register(self)
+
+    def labels(self, *values):
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            child = self._children[values] = self._new_child()
+        return child
+
+    def _default(self):
+        if self.labelnames:
+            raise ValueError(f"{self.name} has labels {self.labelnames}; use .labels(...)")
+        return self.labels()
+
+    def _label_str(self, values, extra=""):
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def samples(self):
+        for values, child in self._children.items():
+            yield f"{self.name}{self._label_str(values)} {_format_value(child.get())}"
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def get(self):
+        return self.value
+
+
+class _GaugeValue(_Value):
+    __slots__ = ("function",)
+
+    def __init__(self):
+        super().__init__()
+        self.function = None
+
+    def set(self, value):
+        self.value = value
+
+    def dec(self, amount=1):
+        self.value -= amount
+
+    def set_function(self, function):
+        self.function = function
+
+    def get(self):
+        return self.function() if self.function is not None else self.value
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount=1):
+        self._default().inc(amount)
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def _new_child(self):
+        return _GaugeValue()
+
+    def set(self, value):
+        self._default().set(value)
+
+    def inc(self, amount=1):
+        self._default().inc(amount)
+
+    def dec(self, amount=1):
+        self._default().dec(amount)
+
+    def set_function(self, function):
+        """Computes the value at scrape time, e.g. ``lambda: queue.depth``."""
+        self._default().set_function(function)
+
+
+class _HistogramValue:
+    __slots__ = ("buckets", "counts", "sum")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS, registry=REGISTRY):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value):
+        self._default().observe(value)
+
+    def samples(self):
+        for values, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), child.counts):
+                cumulative += count
+                le = 'le="' + _format_value(float(bound)) + '"'
+                yield f"{self.name}_bucket{self._label_str(values, le)} {cumulative}"
+            labels = self._label_str(values)
+            yield f"{self.name}_sum{labels} {_format_value(child.sum)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+# Shared by both cogs: every message the bot posts
+DISCORD_SEND_SECONDS = Histogram(
+    "discord_send_duration_seconds", "Time spent in channel.send, per channel", ["channel_id"])
+DISCORD_RATE_LIMITS = Counter(
+    "discord_rate_limit_hits_total", "429 responses reported by discord.py, by scope", ["scope"])
+
+# The cogs' metrics live here rather than in the cog modules: reload_extension re-executes a cog
+# module, and registering its metrics a second time would fail
+FETCH_SECONDS = Histogram("cpt_fetch_duration_seconds", "Training API fetch time, by result", ["result"],
+                          buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0))
+FETCH_BYTES = Gauge("cpt_fetch_payload_bytes", "Body size of the last Training API response")
+CPTS_TOTAL = Counter("cpt_checker_cpts_total", "CPTs seen by process_cpts, by outcome", ["outcome"])
+ANNOUNCED_ENTRIES = Gauge("cpt_announced_entries", "Entries in the announced-notification store")
+FEED_CHANGES_TOTAL = Counter("cpt_feed_changes_total", "Records found by the feed diff, by kind", ["kind"])
+
+HTTP_REQUESTS = Counter("event_bridge_requests_total", "HTTP requests handled, by route and status", ["route", "status"])
+HTTP_REQUEST_SECONDS = Histogram(
+    "event_bridge_request_duration_seconds", "HTTP request latency, by route and status", ["route", "status"])
+QUEUE_DEPTH = Gauge("event_bridge_queue_depth", "Deliveries queued or being sent")
+
+
+class RateLimitCounter(logging.Handler):
+    """Counts rate-limit warnings emitted by the ``discord.http`` logger.
+
+    discord.py handles 429s internally (it sleeps and retries) and only logs
+    them, so its log records are the one place they can be observed. Only the
+    unformatted message template is inspected.
+    """
+
+    def __init__(self, counter=DISCORD_RATE_LIMITS):
+        super().__init__(level=logging.WARNING)
+        self.counter = counter
+
+    def emit(self, record):
+        if not isinstance(record.msg, str):
+            return
+        if record.msg.startswith("We are being rate limited"):
+            self.counter.labels("route").inc()
+        elif record.msg.startswith("Global rate limit has been hit"):
+            self.counter.labels("global").inc()
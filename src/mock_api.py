@@ -0,0 +1,181 @@
+"""Local stand-in for the training API, for load and soak tests of the CPT checker.
+
+Serves a SyntheticFeed at ``/cpts`` and follows a script: one step per
+request, repeating the script when it runs out. Steps:
+
+  ok         200 with the feed (304 if If-None-Match matches the current ETag)
+  slow       like ok, but waits ``delay`` seconds and trickles the body in chunks
+  error      ``error_status`` (503) with a short error body
+  truncated  200 whose body is cut off halfway through the JSON
+  change     regenerates the feed (new ETag), then behaves like ok
+
+With ``page_size`` the feed is paginated Laravel-style (``?page=N``,
+``links.next``, ``meta``). CPT dates are relative to ``clock.now()`` plus
+``time_shift`` at the time the feed is (re)generated. POST
+/_mock/advance?seconds=N moves a ManualClock (shared with the checker in
+tests) so existing CPTs move towards their notification windows. GET
+/_mock/stats returns request counts.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+from collections import Counter
+from datetime import timedelta
+from email.utils import format_datetime
+
+from aiohttp import web
+
+from src.clock import ManualClock, SystemClock
+from src.synthetic_feed import SyntheticFeed
+
+logger = logging.getLogger("MockTrainingAPI")
+
+STEPS = ("ok", "slow", "error", "truncated", "change")
+
+# Named scripts for MOCK_API_SCENARIO; anything else is read as a comma-separated list of steps
+SCENARIOS = {
+    "steady": ["ok"],
+    "slow": ["slow"],
+    "flaky": ["ok", "ok", "error", "error", "error"],
+    "truncated": ["ok", "truncated"],
+    "churn": ["ok", "ok", "change"],
+    "chaos": ["ok", "slow", "error", "error", "truncated", "change"],
+}
+
+
+def parse_script(scenario):
+    """Returns the list of steps for a scenario name or a comma-separated step list."""
+    if scenario in SCENARIOS:
+        return list(SCENARIOS[scenario])
+    steps = [step.strip() for step in (scenario or "ok").split(",") if step.strip()]
+    unknown = [step for step in steps if step not in STEPS]
+    if unknown or not steps:
+        raise ValueError(f"Unknown mock API scenario {scenario!r} (named: {', '.join(SCENARIOS)}; steps: {', '.join(STEPS)})")
+    return steps
+
+
+class MockTrainingAPI:
+    def __init__(self, script=("ok",), count=1000, seed=0, page_size=0, delay=5.0, error_status=503,
+                 time_shift=timedelta(0), clock=None):
+        self.script = list(script)
+        self.count = count
+        self.seed = seed
+        self.page_size = page_size
+        self.delay = delay
+        self.error_status = error_status
+        self.time_shift = time_shift
+        self.clock = clock or SystemClock()
+        self.version = 0
+        self.requests = 0
+        self.responses = Counter()  # step or status -> count
+        self._cpts = None
+        self._bodies = {}  # page -> encoded body of the current version
+        self.etag = None
+        self.last_modified = None
+        self.runner = None
+        self.url = None
+
+        self.app = web.Application()
+        self.app.router.add_get("/cpts", self.cpts_handler)
+        self.app.router.add_post("/_mock/advance", self.advance_handler)
+        self.app.router.add_get("/_mock/stats", self.stats_handler)
+
+    @property
+    def cpts(self):
+        if self._cpts is None:
+            self.regenerate()
+        return self._cpts
+
+    def regenerate(self):
+        """Builds the next version of the feed, dated relative to the clock."""
+        now = self.clock.now() + self.time_shift
+        self._cpts = list(SyntheticFeed(seed=self.seed + self.version, now=now).generate(self.count))
+        self._bodies = {}
+        self.etag = f'"v{self.version}-{hashlib.sha256(str(now).encode()).hexdigest()[:12]}"'
+        self.last_modified = format_datetime(self.clock.now().replace(microsecond=0), usegmt=True)
+        self.version += 1
+
+    def body(self, request, page):
+        if page not in self._bodies:
+            if not self.page_size:
+                document = {"data": self.cpts}
+            else:
+                last_page = max(1, -(-len(self.cpts) // self.page_size))
+                start = (page - 1) * self.page_size
+                next_url = str(request.url.with_query(page=page + 1)) if page < last_page else None
+                document = {
+                    "data": self.cpts[start:start + self.page_size],
+                    "links": {"next": next_url},
+                    "meta": {"current_page": page, "last_page": last_page, "per_page": self.page_size,
+                             "total": len(self.cpts)},
+                }
+            self._bodies[page] = json.dumps(document).encode()
+        return self._bodies[page]
+
+    async def cpts_handler(self, request):
+        step = self.script[self.requests % len(self.script)]
+        self.requests += 1
+        if step == "error":
+            self.responses[self.error_status] += 1
+            return web.json_response({"message": "Service Unavailable"}, status=self.error_status)
+        if step == "change":
+            self.regenerate()
+
+        try:
+            page = int(request.query.get("page", 1))
+        except ValueError:
+            page = 1
+        body = self.body(request, page)
+        if request.headers.get("If-None-Match") == self.etag and step != "truncated":
+            self.responses[304] += 1
+            return web.Response(status=304, headers={"ETag": self.etag})
+
+        self.responses[step] += 1
+        headers = {"ETag": self.etag, "Last-Modified": self.last_modified}
+        if step == "truncated":
+            return web.Response(body=body[:len(body) // 2], content_type="application/json", headers=headers)
+        if step != "slow":
+            return web.Response(body=body, content_type="application/json", headers=headers)
+
+        await asyncio.sleep(self.delay)
+        response = web.StreamResponse(headers={**headers, "Content-Type": "application/json"})
+        await response.prepare(request)
+        chunk = max(1, len(body) // 10)
+        for start in range(0, len(body), chunk):
+            await response.write(body[start:start + chunk])
+            await asyncio.sleep(self.delay / 10)
+        await response.write_eof()
+        return response
+
+    async def advance_handler(self, request):
+        """Moves a ManualClock forward by ?seconds=N; the feed keeps its dates."""
+        if not isinstance(self.clock, ManualClock):
+            return web.json_response({"error": "clock is not controllable"}, status=409)
+        try:
+            seconds = float(request.query["seconds"])
+        except (KeyError, ValueError):
+            return web.json_response({"error": "seconds is required"}, status=400)
+        self.clock.advance(seconds=seconds)
+        return web.json_response({"now": self.clock.now().isoformat(), "version": self.version})
+
+    async def stats_handler(self, request):
+        return web.json_response({"requests": self.requests, "version": self.version,
+                                  "responses": {str(key): value for key, value in self.responses.items()}})
+
+    async def start(self, host="127.0.0.1", port=0):
+        """Starts serving; returns the /cpts URL."""
+        self.runner = web.AppRunner(self.app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, host, port)
+        await site.start()
+        bound_host, bound_port = self.runner.addresses[0][:2]
+        self.url = f"http://{bound_host}:{bound_port}/cpts"
+        logger.info("Mock training API serving %d CPTs at %s (script: %s, page size: %s)",
+                    self.count, self.url, ",".join(self.script), self.page_size or "unpaginated")
+        return self.url
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+            self.runner = None
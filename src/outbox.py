@@ -0,0 +1,211 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+logger = logging.getLogger("Outbox")
+
+
+class Outbox:
+    """Append-only JSONL journal of intended Discord sends.
+
+    ``record_intent`` is written (and fsynced) before a send is attempted and
+    ``mark_done`` after it succeeded. Whatever is still pending when the bot
+    starts is replayed. Records are keyed by an idempotency key, so an intent
+    that is recorded twice is still replayed once. Intents older than
+    ``max_age`` seconds are dropped on replay instead of being sent late.
+
+    On an event loop, journal writes are buffered and written by a background
+    task in a worker thread, one fsync for everything appended since the
+    previous write, so the loop never blocks on disk. ``await flush()`` waits
+    until the journal is durable (e.g. before a send, or before answering
+    "accepted"). Without a running loop records are written immediately.
+    """
+
+    def __init__(self, path, max_age=24 * 3600, compact_every=500):
+        self.path = path
+        self.max_age = max_age
+        self.compact_every = compact_every
+        self._pending = OrderedDict()  # key -> intent record
+        self._loaded = False
+        self._done_since_compact = 0
+        self._buffer = []  # records appended but not written yet
+        self._writer = None  # task draining _buffer
+
+    def __len__(self):
+        self._ensure_loaded()
+        return len(self._pending)
+
+    def __contains__(self, key):
+        self._ensure_loaded()
+        return key in self._pending
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.load()
+
+    def load(self):
+        """Rebuilds the pending set from the journal and compacts it."""
+        self._pending.clear()
+        self._loaded = True
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, "r") as f:
+            for line_no, line in enumerate(f, 1):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash mid-append can leave a torn last line
+                    logger.warning("Ignoring unreadable outbox record at %s:%d", self.path, line_no)
+                    continue
+                if record.get("op") == "intent":
+                    self._pending.setdefault(record["key"], record)
+                elif record.get("op") == "done":
+                    self._pending.pop(record["key"], None)
+        self.compact()
+        if self._pending:
+            logger.info("Outbox %s has %d undelivered notification(s)", self.path, len(self._pending))
+        return list(self._pending.values())
+
+    def pending(self):
+        self._ensure_loaded()
+        return list(self._pending.values())
+
+    def record_intent(self, key, kind, payload):
+        """Journals an intended send. Returns False if the key is already pending."""
+        self._ensure_loaded()
+        if key in self._pending:
+            return False
+        record = {"op": "intent", "key": key, "kind": kind, "ts": time.time(), "payload": payload}
+        self._append(record)
+        self._pending[key] = record
+        return True
+
+    def mark_done(self, key):
+        self._ensure_loaded()
+        if self._pending.pop(key, None) is None:
+            return
+        self._done_since_compact += 1
+        self._append({"op": "done", "key": key})
+
+    def _append(self, record):
+        self._buffer.append(json.dumps(record, separators=(",", ":")) + "\n")
+        if self._writer is not None and not self._writer.done():
+            return  # The running writer picks it up
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write(self._take())
+            return
+        self._writer = loop.create_task(self._drain())
+
+    def _take(self):
+        lines, self._buffer = self._buffer, []
+        return lines
+
+    async def _drain(self):
+        while self._buffer:
+            lines = self._take()
+            try:
+                await asyncio.to_thread(self._write, lines)
+            except Exception as e:
+                # Keep the records for the next attempt (the next append or flush)
+                self._buffer[:0] = lines
+                logger.error("Failed to write outbox journal %s: %s", self.path, e)
+                raise
+
+    async def flush(self):
+        """Waits until every record appended so far is written and fsynced."""
+        if self._buffer and (self._writer is None or self._writer.done()):
+            self._writer = asyncio.get_running_loop().create_task(self._drain())
+        if self._writer is not None:
+            await asyncio.shield(self._writer)
+
+    def _write(self, lines):
+        if lines:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # open/append/fsync keeps the journal durable without holding a handle
+            with open(self.path, "a") as f:
+                f.writelines(lines)
+                f.flush()
+                os.fsync(f.fileno())
+        # Compaction replaces the file, so it runs here, never concurrently with an append
+        if self._done_since_compact >= self.compact_every:
+            self.compact()
+
+    def compact(self):
+        """Rewrites the journal with only the pending intents (atomic rename)."""
+        self._done_since_compact = 0
+        if not os.path.exists(self.path):
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            for record in list(self._pending.values()):
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    async def replay(self, handler, concurrency=4):
+        """Re-sends pending intents with at most ``concurrency`` in flight.
+
+        ``handler(record)`` returns True once the notification is delivered (or
+        found to have been delivered already); those records are marked done.
+        Returns the number of delivered records.
+        """
+        records = self.pending()
+        if not records:
+            return 0
+
+        now = time.time()
+        semaphore = asyncio.Semaphore(concurrency)
+        delivered = 0
+
+        async def replay_one(record):
+            nonlocal delivered
+            if self.max_age and now - record["ts"] > self.max_age:
+                logger.warning("Dropping stale outbox record %s (recorded %s)", record["key"],
+                               datetime.fromtimestamp(record["ts"], timezone.utc).isoformat())
+                self.mark_done(record["key"])
+                return
+            async with semaphore:
+                try:
+                    ok = await handler(record)
+                except Exception as e:
+                    logger.error("Replay of outbox record %s failed: %s", record["key"], e, exc_info=True)
+                    return
+            if ok:
+                delivered += 1
+                self.mark_done(record["key"])
+
+        logger.info("Replaying %d undelivered notification(s) from %s", len(records), self.path)
+        await asyncio.gather(*(replay_one(record) for record in records))
+        await self.flush()
+        logger.info("Outbox replay finished: %d/%d delivered, %d still pending", delivered, len(records),
+                    len(self._pending))
+        return delivered
+
+
+async def find_delivered_message(channel, since, content, embed_titles, author_id, limit=50):
+    """Looks for a message that an earlier, interrupted attempt already posted.
+
+    Covers the gap between a successful ``channel.send`` and ``mark_done``: the
+    bot's own recent messages in ``channel`` after ``since`` (a timestamp) are
+    compared by content and embed titles. Returns the message or None (also
+    when history cannot be read).
+    """
+    try:
+        after = datetime.fromtimestamp(since - 1, timezone.utc)
+        async for message in channel.history(limit=limit, after=after):
+            if message.author.id != author_id or message.content.strip() != (content or "").strip():
+                continue
+            if [embed.title for embed in message.embeds] == list(embed_titles):
+                return message
+    except Exception as e:
+        logger.debug("Could not check channel history for duplicates: %s", e)
+    return None
@@ -0,0 +1,124 @@
+import asyncio
+import gzip
+import hashlib
+import logging
+import os
+from datetime import datetime, timezone
+
+logger = logging.getLogger("PayloadLog")
+
+
+class PayloadCapture:
+    """Hashes a payload chunk by chunk and keeps its first ``max_bytes`` bytes."""
+
+    __slots__ = ("_hash", "_head", "_max_bytes", "size")
+
+    def __init__(self, max_bytes):
+        self._hash = hashlib.sha256()
+        self._head = []
+        self._max_bytes = max_bytes
+        self.size = 0
+
+    def update(self, chunk):
+        self._hash.update(chunk)
+        room = self._max_bytes - self.size
+        if room > 0:
+            self._head.append(chunk[:room])
+        self.size += len(chunk)
+
+    @property
+    def digest(self):
+        return self._hash.hexdigest()
+
+    @property
+    def head(self):
+        return b"".join(self._head)
+
+
+class PayloadLogger:
+    """Writes occasional dumps of raw API payloads to their own files.
+
+    The main log only gets the size and SHA-256 of each payload. A dump is
+    written to ``directory`` when the hash differs from the last dumped one
+    (``on_change``) and/or on every ``every``-th payload (0 = never by
+    count). Dumps hold at most ``max_bytes`` of the payload, are gzip
+    compressed unless ``compress`` is False, and only the newest ``keep``
+    files are kept. The last dumped hash is read from ``directory`` on the
+    first payload, not at construction, to keep startup off the disk.
+    Directory scans, compression and writes run in a worker thread, so the
+    fetch path never blocks the event loop on them.
+    """
+
+    def __init__(self, name, directory="data/logs/payloads", max_bytes=1024 * 1024, every=0,
+                 on_change=True, compress=True, keep=10):
+        self.name = name
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.every = every
+        self.on_change = on_change
+        self.compress = compress
+        self.keep = keep
+        self.count = 0
+        self.last_digest = None
+        self._last_digest_loaded = False
+
+    def capture(self):
+        return PayloadCapture(self.max_bytes)
+
+    async def record(self, body):
+        """Shortcut for a payload that is already in memory; returns the dump path or None."""
+        capture = self.capture()
+        capture.update(body)
+        return await self.finish(capture)
+
+    async def finish(self, capture):
+        """Logs size and hash of a captured payload and dumps it if it is due; returns the dump path or None."""
+        self.count += 1
+        if not self._last_digest_loaded:
+            self.last_digest = await asyncio.to_thread(self._newest_dump_digest)
+            self._last_digest_loaded = True
+        digest = capture.digest
+        changed = not digest.startswith(self.last_digest or "-")
+        due = (self.on_change and changed) or (self.every and self.count % self.every == 0)
+        path = None
+        if due:
+            try:
+                path = await asyncio.to_thread(self._dump, capture, digest)
+                self.last_digest = digest
+            except OSError as e:
+                logger.error("Failed to write %s payload dump: %s", self.name, e)
+        logger.info("%s payload: %d bytes, sha256=%s%s", self.name, capture.size, digest[:16],
+                    f", dumped to {path}" if path else (", unchanged" if not changed else ""),
+                    extra={"payload_bytes": capture.size, "payload_sha256": digest})
+        return path
+
+    def _dump(self, capture, digest):
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+        truncated = capture.size > self.max_bytes
+        filename = f"{self.name}-{stamp}-{digest[:16]}{'-truncated' if truncated else ''}.json"
+        path = os.path.join(self.directory, filename + (".gz" if self.compress else ""))
+        opener = gzip.open if self.compress else open
+        with opener(path, "wb") as f:
+            f.write(capture.head)
+        self._prune()
+        return path
+
+    def _dumps(self):
+        prefix = f"{self.name}-"
+        try:
+            return sorted(name for name in os.listdir(self.directory) if name.startswith(prefix))
+        except FileNotFoundError:
+            return []
+
+    def _prune(self):
+        dumps = self._dumps()
+        for name in dumps[:max(0, len(dumps) - self.keep)]:
+            os.remove(os.path.join(self.directory, name))
+
+    def _newest_dump_digest(self):
+        # Lets on_change survive a restart: the digest prefix is part of the file name
+        dumps = self._dumps()
+        if not dumps:
+            return None
+        return dumps[-1][len(self.name) + 1:].split("-")[1].split(".")[0]
@@ -0,0 +1,31 @@
+import asyncio
+import time
+from collections import deque
+
+
+class RateLimiter:
+    """Per-key sliding-window limiter: at most ``rate`` acquisitions per ``period`` seconds for each key.
+
+    Each acquire() reserves the earliest free slot and sleeps until it, so
+    concurrent callers are spread out in arrival order instead of all
+    retrying at once. Used to stay under Discord's per-channel message limit
+    rather than running into 429s and discord.py's retry sleeps.
+    """
+
+    def __init__(self, rate=5, period=5.0, timer=time.monotonic):
+        self.rate = rate
+        self.period = period
+        self._timer = timer
+        self._slots = {}  # key -> deque of the last ``rate`` reserved start times
+
+    async def acquire(self, key):
+        if self.rate <= 0:
+            return
+        now = self._timer()
+        slots = self._slots.get(key)
+        if slots is None:
+            slots = self._slots[key] = deque(maxlen=self.rate)
+        start = now if len(slots) < self.rate else max(now, slots[0] + self.period)
+        slots.append(start)
+        if start > now:
+            await asyncio.sleep(start - now)
@@ -0,0 +1,97 @@
+import asyncio
+import heapq
+import itertools
+import logging
+
+from src.clock import SystemClock
+
+logger = logging.getLogger("Scheduler")
+
+
+class NotificationScheduler:
+    """Min-heap of keyed fire times that sleeps until the next one is due.
+
+    Each key has at most one live entry; rescheduling or cancelling a key leaves
+    its old heap entry in place and it is skipped when it reaches the top.
+    """
+
+    def __init__(self, clock=None):
+        self.clock = clock or SystemClock()
+        self._heap = []  # (fire_at, seq, key)
+        self._entries = {}  # key -> (fire_at, payload)
+        self._seq = itertools.count()
+        self._changed = asyncio.Event()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def schedule(self, key, fire_at, payload=None):
+        current = self._entries.get(key)
+        self._entries[key] = (fire_at, payload)
+        if current is not None and current[0] == fire_at:
+            return
+        heapq.heappush(self._heap, (fire_at, next(self._seq), key))
+        if self._heap[0][2] == key:
+            # New earliest entry: wake the runner so it can shorten its sleep
+            self._changed.set()
+
+    def cancel(self, key):
+        self._entries.pop(key, None)
+
+    def items(self):
+        """Snapshot of the live entries as [(key, payload), ...]."""
+        return [(key, payload) for key, (_, payload) in self._entries.items()]
+
+    def next_fire_time(self):
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now=None):
+        """Removes and returns [(key, payload), ...] for every entry due at ``now``."""
+        now = now or self.clock.now()
+        due = []
+        while True:
+            self._drop_stale()
+            if not self._heap or self._heap[0][0] > now:
+                return due
+            _, _, key = heapq.heappop(self._heap)
+            due.append((key, self._entries.pop(key)[1]))
+
+    def _drop_stale(self):
+        while self._heap:
+            fire_at, _, key = self._heap[0]
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == fire_at:
+                return
+            heapq.heappop(self._heap)
+
+    async def run(self, callback):
+        """Calls ``await callback(due)`` whenever entries become due. Runs until cancelled."""
+        while True:
+            self._changed.clear()
+            due = self.pop_due()
+            if due:
+                try:
+                    await callback(due)
+                except Exception as e:
+                    logger.error("Scheduled callback failed for %s: %s", [key for key, _ in due], e, exc_info=True)
+                continue
+
+            next_at = self.next_fire_time()
+            delay = None if next_at is None else max(0.0, (next_at - self.clock.now()).total_seconds())
+            if next_at is not None:
+                logger.debug("Next scheduled notification at %s (in %.0fs)", next_at.isoformat(), delay)
+            await self._wait(delay)
+
+    async def _wait(self, delay):
+        waiters = {asyncio.ensure_future(self._changed.wait())}
+        if delay is not None:
+            waiters.add(asyncio.ensure_future(self.clock.sleep(delay)))
+        try:
+            await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
@@ -0,0 +1,169 @@
+"""Startup profiler: import times, startup phases and time to on_ready.
+
+Enabled with STARTUP_PROFILE=true in the process environment. It has to be
+set there rather than in .env, because profiling starts before src.config
+loads .env. Only the standard library is imported here, so the profiler
+can be installed before anything heavy.
+"""
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+
+STARTUP_PROFILE_FILE = "data/logs/startup.json"
+
+_profiler = None
+
+
+class ImportTimer:
+    """Meta path finder that times module execution, like ``python -X importtime``.
+
+    It wraps the loader of each module found by the other finders. For every
+    module it records the cumulative time (including nested imports) and the
+    self time (excluding them).
+    """
+
+    def __init__(self):
+        self.modules = {}  # name -> [self_seconds, cumulative_seconds]
+        self._stack = []  # [name, start, nested_seconds]
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, self, fullname)
+        return spec
+
+    def enter(self, name):
+        self._stack.append([name, time.perf_counter(), 0.0])
+
+    def exit(self):
+        name, start, nested = self._stack.pop()
+        elapsed = time.perf_counter() - start
+        if self._stack:
+            self._stack[-1][2] += elapsed
+        record = self.modules.setdefault(name, [0.0, 0.0])
+        record[0] += elapsed - nested
+        record[1] += elapsed
+
+
+class _TimedLoader:
+    def __init__(self, loader, timer, name):
+        self.loader = loader
+        self.timer = timer
+        self.name = name
+
+    def create_module(self, spec):
+        # Extension modules do most of their work here
+        self.timer.enter(self.name)
+        try:
+            return self.loader.create_module(spec)
+        finally:
+            self.timer.exit()
+
+    def exec_module(self, module):
+        # The module only ever sees its real loader
+        module.__loader__ = self.loader
+        if module.__spec__ is not None:
+            module.__spec__.loader = self.loader
+        self.timer.enter(self.name)
+        try:
+            self.loader.exec_module(module)
+        finally:
+            self.timer.exit()
+
+    def __getattr__(self, name):
+        return getattr(self.loader, name)
+
+
+class StartupProfiler:
+    def __init__(self, path=STARTUP_PROFILE_FILE):
+        self.path = path
+        self.started = time.perf_counter()
+        self.imports = ImportTimer()
+        self.phases = []
+        self.marks = {}
+        self.written = False
+
+    def _ms(self, seconds):
+        return round(seconds * 1000, 2)
+
+    def install(self):
+        sys.meta_path.insert(0, self.imports)
+
+    def uninstall(self):
+        if self.imports in sys.meta_path:
+            sys.meta_path.remove(self.imports)
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append({"name": name, "start_ms": self._ms(start - self.started),
+                                "duration_ms": self._ms(time.perf_counter() - start)})
+
+    def mark(self, name):
+        self.marks[name] = self._ms(time.perf_counter() - self.started)
+
+    def report(self):
+        modules = sorted(self.imports.modules.items(), key=lambda item: item[1][1], reverse=True)
+        return {
+            "python": sys.version.split()[0],
+            "marks_ms": self.marks,
+            "phases": self.phases,
+            "imports": [{"module": name, "self_ms": self._ms(self_s), "cumulative_ms": self._ms(cumulative_s)}
+                        for name, (self_s, cumulative_s) in modules],
+        }
+
+    def write(self):
+        """Writes the report once (later calls are ignored) and stops timing imports; returns the path."""
+        if self.written:
+            return None
+        self.written = True
+        self.uninstall()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+        return self.path
+
+
+def start_profiling(path=STARTUP_PROFILE_FILE):
+    """Installs the import timer; call before importing the bot."""
+    global _profiler
+    if _profiler is None:
+        _profiler = StartupProfiler(path)
+        _profiler.install()
+    return _profiler
+
+
+def profiling_enabled():
+    return os.getenv("STARTUP_PROFILE", "False").lower() == "true"
+
+
+def phase(name):
+    """Times a startup phase if profiling is active; a no-op context otherwise."""
+    return _profiler.phase(name) if _profiler else nullcontext()
+
+
+def mark(name):
+    if _profiler:
+        _profiler.mark(name)
+
+
+def finish():
+    """Marks startup complete and writes the report; returns its path or None."""
+    if _profiler is None or _profiler.written:
+        return None
+    _profiler.mark("ready")
+    return _profiler.write()
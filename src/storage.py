@@ -0,0 +1,248 @@
+import json
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+
+logger = logging.getLogger("Storage")
+
+# Reserved top-level key of the JSON store: {key: recorded_at ISO} for entries without an event date
+RECORDED_AT_KEY = "__recorded_at__"
+
+
+def write_json_atomic(path, data, **dump_kwargs):
+    """Writes JSON to a temp file next to ``path`` and renames it into place.
+
+    A crash mid-write leaves either the old or the new file, never a truncated one.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, **dump_kwargs)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def read_announced_json(path):
+    """Reads announced CPTs from a JSON file in either historical format.
+
+    Old files hold a list of keys; those are migrated to ``{key: None}`` because
+    their event dates are unknown. Current files hold ``{key: event_date_iso}``,
+    plus when the dateless entries were first seen under RECORDED_AT_KEY.
+    Returns ``(entries, {key: recorded_at datetime})``.
+    """
+    if not os.path.exists(path):
+        logger.info("No existing %s found, starting fresh", os.path.basename(path))
+        return {}, {}
+    with open(path, "r") as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        logger.info("Migrating %s from list to dict format.", os.path.basename(path))
+        return {k: None for k in data}, {}
+    if isinstance(data, dict):
+        recorded_at = {}
+        for key, value in (data.pop(RECORDED_AT_KEY, None) or {}).items():
+            try:
+                stamp = datetime.fromisoformat(value)
+            except (TypeError, ValueError):
+                logger.warning("Ignoring invalid recorded_at %r for %s", value, key)
+                continue
+            recorded_at[key] = stamp if stamp.tzinfo else stamp.replace(tzinfo=timezone.utc)
+        return data, recorded_at
+    logger.warning("%s format unrecognized. Starting with empty record.", os.path.basename(path))
+    return {}, {}
+
+
+def _event_timestamp(event_date):
+    """Parses an ISO date to a UTC timestamp; None for legacy entries, 0 for unparsable ones."""
+    if event_date is None:
+        return None
+    try:
+        parsed = datetime.fromisoformat(event_date)
+    except (TypeError, ValueError):
+        # Sorts before any cutoff, so the next cleanup removes it (as the JSON cleanup does)
+        return 0.0
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+class AnnouncedStore(ABC):
+    """Persistence for announced notification keys (``{cpt_id}_{type}`` -> event date ISO string)."""
+
+    @abstractmethod
+    def load(self):
+        """Returns all entries as a dict."""
+
+    def load_recorded_at(self):
+        """Returns {key: datetime} of when dateless (legacy) entries were recorded, if the backend knows."""
+        return {}
+
+    @abstractmethod
+    def upsert(self, key, event_date):
+        """Records a single announced key."""
+
+    @abstractmethod
+    def delete(self, keys):
+        """Forgets the given keys."""
+
+    @abstractmethod
+    def delete_expired(self, cutoff):
+        """Removes entries whose event date is before ``cutoff``; returns how many were removed."""
+
+    @abstractmethod
+    def save(self, entries):
+        """Checkpoint with the full in-memory state; backends with keyed writes may ignore it."""
+
+    def close(self):
+        pass
+
+
+class JsonAnnouncedStore(AnnouncedStore):
+    """Default backend: the whole mapping in one JSON file, rewritten atomically on save().
+
+    Dateless (legacy) entries get a recorded_at timestamp the first time they
+    are loaded, written back right away, so their TTL survives restarts.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.recorded_at = None  # key -> datetime for dateless entries, filled by load()
+
+    def load(self):
+        entries, recorded_at = read_announced_json(self.path)
+        now = datetime.now(timezone.utc)
+        legacy = [key for key, event_date in entries.items() if event_date is None]
+        self.recorded_at = {key: recorded_at.get(key, now) for key in legacy}
+        if any(key not in recorded_at for key in legacy):
+            logger.info("Recording first-seen time of %d announced CPT(s) without a date",
+                        sum(key not in recorded_at for key in legacy))
+            self.save(entries)
+        return entries
+
+    def load_recorded_at(self):
+        if self.recorded_at is None:
+            self.load()
+        return dict(self.recorded_at)
+
+    def upsert(self, key, event_date):
+        pass  # Persisted by the next save()
+
+    def delete(self, keys):
+        pass  # Persisted by the next save()
+
+    def delete_expired(self, cutoff):
+        return 0  # The caller prunes its in-memory mapping and calls save()
+
+    def save(self, entries):
+        data = dict(entries)
+        now = datetime.now(timezone.utc)
+        recorded_at = self.recorded_at or {}
+        stamps = {key: recorded_at.get(key, now).isoformat() for key, event_date in data.items() if event_date is None}
+        if stamps:
+            data[RECORDED_AT_KEY] = stamps
+        write_json_atomic(self.path, data, indent=2)
+
+
+class SqliteAnnouncedStore(AnnouncedStore):
+    """SQLite backend in WAL mode with keyed upserts and an index on the event date.
+
+    On first use an empty database imports ``legacy_json_path`` (list or dict
+    format) and renames the JSON file to ``*.migrated``.
+    """
+
+    SCHEMA_VERSION = 1
+
+    def __init__(self, path, legacy_json_path=None):
+        self.path = path
+        self.legacy_json_path = legacy_json_path
+        self._conn = None
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            import sqlite3  # Only needed by this backend; keeps it out of startup for the JSON store
+
+            # isolation_level=None: every statement commits on its own unless wrapped in BEGIN
+            self._conn = sqlite3.connect(self.path, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._migrate()
+        return self._conn
+
+    def _migrate(self):
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= self.SCHEMA_VERSION:
+            return
+        self._conn.execute("BEGIN")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS announced ("
+            " key TEXT PRIMARY KEY,"
+            " event_date TEXT,"  # ISO string as returned by the training API
+            " event_ts REAL,"  # parsed UTC timestamp, NULL for legacy entries without a date
+            " recorded_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_announced_event_ts ON announced(event_ts)")
+        migrated = {}
+        if self.legacy_json_path and os.path.exists(self.legacy_json_path):
+            migrated, recorded_at = read_announced_json(self.legacy_json_path)
+            self._write_many(migrated.items(), recorded_at)
+        self._conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+        self._conn.execute("COMMIT")
+        if migrated:
+            os.replace(self.legacy_json_path, f"{self.legacy_json_path}.migrated")
+            logger.info("Migrated %d announced CPTs from %s to %s", len(migrated), self.legacy_json_path, self.path)
+
+    def _write_many(self, items, recorded_at=None):
+        now = time.time()
+        recorded_at = {key: stamp.timestamp() for key, stamp in (recorded_at or {}).items()}
+        self.conn.executemany(
+            "INSERT INTO announced (key, event_date, event_ts, recorded_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET event_date = excluded.event_date, event_ts = excluded.event_ts",
+            ((key, event_date, _event_timestamp(event_date), recorded_at.get(key, now)) for key, event_date in items),
+        )
+
+    def load(self):
+        return dict(self.conn.execute("SELECT key, event_date FROM announced"))
+
+    def load_recorded_at(self):
+        rows = self.conn.execute("SELECT key, recorded_at FROM announced WHERE event_date IS NULL")
+        return {key: datetime.fromtimestamp(recorded_at, timezone.utc) for key, recorded_at in rows}
+
+    def upsert(self, key, event_date):
+        self._write_many([(key, event_date)])
+
+    def delete(self, keys):
+        self.conn.executemany("DELETE FROM announced WHERE key = ?", ((key,) for key in keys))
+
+    def delete_expired(self, cutoff):
+        cursor = self.conn.execute("DELETE FROM announced WHERE event_ts < ?", (cutoff.timestamp(),))
+        return cursor.rowcount
+
+    def save(self, entries):
+        pass  # Every upsert/delete is already durable
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+DEFAULT_STORE_PATHS = {"json": "data/cpts.json", "sqlite": "data/cpts.sqlite3"}
+
+
+def create_announced_store(backend, path=None, legacy_json_path="data/cpts.json"):
+    """Builds the store selected by CPT_STORE_BACKEND ("json" or "sqlite")."""
+    backend = (backend or "json").lower()
+    if backend == "sqlite":
+        return SqliteAnnouncedStore(path or DEFAULT_STORE_PATHS["sqlite"], legacy_json_path=legacy_json_path)
+    if backend == "json":
+        return JsonAnnouncedStore(path or legacy_json_path)
+    raise ValueError(f"Unknown CPT_STORE_BACKEND: {backend!r} (expected 'json' or 'sqlite')")
@@ -0,0 +1,124 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+from src.config import FIR_PREFIXES
+
+# Position suffixes with rough weights from the real feed (most CPTs are tower/approach/center)
+POSITION_SUFFIXES = {"DEL": 1, "GND": 2, "TWR": 4, "APP": 3, "CTR": 3}
+# Neighbouring FIRs, filtered out by FIR_PREFIXES
+OTHER_PREFIXES = ["EDGG", "EDWW", "EDDF", "EDDH", "EDDL", "EDDB", "LOWW", "LSZH", "EHAM"]
+
+# (days from now, weight) buckets for the CPT date. The feed is mostly history,
+# with a thin slice inside the "today" and "3day" notification windows.
+DATE_BUCKETS = [
+    ((-720, -1), 70),
+    ((0, 1), 3),
+    ((1, 2), 3),
+    ((2, 5), 6),
+    ((5, 60), 18),
+]
+
+MALFORMED_KINDS = ["missing_date", "null_date", "bad_date", "missing_position", "null_position", "lowercase_position"]
+
+
+class SyntheticFeed:
+    """Seeded generator of CPTs in the training API's schema, for benchmarks and the mock API.
+
+    The same seed, ``now`` and parameters always produce the same CPTs.
+    ``fir_share`` of the positions start with one of ``fir_prefixes``; the
+    rest belong to neighbouring FIRs. ``malformed_rate`` of the CPTs carry one
+    defect from MALFORMED_KINDS (no/invalid date, no position, ...).
+    """
+
+    def __init__(self, seed=0, now=None, fir_prefixes=None, fir_share=0.6, malformed_rate=0.01):
+        self.seed = seed
+        self.now = now or datetime.now(timezone.utc).replace(microsecond=0)
+        self.fir_prefixes = [p for p in (fir_prefixes or FIR_PREFIXES) if p and "*" not in p and not p.startswith("!")]
+        self.fir_share = fir_share
+        self.malformed_rate = malformed_rate
+
+    def generate(self, count, start_id=1):
+        """Yields ``count`` CPTs with consecutive ids starting at ``start_id``."""
+        rng = random.Random(self.seed)
+        suffixes, suffix_weights = zip(*POSITION_SUFFIXES.items())
+        buckets, bucket_weights = zip(*DATE_BUCKETS)
+        for cpt_id in range(start_id, start_id + count):
+            prefixes = self.fir_prefixes if rng.random() < self.fir_share else OTHER_PREFIXES
+            position = f"{rng.choice(prefixes)}_{rng.choices(suffixes, suffix_weights)[0]}"
+            low, high = rng.choices(buckets, bucket_weights)[0]
+            # Sessions start on the quarter hour, like the real schedule
+            minutes = int(rng.uniform(low, high) * 24 * 4) * 15
+            date = self.now.replace(minute=0, second=0) + timedelta(minutes=minutes)
+            cpt = {
+                "id": cpt_id,
+                "trainee_vatsim_id": 1_000_000 + rng.randrange(500_000),
+                "trainee_name": f"Trainee {cpt_id}",
+                "local_name": f"Mentor {rng.randrange(100)}",
+                "course_name": f"{position.split('_')[-1]} Course",
+                "position": position,
+                "date": date.isoformat(),
+                "confirmed": rng.random() < 0.8,
+            }
+            if rng.random() < self.malformed_rate:
+                self.corrupt(cpt, rng.choice(MALFORMED_KINDS))
+            yield cpt
+
+    @staticmethod
+    def corrupt(cpt, kind):
+        if kind == "missing_date":
+            del cpt["date"]
+        elif kind == "null_date":
+            cpt["date"] = None
+        elif kind == "bad_date":
+            cpt["date"] = cpt["date"].replace("T", " at ").replace("-", "/")
+        elif kind == "missing_position":
+            del cpt["position"]
+        elif kind == "null_position":
+            cpt["position"] = None
+        elif kind == "lowercase_position":
+            cpt["position"] = cpt["position"].lower()
+
+
+def generate_cpts(count, seed=0, now=None, **kwargs):
+    """Returns a list of ``count`` synthetic CPTs (see SyntheticFeed)."""
+    return list(SyntheticFeed(seed=seed, now=now, **kwargs).generate(count))
+
+
+def churn_cpts(cpts, rate=0.01, seed=0, now=None):
+    """Returns ``(new_cpts, changes)``: a copy of ``cpts`` with ``rate`` of the records churned.
+
+    The churn is split evenly between edits (``confirmed`` flipped),
+    reschedules (date moved by 1-48 hours), removals and newly added CPTs with
+    fresh ids. ``changes`` maps each of "changed", "rescheduled", "removed" and
+    "added" to the affected ids, so a diff can be checked against it.
+    """
+    rng = random.Random(seed)
+    total = max(int(len(cpts) * rate), 4) if cpts else 0
+    picked = rng.sample(range(len(cpts)), min(total - total // 4, len(cpts)))
+    groups = [set(picked[i::3]) for i in range(3)]
+    changes = {"changed": [], "rescheduled": [], "removed": [], "added": []}
+    removed = groups[2]
+    result = []
+    for index, cpt in enumerate(cpts):
+        if index in removed:
+            changes["removed"].append(cpt["id"])
+            continue
+        cpt = dict(cpt)
+        if index in groups[0]:
+            cpt["confirmed"] = not cpt.get("confirmed")
+            changes["changed"].append(cpt["id"])
+        elif index in groups[1] and cpt.get("date"):
+            try:
+                date = datetime.fromisoformat(cpt["date"])
+            except ValueError:
+                date = None
+            if date:
+                cpt["date"] = (date + timedelta(hours=rng.randint(1, 48))).isoformat()
+                changes["changed"].append(cpt["id"])
+                changes["rescheduled"].append(cpt["id"])
+        result.append(cpt)
+
+    start_id = max((cpt["id"] for cpt in cpts), default=0) + 1
+    added = list(SyntheticFeed(seed=seed, now=now, malformed_rate=0).generate(total // 4, start_id=start_id))
+    changes["added"] = [cpt["id"] for cpt in added]
+    return result + added, changes
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cleanup_old_cpts with many tracked keys.
+
+Compares the old full scan (datetime.fromisoformat on every key, every run)
+with AnnouncedIndex.pop_expired, which only pops entries that are due.
+The index pays the parsing cost once, when entries are inserted; that
+one-time build time is reported separately.
+
+Usage:
+    python tests/benchmark_cleanup.py                # 1M keys, 0.1% expired
+    python tests/benchmark_cleanup.py --keys 200000 --expired 0.05
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.announced import AnnouncedIndex
+
+
+def legacy_cleanup(announced, now):
+    """The pre-index implementation of cleanup_old_cpts, minus logging."""
+    keys_to_remove = []
+    for key, date_str in announced.items():
+        if date_str is None:
+            continue
+        try:
+            event_date = datetime.fromisoformat(date_str)
+            if event_date + timedelta(days=1) < now:
+                keys_to_remove.append(key)
+        except ValueError:
+            keys_to_remove.append(key)
+    for key in keys_to_remove:
+        del announced[key]
+    return keys_to_remove
+
+
+def make_entries(count, expired_ratio, now):
+    expired_every = max(1, int(1 / expired_ratio)) if expired_ratio else None
+    entries = {}
+    for i in range(count):
+        if expired_every and i % expired_every == 0:
+            date = now - timedelta(days=2, minutes=i % 600)
+        else:
+            date = now + timedelta(days=1 + i % 30, minutes=i % 600)
+        entries[f"{i}_{'3day' if i % 2 else 'today'}"] = date.isoformat()
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keys", type=int, default=1_000_000)
+    parser.add_argument("--expired", type=float, default=0.001, help="fraction of keys already expired")
+    args = parser.parse_args()
+
+    now = datetime.now(timezone.utc)
+    entries = make_entries(args.keys, args.expired, now)
+    print(f"{args.keys} tracked keys, {args.expired:.2%} expired")
+
+    announced = dict(entries)
+    start = time.perf_counter()
+    removed = legacy_cleanup(announced, now)
+    first_legacy = time.perf_counter() - start
+    start = time.perf_counter()
+    legacy_cleanup(announced, now)
+    second_legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = AnnouncedIndex(entries)
+    build = time.perf_counter() - start
+    start = time.perf_counter()
+    popped = index.pop_expired(now)
+    first_index = time.perf_counter() - start
+    start = time.perf_counter()
+    index.pop_expired(now)
+    second_index = time.perf_counter() - start
+
+    assert sorted(removed) == sorted(key for key, _ in popped)
+    print(f"{'':<28}{'full scan':>12}{'expiry index':>14}")
+    print(f"{'cleanup (expired present)':<28}{first_legacy * 1000:>10.1f}ms{first_index * 1000:>12.2f}ms")
+    print(f"{'cleanup (nothing expired)':<28}{second_legacy * 1000:>10.1f}ms{second_index * 1000:>12.3f}ms")
+    print(f"{'one-time index build':<28}{'':>12}{build * 1000:>12.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark: incremental (diff-based) CPT refresh against full re-evaluation.
+
+Generates a seeded synthetic feed (src.synthetic_feed), processes it once to
+prime the checker, then churns --churn of it (edits, reschedules, removals,
+additions; see churn_cpts) and times three things on the churned feed,
+parsed into CPT records up front as fetch_cpts does:
+
+  diff         CPTDiffer.diff alone (hashing + index lookups)
+  incremental  CPTChecker.process_feed with CPT_INCREMENTAL (diff + evaluating the changes)
+  full         CPTChecker.process_cpts over the whole feed, as before
+
+Each mode runs --runs times on a freshly primed checker and the median is
+reported. Notifications go to a stub that always succeeds, and logging is
+disabled, so the figures are for the classification work itself.
+
+Usage:
+    python tests/benchmark_cpt_diff.py                       # 100k CPTs, 1% churn
+    python tests/benchmark_cpt_diff.py --count 1000000 --churn 0.001
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.clock import ManualClock
+from src.cogs.cpt_checker import CPTChecker, notification_times
+from src.config import FIR_PREFIXES
+from src.cpt_diff import CPTDiffer
+from src.cpt_record import CPT
+from src.fir_matcher import FIRMatcher
+from src.storage import JsonAnnouncedStore
+from src.synthetic_feed import churn_cpts, generate_cpts
+
+# Fixed "now" so dates (and therefore due notifications) do not drift between runs
+NOW = datetime(2026, 2, 7, 19, 0, 0, tzinfo=timezone.utc)
+
+
+def make_checker(tmpdir):
+    with patch('discord.ext.tasks.Loop.start'):
+        checker = CPTChecker(MagicMock(), clock=ManualClock(NOW))
+    checker.store = JsonAnnouncedStore(os.path.join(tmpdir, "cpts.json"))
+
+    async def send_notification(cpt, title, key=None):
+        return True
+
+    checker.send_notification = send_notification
+    return checker
+
+
+def time_diff(cpts, churned):
+    differ = CPTDiffer(due_times=notification_times)
+    differ.diff(cpts, NOW)
+    start = time.perf_counter()
+    diff = differ.diff(churned, NOW)
+    return time.perf_counter() - start, diff
+
+
+def time_checker(cpts, churned, incremental):
+    with tempfile.TemporaryDirectory() as tmpdir, patch('src.cogs.cpt_checker.CPT_INCREMENTAL', incremental):
+        checker = make_checker(tmpdir)
+        asyncio.run(checker.process_feed(cpts))
+        start = time.perf_counter()
+        asyncio.run(checker.process_feed(churned))
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--churn", type=float, default=0.01, help="share of the feed changed between fetches")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    raw = generate_cpts(args.count, seed=args.seed, now=NOW)
+    churned, changes = churn_cpts(raw, rate=args.churn, seed=args.seed, now=NOW)
+    matcher = FIRMatcher(FIR_PREFIXES)
+    cpts = [CPT.from_api(cpt, matcher) for cpt in raw]
+    churned = [CPT.from_api(cpt, matcher) for cpt in churned]
+    del raw
+    print(f"{args.count} CPTs, {args.churn:.2%} churn: " + ", ".join(f"{len(ids)} {kind}" for kind, ids in changes.items()))
+
+    diff_times = []
+    for _ in range(args.runs):
+        elapsed, diff = time_diff(cpts, churned)
+        diff_times.append(elapsed)
+    print(f"Diff emitted {diff.count} record(s) to evaluate: {len(diff.added)} added, {len(diff.changed)} changed "
+          f"({len(diff.rescheduled)} rescheduled), {len(diff.newly_due)} newly due; "
+          f"{len(diff.removed)} removed ({len(diff.cancelled)} cancelled)")
+
+    results = {
+        "diff": statistics.median(diff_times),
+        "incremental": statistics.median(time_checker(cpts, churned, True) for _ in range(args.runs)),
+        "full": statistics.median(time_checker(cpts, churned, False) for _ in range(args.runs)),
+    }
+    print(f"{'mode':<12}{'median':>12}{'CPTs/s':>14}")
+    for mode, seconds in results.items():
+        print(f"{mode:<12}{seconds * 1000:>10.1f}ms{round(len(churned) / seconds):>14}")
+    print(f"Incremental refresh is {results['full'] / results['incremental']:.1f}x faster than full re-evaluation")
+
+
+if __name__ == "__main__":
+    main()
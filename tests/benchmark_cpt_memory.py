@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark: memory held by a feed as raw API dicts vs. slotted CPT records.
+
+Each mode runs in a fresh subprocess that builds --count synthetic CPTs
+(src.synthetic_feed, seeded) and keeps them either as the dicts the API
+returns ("dict") or parsed into src.cpt_record.CPT ("record", the dict is
+dropped right after parsing, as fetch_cpts does). Retained memory is
+measured with tracemalloc after a full collection; peak RSS is reported
+too. Strings such as names are shared with the source dict in both modes,
+so the difference is the per-entry container (dict vs. __slots__) and the
+parsed date (datetime vs. ISO string).
+
+Usage:
+    python tests/benchmark_cpt_memory.py                  # 1M CPTs
+    python tests/benchmark_cpt_memory.py --count 100000
+"""
+import argparse
+import gc
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+MODES = ["dict", "record"]
+# Fixed "now" so every run generates the same feed
+NOW = datetime(2026, 2, 7, 19, 0, 0, tzinfo=timezone.utc)
+
+
+def peak_rss_mib():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_child(mode, count, seed):
+    from src.config import FIR_PREFIXES
+    from src.cpt_record import CPT
+    from src.fir_matcher import FIRMatcher
+    from src.synthetic_feed import SyntheticFeed
+
+    matcher = FIRMatcher(FIR_PREFIXES)
+    feed = SyntheticFeed(seed=seed, now=NOW).generate(count)
+    tracemalloc.start()
+    start = time.perf_counter()
+    if mode == "dict":
+        cpts = list(feed)
+    else:
+        cpts = [CPT.from_api(cpt, matcher) for cpt in feed]
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(json.dumps({
+        "mode": mode,
+        "cpts": len(cpts),
+        "build_seconds": round(elapsed, 2),
+        "retained_mib": round(retained / (1024 * 1024), 1),
+        "bytes_per_cpt": round(retained / len(cpts)),
+        "entry_bytes": sys.getsizeof(cpts[0]),
+        "peak_rss_mib": round(peak_rss_mib(), 1),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.count, args.seed)
+        return
+
+    results = {}
+    print(f"{'mode':<8}{'cpts':>10}{'retained':>14}{'per CPT':>10}{'container':>11}{'peak RSS':>12}")
+    for mode in MODES:
+        out = subprocess.run([sys.executable, __file__, "--child", mode, "--count", str(args.count),
+                              "--seed", str(args.seed)], check=True, capture_output=True, text=True).stdout
+        result = results[mode] = json.loads(out.strip().splitlines()[-1])
+        print(f"{mode:<8}{result['cpts']:>10}{result['retained_mib']:>10.1f} MiB{result['bytes_per_cpt']:>8} B"
+              f"{result['entry_bytes']:>9} B{result['peak_rss_mib']:>8.1f} MiB")
+    saved = 1 - results["record"]["retained_mib"] / results["dict"]["retained_mib"]
+    print(f"Slotted records retain {saved:.0%} less memory than dicts")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark: buffered vs. streaming parsing of the training API response.
+
+Every measurement runs in a fresh subprocess so that peak RSS (ru_maxrss) belongs
+to a single mode and feed size. The subprocess serves a synthetic /cpts feed from
+a local aiohttp server (generated on the fly, so the server itself stays small),
+fetches it with CPTChecker and runs process_feed (as cpt_check_loop does, so
+CPT_INCREMENTAL applies) with a stub send_notification.
+
+Usage:
+    python tests/benchmark_cpt_streaming.py                  # 1k, 100k, 1M
+    python tests/benchmark_cpt_streaming.py --sizes 1000 50000
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+POSITIONS = ["EDDM_TWR", "EDMM_CTR", "EDGG_CTR", "EDDF_APP", "EDDN_GND", "EDWW_CTR"]
+
+
+def synthetic_cpt(i, base):
+    return {
+        "id": i,
+        "trainee_vatsim_id": 1_000_000 + i,
+        "trainee_name": f"Trainee {i}",
+        "local_name": f"Mentor {i % 97}",
+        "course_name": "Synthetic Course",
+        "position": POSITIONS[i % len(POSITIONS)],
+        # Mostly history, so only a handful of CPTs fall into a notification window
+        "date": (base - timedelta(days=i % 720)).isoformat(),
+        "confirmed": bool(i % 2),
+    }
+
+
+async def feed_handler(request):
+    from aiohttp import web
+    count = int(request.query["n"])
+    base = datetime.now(timezone.utc) + timedelta(days=3)
+    response = web.StreamResponse(headers={"Content-Type": "application/json"})
+    await response.prepare(request)
+    await response.write(b'{"data": [')
+    batch = []
+    for i in range(count):
+        batch.append(json.dumps(synthetic_cpt(i, base)))
+        if len(batch) == 1000:
+            await response.write((",".join(batch) + ("," if i + 1 < count else "")).encode())
+            batch = []
+    if batch:
+        await response.write(",".join(batch).encode())
+    await response.write(b']}')
+    await response.write_eof()
+    return response
+
+
+async def run_child(mode, count):
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+    from src.cogs.cpt_checker import CPTChecker
+
+    app = web.Application()
+    app.router.add_get("/cpts", feed_handler)
+    server = TestServer(app)
+    await server.start_server()
+
+    with patch('discord.ext.tasks.Loop.start'):
+        checker = CPTChecker(MagicMock())
+    checker.api_url = str(server.make_url("/cpts")) + f"?n={count}"
+    checker.snapshot_path = os.path.join(tempfile.mkdtemp(), "cpt_snapshot.json")
+    checker.send_notification = AsyncMock(return_value=True)
+    await checker.cog_load()
+
+    start = time.perf_counter()
+    if mode == "stream":
+        await checker.process_feed(checker.stream_cpts())
+    else:
+        await checker.process_feed(await checker.fetch_cpts())
+    elapsed = time.perf_counter() - start
+
+    await checker.cog_unload()
+    await server.close()
+
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_mib = peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    print(json.dumps({"mode": mode, "cpts": count, "seconds": elapsed, "peak_rss_mib": peak_mib,
+                      "notified": checker.send_notification.await_count}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "N"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        logging.disable(logging.CRITICAL)
+        asyncio.run(run_child(args.child[0], int(args.child[1])))
+        return
+
+    print(f"{'mode':<10}{'cpts':>10}{'wall time':>12}{'peak RSS':>12}")
+    for count in args.sizes:
+        for mode in ("buffered", "stream"):
+            out = subprocess.run([sys.executable, __file__, "--child", mode, str(count)],
+                                 check=True, capture_output=True, text=True).stdout
+            result = json.loads(out.strip().splitlines()[-1])
+            print(f"{mode:<10}{count:>10}{result['seconds']:>11.2f}s{result['peak_rss_mib']:>9.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Load test: request latency and throughput ceiling of the Event Bridge HTTP API.
+
+The server side runs in a subprocess: the real EventBridge aiohttp app (same
+middlewares, idempotency, outbox journal in a temp dir, queued logging to a
+temp dir) on 127.0.0.1, with fake Discord channels instead of a bot. A fake
+channel's send takes --send-latency ms; with probability --rate-limit it
+first gets a 429 and, like discord.py, logs the rate limit, sleeps
+--retry-after ms and retries. Nothing leaves the machine, so it runs in CI.
+
+This process generates the load with aiohttp on its own event loop:
+
+  open     Poisson arrivals at --rps (exponential gaps); never waits for responses
+  fixed    one request every 1/--rps seconds; never waits for responses
+  burst    --burst-size requests at once, every --burst-interval seconds
+  ramp     fixed-rate steps from --rps, multiplied by --ramp-factor, until a
+           step misses --slo-p99-ms, has errors or 503s, or falls short of its
+           target rate; reports the last passing rate as the throughput ceiling
+
+Latency is measured from the time a request was scheduled to go out, not from
+when the client got round to sending it, so a backed-up client or server
+shows up as latency rather than as a lower request rate.
+
+Each --paths entry runs the profile on its own: "single" posts to
+/api/notify, "batch" posts --batch-size notifications to /api/notify/batch,
+"unauthorized" posts to /api/notify with a wrong token (expects 401).
+Unexpected statuses and client errors count as errors; 503s (queue full)
+are reported separately. With the defaults the delivery side (channels x
+1/send latency) is usually the first limit: the queue fills and the bridge
+answers 503 long before the HTTP handlers saturate.
+
+Usage:
+    python tests/benchmark_event_bridge.py
+    python tests/benchmark_event_bridge.py --profile ramp --rps 200 --send-latency 50
+    python tests/benchmark_event_bridge.py --profile burst --burst-size 500 --rate-limit 0.05
+    python tests/benchmark_event_bridge.py --duration 5 --max-p99-ms 50 --max-error-rate 0.01   # CI gate
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from unittest.mock import MagicMock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+TOKEN = "load-test-token"
+EXPECTED_STATUS = {"single": 202, "batch": 202, "unauthorized": 401}
+
+
+class FakeChannel:
+    """Discord channel stand-in with configurable send latency and 429 rate."""
+
+    def __init__(self, channel_id, latency, rate_limit, retry_after, rng):
+        self.id = channel_id
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.rng = rng
+        self.sent = 0
+        self.rate_limited = 0
+
+    async def send(self, content=None, embed=None, embeds=None):
+        while self.rng.random() < self.rate_limit:
+            self.rate_limited += 1
+            # Same message template discord.py uses, so RateLimitCounter sees it
+            logging.getLogger("discord.http").warning(
+                "We are being rate limited. %s %s responded with 429. Retrying in %.2f seconds.",
+                "POST", f"/channels/{self.id}/messages", self.retry_after)
+            await asyncio.sleep(self.retry_after)
+        await asyncio.sleep(self.latency)
+        self.sent += 1
+
+
+async def serve(args):
+    from aiohttp import web
+    from src.cogs.event_bridge import EventBridge
+    from src.logging_setup import setup_logging, shutdown_logging
+    from src.outbox import Outbox
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        devnull = open(os.devnull, "w")
+        if args.no_log:
+            logging.disable(logging.CRITICAL)
+        else:
+            setup_logging(tmpdir, console_stream=devnull)
+
+        rng = random.Random(args.seed)
+        channels = {i: FakeChannel(i, args.send_latency / 1000, args.rate_limit, args.retry_after / 1000,
+                                   random.Random(rng.random()))
+                    for i in range(1, args.channels + 1)}
+        bot = MagicMock()
+        bot.get_channel.side_effect = channels.get
+        cog = EventBridge(bot)
+        cog.outbox = Outbox(os.path.join(tmpdir, "bridge.jsonl"))
+        if args.queue_depth:
+            cog.queue.max_depth = args.queue_depth
+        logging.getLogger("discord.http").addHandler(cog.rate_limit_counter)
+
+        runner = web.AppRunner(cog.app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        print(json.dumps({"port": port}), flush=True)
+
+        # The load generator closes stdin when it is done
+        await asyncio.get_running_loop().run_in_executor(None, sys.stdin.read)
+        drain_start = time.perf_counter()
+        try:
+            await asyncio.wait_for(cog.queue.join(), timeout=args.drain_timeout)
+        except asyncio.TimeoutError:
+            pass
+        print(json.dumps({
+            "sent": sum(channel.sent for channel in channels.values()),
+            "rate_limited": sum(channel.rate_limited for channel in channels.values()),
+            "undelivered": cog.queue.depth,
+            "drain_seconds": round(time.perf_counter() - drain_start, 3),
+        }), flush=True)
+        await cog.queue.close()
+        await runner.cleanup()
+        shutdown_logging()
+        devnull.close()
+
+
+def make_request(path, index, args):
+    channel_id = index % args.channels + 1
+    embed = {"title": f"Load test {index}", "description": "Synthetic event", "color": 0x3498DB}
+    if path == "batch":
+        notifications = [{"channel_id": channel_id, "message": "Batch", "embed": {**embed, "title": f"Load test {index}/{i}"}}
+                         for i in range(args.batch_size)]
+        return "/api/notify/batch", {"notifications": notifications}, {"Authorization": f"Bearer {TOKEN}"}
+    payload = {"channel_id": channel_id, "message": f"Notification {index}", "embed": embed}
+    token = TOKEN if path == "single" else "wrong-token"
+    return "/api/notify", payload, {"Authorization": f"Bearer {token}"}
+
+
+def schedule(args, rps, duration, rng):
+    """Offsets (seconds from start) at which requests are due."""
+    if args.profile == "burst":
+        offsets = []
+        t = 0.0
+        while t < duration:
+            offsets.extend([t] * args.burst_size)
+            t += args.burst_interval
+        return offsets
+    if args.profile == "open":
+        offsets = []
+        t = rng.expovariate(rps)
+        while t < duration:
+            offsets.append(t)
+            t += rng.expovariate(rps)
+        return offsets
+    return [i / rps for i in range(int(rps * duration))]
+
+
+async def run_step(session, base_url, path, offsets, args):
+    """Fires requests at the given offsets; returns per-request (latency, status) and the wall time."""
+    inflight = asyncio.Semaphore(args.max_inflight)
+    results = []
+
+    async def one(index, due):
+        async with inflight:
+            url, payload, headers = make_request(path, index, args)
+            try:
+                async with session.post(base_url + url, json=payload, headers=headers) as resp:
+                    await resp.read()
+                    status = resp.status
+            except Exception:
+                status = None
+            results.append((loop.time() - due, status))
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    tasks = []
+    for index, offset in enumerate(offsets):
+        due = start + offset
+        delay = due - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one(index, due)))
+    await asyncio.gather(*tasks)
+    return results, loop.time() - start
+
+
+def summarize(path, results, elapsed, target_rps):
+    latencies = sorted(latency for latency, _ in results)
+    expected = EXPECTED_STATUS[path]
+    errors = sum(1 for _, status in results if status not in (expected, 503))
+    rejected = sum(1 for _, status in results if status == 503)
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) >= 2 else latencies * 99
+    return {
+        "path": path,
+        "requests": len(results),
+        "target_rps": round(target_rps, 1) if target_rps else None,
+        "achieved_rps": round(len(results) / elapsed, 1) if elapsed else None,
+        "p50_ms": round(cuts[49] * 1000, 2) if cuts else None,
+        "p95_ms": round(cuts[94] * 1000, 2) if cuts else None,
+        "p99_ms": round(cuts[98] * 1000, 2) if cuts else None,
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else None,
+        "error_rate": round(errors / len(results), 4) if results else 0.0,
+        "queue_full_rate": round(rejected / len(results), 4) if results else 0.0,
+    }
+
+
+def print_row(row, label):
+    print(f"{label:<22}{row['requests']:>9}{row['achieved_rps'] or 0:>10.1f}{row['p50_ms'] or 0:>10.2f}"
+          f"{row['p95_ms'] or 0:>10.2f}{row['p99_ms'] or 0:>10.2f}{row['error_rate']:>9.2%}{row['queue_full_rate']:>9.2%}")
+
+
+async def generate(args, base_url):
+    import aiohttp
+
+    rng = random.Random(args.seed)
+    report = []
+    print(f"{'path / step':<22}{'requests':>9}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>9}{'503':>9}")
+    connector = aiohttp.TCPConnector(limit=args.max_inflight)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        for path in args.paths:
+            if args.profile != "ramp":
+                offsets = schedule(args, args.rps, args.duration, rng)
+                results, elapsed = await run_step(session, base_url, path, offsets, args)
+                target = len(offsets) / args.duration if args.profile == "burst" else args.rps
+                row = summarize(path, results, elapsed, target)
+                report.append(row)
+                print_row(row, path)
+                continue
+
+            rps = args.rps
+            ceiling = None
+            while rps <= args.ramp_max:
+                offsets = schedule(args, rps, args.duration, rng)
+                results, elapsed = await run_step(session, base_url, path, offsets, args)
+                row = summarize(path, results, elapsed, rps)
+                row["passed"] = (row["p99_ms"] <= args.slo_p99_ms and row["error_rate"] == 0
+                                 and row["queue_full_rate"] == 0 and row["achieved_rps"] >= 0.9 * rps)
+                report.append(row)
+                print_row(row, f"{path} @{rps:g}/s" + ("" if row["passed"] else " ✗"))
+                if not row["passed"]:
+                    break
+                ceiling = rps
+                rps *= args.ramp_factor
+            print(f"{path}: throughput ceiling {f'{ceiling:g}' if ceiling is not None else f'< {args.rps:g}'} req/s "
+                  f"(p99 <= {args.slo_p99_ms:g}ms, no errors or 503s)")
+            report.append({"path": path, "ceiling_rps": ceiling})
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profile", choices=["open", "fixed", "burst", "ramp"], default="fixed")
+    parser.add_argument("--paths", nargs="+", choices=list(EXPECTED_STATUS), default=list(EXPECTED_STATUS))
+    parser.add_argument("--rps", type=float, default=200, help="request rate (start rate for ramp)")
+    parser.add_argument("--duration", type=float, default=10, help="seconds per run (per step for ramp)")
+    parser.add_argument("--burst-size", type=int, default=200)
+    parser.add_argument("--burst-interval", type=float, default=1.0)
+    parser.add_argument("--ramp-factor", type=float, default=1.5)
+    parser.add_argument("--ramp-max", type=float, default=20_000)
+    parser.add_argument("--slo-p99-ms", type=float, default=100)
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--channels", type=int, default=5)
+    parser.add_argument("--send-latency", type=float, default=20, help="fake Discord send time in ms")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="probability that a send hits a 429")
+    parser.add_argument("--retry-after", type=float, default=500, help="429 retry delay in ms")
+    parser.add_argument("--queue-depth", type=int, help="override EVENT_QUEUE_MAX_DEPTH")
+    parser.add_argument("--max-inflight", type=int, default=500, help="client-side open request limit")
+    parser.add_argument("--drain-timeout", type=float, default=30, help="seconds to wait for queued sends")
+    parser.add_argument("--no-log", action="store_true", help="disable the bridge's logging")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the report as JSON")
+    parser.add_argument("--max-p99-ms", type=float, help="exit 1 if any run's p99 exceeds this")
+    parser.add_argument("--max-error-rate", type=float, help="exit 1 if any run's error rate exceeds this")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    os.environ["EVENT_MANAGER_API_TOKEN"] = TOKEN
+    if args.serve:
+        asyncio.run(serve(args))
+        return
+
+    server = subprocess.Popen([sys.executable, __file__, "--serve", *sys.argv[1:]],
+                              stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    try:
+        port = json.loads(server.stdout.readline())["port"]
+        print(f"Event Bridge on 127.0.0.1:{port}, profile {args.profile}, {args.channels} channel(s), "
+              f"send latency {args.send_latency:g}ms, 429 rate {args.rate_limit:g}")
+        report = asyncio.run(generate(args, f"http://127.0.0.1:{port}"))
+        server.stdin.close()
+        delivery = json.loads(server.stdout.readline())
+    finally:
+        if not server.stdin.closed:
+            server.stdin.close()
+        server.wait(timeout=args.drain_timeout + 10)
+    print(f"Deliveries: {delivery['sent']} sent, {delivery['rate_limited']} rate limited (429), "
+          f"{delivery['undelivered']} still queued after {delivery['drain_seconds']:g}s drain")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"args": vars(args), "runs": report, "delivery": delivery}, f, indent=2)
+
+    runs = [row for row in report if "requests" in row]
+    failed = []
+    if args.max_p99_ms is not None and any(row["p99_ms"] > args.max_p99_ms for row in runs):
+        failed.append(f"p99 over {args.max_p99_ms:g}ms")
+    if args.max_error_rate is not None and any(row["error_rate"] > args.max_error_rate for row in runs):
+        failed.append(f"error rate over {args.max_error_rate:.2%}")
+    if failed:
+        print("FAIL: " + ", ".join(failed))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
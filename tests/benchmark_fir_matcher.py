@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: per-CPT cost of the FIR check.
+
+Compares the old per-CPT Python loop over FIR_PREFIXES with the precompiled
+FIRMatcher, for the default 16 prefixes and for 500 prefixes. A third run adds
+wildcard and exclusion patterns to the 500 prefixes.
+
+Usage:
+    python tests/benchmark_fir_matcher.py
+"""
+import os
+import random
+import sys
+import timeit
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.fir_matcher import FIRMatcher
+
+DEFAULT_PREFIXES = "EDMM,EDDM,EDDN,ETSI,ETSL,ETSN,EDJA,EDMA,EDMO,EDMS,EDMT,EDMV,EDMY,EDDP,EDDC,EDDE".split(",")
+SUFFIXES = ["DEL", "GND", "TWR", "APP", "CTR"]
+
+
+def legacy_matches(position, prefixes):
+    for prefix in prefixes:
+        if position.startswith(prefix):
+            return True
+    return False
+
+
+def make_prefixes(count, rng):
+    prefixes = list(DEFAULT_PREFIXES)
+    while len(prefixes) < count:
+        prefixes.append("".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(4)))
+    return prefixes[:count]
+
+
+def make_positions(prefixes, count, rng):
+    # Half inside the FIR, half from airports/FIRs that are not configured
+    positions = []
+    for i in range(count):
+        base = rng.choice(prefixes) if i % 2 else "EDGG"
+        positions.append(f"{base}_{rng.choice(SUFFIXES)}")
+    return positions
+
+
+def bench(label, prefixes, positions, extra_patterns=()):
+    matcher = FIRMatcher(list(prefixes) + list(extra_patterns))
+    runs = 5
+    legacy = min(timeit.repeat(lambda: [legacy_matches(p, prefixes) for p in positions], number=1, repeat=runs))
+    compiled = min(timeit.repeat(lambda: [matcher.matches(p) for p in positions], number=1, repeat=runs))
+    per_cpt = lambda seconds: seconds / len(positions) * 1e9
+    print(f"{label:<34}{per_cpt(legacy):>12.0f} ns{per_cpt(compiled):>12.0f} ns{legacy / compiled:>9.1f}x")
+
+
+def main():
+    rng = random.Random(42)
+    positions_count = 100_000
+    print(f"{'patterns':<34}{'legacy loop':>15}{'FIRMatcher':>15}{'speedup':>10}")
+    for count in (16, 500):
+        prefixes = make_prefixes(count, rng)
+        bench(f"{count} prefixes", prefixes, make_positions(prefixes, positions_count, rng))
+    prefixes = make_prefixes(500, rng)
+    bench("500 prefixes + wildcards/exclusions", prefixes, make_positions(prefixes, positions_count, rng),
+          extra_patterns=["EDGG_*_CTR", "EDWW_*_APP", "!EDDM_DEL", "!EDMM_TEST_*"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Benchmark: event-loop stall caused by logging while process_cpts runs.
+
+Processes synthetic CPTs (every 10th one due for a notification; the
+stubbed send yields to the loop like a real one would) while a watchdog
+task measures how long the loop goes without running it. Three setups:
+
+  off     logging disabled (lower bound)
+  direct  RotatingFileHandler + StreamHandler on the root logger (old bot.py)
+  queue   setup_logging(): QueueHandler on the loop, writer thread does the I/O
+
+On a fast local disk the write itself is cheap, and the writer thread
+competes with the loop for the GIL, so "queue" can come out slower than
+"direct". The difference shows once writes block: a busy disk, or a console
+piped to a slow consumer (docker logs, journald). --io-latency simulates
+that by sleeping in every console write.
+
+Usage:
+    python tests/benchmark_logging_stall.py
+    python tests/benchmark_logging_stall.py --cpts 50000 --io-latency 0.2
+    python tests/benchmark_logging_stall.py --console
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from logging.handlers import RotatingFileHandler
+from unittest.mock import MagicMock, patch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.cogs.cpt_checker import CPTChecker
+from src.logging_setup import LOG_FORMAT, setup_logging, shutdown_logging
+
+
+class SlowStream:
+    """Console stream whose writes block for ``latency`` seconds."""
+
+    def __init__(self, stream, latency):
+        self.stream = stream
+        self.latency = latency
+
+    def write(self, text):
+        time.sleep(self.latency)
+        return self.stream.write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+def make_cpts(count, now):
+    cpts = []
+    for i in range(count):
+        due = i % 10 == 0
+        date = now + (timedelta(hours=2) if due else timedelta(days=10, minutes=i))
+        cpts.append({
+            "id": i, "position": "EDDM_TWR" if i % 4 else "LOWW_TWR", "date": date.isoformat(),
+            "course_name": "Tower", "trainee_name": "Trainee", "trainee_vatsim_id": 1000000 + i,
+            "local_name": "Mentor", "confirmed": bool(i % 2),
+        })
+    return cpts
+
+
+def configure(mode, log_dir, console_stream):
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    logging.disable(logging.NOTSET if mode != "off" else logging.CRITICAL)
+    root.setLevel(logging.INFO)
+    if mode == "direct":
+        formatter = logging.Formatter(LOG_FORMAT)
+        file_handler = RotatingFileHandler(os.path.join(log_dir, "bot.log"), maxBytes=5*1024*1024, backupCount=5)
+        console_handler = logging.StreamHandler(console_stream)
+        for handler in (file_handler, console_handler):
+            handler.setFormatter(formatter)
+            root.addHandler(handler)
+    elif mode == "queue":
+        setup_logging(log_dir, queue_size=100000, console_stream=console_stream)
+
+
+def teardown(mode):
+    if mode == "queue":
+        shutdown_logging()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+
+
+async def run(cpts, tick):
+    with patch('discord.ext.tasks.Loop.start'):
+        checker = CPTChecker(MagicMock())
+    checker.save_announced_cpts = lambda: None
+
+    async def send_notification(cpt, title, key=None):
+        await asyncio.sleep(0)  # a real send awaits the network
+        return True
+
+    checker.send_notification = send_notification
+
+    stalls = []
+    done = False
+
+    async def watchdog():
+        while not done:
+            start = time.perf_counter()
+            await asyncio.sleep(tick)
+            stalls.append(max(0.0, time.perf_counter() - start - tick))
+
+    watcher = asyncio.create_task(watchdog())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await checker.process_cpts(cpts)
+    elapsed = time.perf_counter() - start
+    done = True
+    await watcher
+    return elapsed, stalls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cpts", type=int, default=10_000)
+    parser.add_argument("--tick", type=float, default=0.001, help="watchdog sleep interval in seconds")
+    parser.add_argument("--console", action="store_true", help="log to the real stderr instead of /dev/null")
+    parser.add_argument("--io-latency", type=float, default=0.0, help="simulated ms per console write")
+    args = parser.parse_args()
+
+    now = datetime.now(timezone.utc)
+    cpts = make_cpts(args.cpts, now)
+    devnull = open(os.devnull, "w")
+    console_stream = sys.stderr if args.console else devnull
+    if args.io_latency:
+        console_stream = SlowStream(console_stream, args.io_latency / 1000)
+    results = {}
+
+    for mode in ("off", "direct", "queue"):
+        with tempfile.TemporaryDirectory() as log_dir:
+            configure(mode, log_dir, console_stream)
+            try:
+                results[mode] = asyncio.run(run(cpts, args.tick))
+            finally:
+                flush_start = time.perf_counter()
+                teardown(mode)
+                results[mode] += (time.perf_counter() - flush_start,)
+    logging.disable(logging.NOTSET)
+    devnull.close()
+
+    print(f"{args.cpts} CPTs, watchdog tick {args.tick * 1000:g}ms, console write latency {args.io_latency:g}ms")
+    print(f"{'':<8}{'run':>10}{'max stall':>12}{'p99 stall':>12}{'total stall':>13}{'flush':>10}")
+    for mode, (elapsed, stalls, flush) in results.items():
+        p99 = statistics.quantiles(stalls, n=100)[98] if len(stalls) >= 2 else 0.0
+        print(f"{mode:<8}{elapsed * 1000:>8.1f}ms{max(stalls, default=0) * 1000:>10.2f}ms"
+              f"{p99 * 1000:>10.2f}ms{sum(stalls) * 1000:>11.1f}ms{flush * 1000:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
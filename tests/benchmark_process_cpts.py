@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Benchmark: end-to-end throughput of CPTChecker.process_cpts on a synthetic feed.
+
+Each size runs in a fresh subprocess so that peak RSS belongs to that size
+alone. The subprocess generates the feed with src.synthetic_feed (seeded, so
+every run and every commit sees the same CPTs, including ~1% malformed ones),
+then times process_cpts with a stub send_notification that always succeeds.
+Logging is disabled, so the figures are for the filtering, date handling,
+announced-state and scheduling work itself.
+
+A second pass over a fresh checker runs under tracemalloc and reports the
+peak memory allocated while processing and the number of blocks still held
+afterwards (announced keys, scheduler entries); it is skipped above
+--trace-limit CPTs, where tracemalloc's own overhead dominates. Peak RSS
+includes the generated feed itself, which is reported separately.
+
+Results are written as JSON (commit, Python, seed, one entry per size), and
+--compare prints the speedup against an earlier results file.
+
+Usage:
+    python tests/benchmark_process_cpts.py                        # 1k, 10k, 100k, 1M
+    python tests/benchmark_process_cpts.py --sizes 1000 10000 --output before.json
+    python tests/benchmark_process_cpts.py --compare before.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+# Fixed "now" so dates (and therefore due notifications) do not drift between runs
+NOW = datetime(2026, 2, 7, 19, 0, 0, tzinfo=timezone.utc)
+
+
+def peak_rss_mib():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def make_checker(tmpdir):
+    from src.clock import ManualClock
+    from src.cogs.cpt_checker import CPTChecker
+    from src.storage import JsonAnnouncedStore
+
+    with patch('discord.ext.tasks.Loop.start'):
+        checker = CPTChecker(MagicMock(), clock=ManualClock(NOW))
+    checker.store = JsonAnnouncedStore(os.path.join(tmpdir, "cpts.json"))
+    sent = []
+
+    async def send_notification(cpt, title, key=None):
+        sent.append(key)
+        return True
+
+    checker.send_notification = send_notification
+    return checker, sent
+
+
+def run_child(count, seed, trace_limit):
+    from src.synthetic_feed import generate_cpts
+
+    cpts = generate_cpts(count, seed=seed, now=NOW)
+    rss_after_generate = peak_rss_mib()
+    result = {"cpts": count}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        checker, sent = make_checker(tmpdir)
+        start = time.perf_counter()
+        asyncio.run(checker.process_cpts(cpts))
+        elapsed = time.perf_counter() - start
+        result.update({
+            "seconds": round(elapsed, 4),
+            "cpts_per_s": round(count / elapsed),
+            "notified": len(sent),
+            "scheduled": len(checker.scheduler),
+            "feed_rss_mib": round(rss_after_generate, 1),
+            "peak_rss_mib": round(peak_rss_mib(), 1),
+        })
+
+        if count <= trace_limit:
+            checker, _ = make_checker(tmpdir)
+            tracemalloc.start()
+            asyncio.run(checker.process_cpts(cpts))
+            snapshot = tracemalloc.take_snapshot()
+            result["retained_blocks"] = sum(stat.count for stat in snapshot.statistics("filename"))
+            result["traced_peak_mib"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+            tracemalloc.stop()
+    print(json.dumps(result))
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], check=True, capture_output=True,
+                              text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--trace-limit", type=int, default=100_000,
+                        help="largest size that also gets a tracemalloc pass")
+    parser.add_argument("--output", default="data/benchmarks/process_cpts.json")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--child", type=int, metavar="N", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        logging.disable(logging.CRITICAL)
+        run_child(args.child, args.seed, args.trace_limit)
+        return
+
+    results = []
+    print(f"{'cpts':>10}{'wall time':>12}{'CPTs/s':>12}{'notified':>10}{'feed RSS':>12}{'peak RSS':>12}"
+          f"{'traced peak':>13}{'retained':>10}")
+    for count in args.sizes:
+        out = subprocess.run([sys.executable, __file__, "--child", str(count), "--seed", str(args.seed),
+                              "--trace-limit", str(args.trace_limit)],
+                             check=True, capture_output=True, text=True).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        results.append(result)
+        traced = f"{result['traced_peak_mib']:>9.1f} MiB" if "traced_peak_mib" in result else f"{'-':>13}"
+        retained = f"{result['retained_blocks']:>10}" if "retained_blocks" in result else f"{'-':>10}"
+        print(f"{count:>10}{result['seconds']:>11.2f}s{result['cpts_per_s']:>12}{result['notified']:>10}"
+              f"{result['feed_rss_mib']:>8.1f} MiB{result['peak_rss_mib']:>8.1f} MiB{traced}{retained}")
+
+    report = {
+        "benchmark": "process_cpts",
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "results": results,
+    }
+    directory = os.path.dirname(args.output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        previous = {entry["cpts"]: entry for entry in baseline["results"]}
+        print(f"Compared with {baseline.get('commit') or args.compare}:")
+        for result in results:
+            if result["cpts"] in previous:
+                speedup = result["cpts_per_s"] / previous[result["cpts"]]["cpts_per_s"]
+                print(f"{result['cpts']:>10}  {speedup:.2f}x CPTs/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cold startup cost of importing the bot and constructing its cogs.
+
+Each run is a fresh interpreter (so nothing is cached in sys.modules) that
+installs the startup profiler, imports src.bot and both cogs, and constructs
+CPTChecker and EventBridge with a mock bot (the check loop is not started).
+Nothing touches the network: cog_load (session, web server) is not run.
+Reports the median over all runs and the slowest imports of the median run.
+
+The script exits with status 1 if the median is over --budget-ms
+(DEFAULT_BUDGET_MS unless given, 0 disables the check), so it guards
+against import-time regressions in CI.
+
+Usage:
+    python tests/benchmark_startup.py
+    python tests/benchmark_startup.py --runs 10 --top 15 --budget-ms 1000
+    python tests/benchmark_startup.py --budget-ms 0     # report only
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+# Generous headroom over the ~400ms measured on a dev machine; catches heavy imports creeping back in
+DEFAULT_BUDGET_MS = 1500
+
+CHILD = """
+import sys
+sys.path.insert(0, {root!r})
+from src import startup_profile
+profiler = startup_profile.start_profiling({path!r})
+with startup_profile.phase("import src.bot"):
+    import src.bot
+with startup_profile.phase("import cogs"):
+    from src.cogs.cpt_checker import CPTChecker
+    from src.cogs.event_bridge import EventBridge
+from unittest.mock import MagicMock, patch
+with startup_profile.phase("construct cogs"), patch("discord.ext.tasks.Loop.start"):
+    CPTChecker(MagicMock())
+    EventBridge(MagicMock())
+startup_profile.finish()
+from src.logging_setup import shutdown_logging
+shutdown_logging()
+"""
+
+
+def run_once(path):
+    with tempfile.TemporaryDirectory() as cwd:
+        # Run in a scratch directory: importing src.bot creates data/logs/
+        subprocess.run([sys.executable, "-c", CHILD.format(root=ROOT, path=path)], cwd=cwd, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="number of slowest imports to list")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help="fail if the median startup exceeds this (default: %(default)g, 0 disables)")
+    args = parser.parse_args()
+
+    reports = []
+    with tempfile.TemporaryDirectory() as out_dir:
+        for i in range(args.runs):
+            reports.append(run_once(os.path.join(out_dir, f"startup-{i}.json")))
+    totals = [report["marks_ms"]["ready"] for report in reports]
+    median = statistics.median(totals)
+    median_report = min(reports, key=lambda report: abs(report["marks_ms"]["ready"] - median))
+
+    print(f"{args.runs} runs, Python {median_report['python']}")
+    print(f"startup: median {median:.1f}ms, min {min(totals):.1f}ms, max {max(totals):.1f}ms")
+    for phase in median_report["phases"]:
+        print(f"  {phase['name']:<20}{phase['duration_ms']:>10.1f}ms")
+    print("slowest imports (median run, cumulative / self):")
+    for entry in median_report["imports"][:args.top]:
+        print(f"  {entry['module']:<40}{entry['cumulative_ms']:>10.1f}ms{entry['self_ms']:>10.1f}ms")
+
+    if args.budget_ms and median > args.budget_ms:
+        print(f"FAIL: median startup {median:.1f}ms is over the {args.budget_ms:g}ms budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.announced import AnnouncedIndex
+from src.clock import ManualClock
+
+NOW = datetime(2026, 2, 10, 12, 0, tzinfo=timezone.utc)
+
+
+class TestAnnouncedIndex(unittest.TestCase):
+    def test_behaves_like_dict(self):
+        index = AnnouncedIndex({"1_3day": "2026-02-12T19:00:00+00:00"})
+        index["2_today"] = "2026-02-10T19:00:00+00:00"
+        self.assertIn("2_today", index)
+        self.assertEqual(len(index), 2)
+        self.assertEqual(dict(index), {"1_3day": "2026-02-12T19:00:00+00:00", "2_today": "2026-02-10T19:00:00+00:00"})
+        self.assertEqual(index.event_date("1_3day"), datetime(2026, 2, 12, 19, 0, tzinfo=timezone.utc))
+        del index["1_3day"]
+        self.assertNotIn("1_3day", index)
+
+    def test_pop_expired_only_returns_due_entries(self):
+        index = AnnouncedIndex({
+            "old": (NOW - timedelta(days=3)).isoformat(),
+            "yesterday": (NOW - timedelta(hours=20)).isoformat(),  # still within the 1 day buffer
+            "future": (NOW + timedelta(days=2)).isoformat(),
+            "broken": "not-a-date",
+        })
+        expired = index.pop_expired(NOW)
+        self.assertEqual(sorted(key for key, _ in expired), ["broken", "old"])
+        self.assertEqual(sorted(index), ["future", "yesterday"])
+        self.assertEqual(index.pop_expired(NOW), [])
+        self.assertEqual(index.next_expiry(), NOW - timedelta(hours=20) + timedelta(days=1))
+
+    def test_overwritten_and_deleted_keys_are_not_popped(self):
+        index = AnnouncedIndex({"a": (NOW - timedelta(days=3)).isoformat(), "b": (NOW - timedelta(days=3)).isoformat()})
+        index["a"] = (NOW + timedelta(days=3)).isoformat()  # rescheduled
+        del index["b"]
+        self.assertEqual(index.pop_expired(NOW), [])
+        self.assertIn("a", index)
+
+    def test_legacy_entries_use_ttl(self):
+        clock = ManualClock(NOW)
+        index = AnnouncedIndex({"legacy": None}, clock=clock, legacy_ttl=timedelta(days=30))
+        self.assertEqual(index.pop_expired(NOW + timedelta(days=29)), [])
+        self.assertEqual(index.pop_expired(NOW + timedelta(days=31)), [("legacy", None)])
+
+        recorded = {"legacy": NOW - timedelta(days=40)}
+        index = AnnouncedIndex({"legacy": None}, clock=clock, legacy_ttl=timedelta(days=30), recorded_at=recorded)
+        self.assertEqual(index.pop_expired(NOW), [("legacy", None)])
+
+        forever = AnnouncedIndex({"legacy": None}, clock=clock, legacy_ttl=None)
+        self.assertEqual(forever.pop_expired(NOW + timedelta(days=3650)), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+from unittest.mock import AsyncMock, MagicMock
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.command_sync import command_tree_hash, sync_commands
+
+
+def make_bot(*names):
+    bot = commands.Bot(command_prefix="!", intents=discord.Intents.none())
+    for name in names:
+        async def callback(interaction: discord.Interaction):
+            pass
+        bot.tree.add_command(app_commands.Command(name=name, description=f"{name} command", callback=callback))
+    bot.tree.sync = AsyncMock(side_effect=lambda guild=None: [object()] * len(bot.tree.get_commands(guild=guild)))
+    return bot
+
+
+class TestCommandSync(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.state_path = os.path.join(self.tmpdir.name, "command_sync.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_hash_is_stable_and_order_independent(self):
+        self.assertEqual(command_tree_hash(make_bot("a", "b").tree), command_tree_hash(make_bot("b", "a").tree))
+        self.assertNotEqual(command_tree_hash(make_bot("a").tree), command_tree_hash(make_bot("a", "b").tree))
+
+    async def test_syncs_only_when_tree_changes(self):
+        bot = make_bot("testcpt")
+        self.assertEqual(await sync_commands(bot.tree, state_path=self.state_path), 1)
+        self.assertIsNone(await sync_commands(bot.tree, state_path=self.state_path))
+        bot.tree.sync.assert_awaited_once_with(guild=None)
+
+        changed = make_bot("testcpt", "status")
+        self.assertEqual(await sync_commands(changed.tree, state_path=self.state_path), 2)
+        with open(self.state_path) as f:
+            self.assertEqual(json.load(f), {"global": command_tree_hash(changed.tree)})
+
+    async def test_force_and_guild_scope(self):
+        bot = make_bot("testcpt")
+        await sync_commands(bot.tree, state_path=self.state_path)
+        self.assertEqual(await sync_commands(bot.tree, force=True, state_path=self.state_path), 1)
+
+        # A dev guild is tracked separately and receives a copy of the global commands
+        self.assertEqual(await sync_commands(bot.tree, guild_id=1234, state_path=self.state_path), 1)
+        self.assertEqual(bot.tree.sync.await_args.kwargs["guild"].id, 1234)
+        self.assertIsNone(await sync_commands(bot.tree, guild_id=1234, state_path=self.state_path))
+        self.assertEqual(bot.tree.sync.await_count, 3)
+
+    async def test_failed_sync_is_retried_next_boot(self):
+        bot = make_bot("testcpt")
+        bot.tree.sync.side_effect = discord.HTTPException(MagicMock(status=429), "rate limited")
+        with self.assertRaises(discord.HTTPException):
+            await sync_commands(bot.tree, state_path=self.state_path)
+        self.assertFalse(os.path.exists(self.state_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
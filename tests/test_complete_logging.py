@@ -195,6 +195,10 @@ if __name__ == "__main__":
     simulate_api_error()
     simulate_event_bridge()
     
+    # Records are written by a background thread; flush them before reading the file
+    from src.logging_setup import shutdown_logging
+    shutdown_logging()
+
     # Verify everything was logged
     if verify_log_file():
         print("\n✅ SUCCESS: All logs are being written to data/logs/bot.log")
@@ -0,0 +1,171 @@
+import unittest
+import tempfile
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.clock import ManualClock
+from src.cogs.cpt_checker import CPTChecker, notification_times
+from src.cpt_diff import CPTDiffer
+from src.cpt_record import CPT
+from src.outbox import Outbox
+from src.synthetic_feed import churn_cpts, generate_cpts
+
+NOW = datetime(2026, 2, 7, 19, 0, 0, tzinfo=timezone.utc)
+
+
+def records(cpts):
+    return [CPT.from_api(cpt) for cpt in cpts]
+
+
+class TestCPTDiffer(unittest.TestCase):
+    def test_diff_matches_churn(self):
+        cpts = generate_cpts(2000, seed=3, now=NOW)
+        differ = CPTDiffer()
+        first = differ.diff(records(cpts), NOW)
+        self.assertEqual(len(first.added), 2000)
+
+        churned, changes = churn_cpts(cpts, rate=0.05, seed=3, now=NOW)
+        diff = differ.diff(records(churned), NOW)
+        self.assertEqual([cpt.id for cpt in diff.added], changes["added"])
+        self.assertEqual(sorted(new.id for _, new in diff.changed), sorted(changes["changed"]))
+        self.assertEqual(sorted(new.id for _, new in diff.rescheduled), sorted(changes["rescheduled"]))
+        self.assertEqual(sorted(cpt.id for cpt in diff.removed), sorted(changes["removed"]))
+        self.assertEqual(diff.unchanged, len(churned) - len(changes["added"]) - len(changes["changed"]))
+
+        again = differ.diff(records(churned), NOW)
+        self.assertEqual((again.count, again.removed, again.unchanged), (0, [], len(churned)))
+
+    def test_newly_due_and_cancelled(self):
+        upcoming = CPT.from_api({"id": 1, "position": "EDDM_TWR", "date": (NOW + timedelta(days=6)).isoformat()})
+        past = CPT.from_api({"id": 2, "position": "EDDM_TWR", "date": (NOW - timedelta(days=6)).isoformat()})
+        differ = CPTDiffer(due_times=notification_times)
+        differ.diff([upcoming, past], NOW)
+
+        # The "3day" window opens two days later: unchanged, but due again
+        self.assertEqual(differ.diff([upcoming, past], NOW + timedelta(days=1)).newly_due, [])
+        self.assertEqual(differ.diff([upcoming, past], NOW + timedelta(days=2)).newly_due, [upcoming])
+        self.assertEqual(differ.diff([upcoming, past], NOW + timedelta(days=2)).newly_due, [])
+
+        diff = differ.diff([], NOW + timedelta(days=2))
+        self.assertEqual(sorted(cpt.id for cpt in diff.removed), [1, 2])
+        self.assertEqual(diff.cancelled, [upcoming], "Only CPTs removed before their date are cancellations")
+
+    def test_unfinished_diff_keeps_snapshot(self):
+        differ = CPTDiffer()
+        differ.diff(records([{"id": 1}, {"id": 2}]), NOW)
+        partial = differ.begin(NOW)
+        self.assertEqual(partial.add(CPT.from_api({"id": 1, "confirmed": True})), "changed")
+        self.assertIsNone(partial.add(CPT.from_api({"id": 2})))
+        self.assertFalse(differ.snapshot[1][1].confirmed)
+
+    def test_unhashable_fields_fall_back_to_json_digest(self):
+        nested = {"id": 1, "position": "EDDM_TWR", "date": NOW.isoformat(), "course_name": {"de": "Turm"}}
+        differ = CPTDiffer()
+        self.assertEqual(differ.diff(records([nested]), NOW).added[0].course_name, {"de": "Turm"})
+        self.assertEqual(differ.diff(records([nested]), NOW).unchanged, 1)
+        changed = differ.diff(records([dict(nested, course_name={"de": "Tower"})]), NOW)
+        self.assertEqual(len(changed.changed), 1)
+
+
+class TestIncrementalProcessing(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.clock = ManualClock(NOW)
+        with patch('discord.ext.tasks.Loop.start'):
+            self.checker = CPTChecker(MagicMock(), clock=self.clock)
+        self.checker.store = MagicMock()
+        self.checker.outbox = Outbox(os.path.join(self.tmpdir.name, "cpt.jsonl"))
+        self.sent = []
+        self.fail = set()
+
+        async def send_notification(cpt, title, key=None):
+            if key in self.fail:
+                return False
+            self.sent.append(key)
+            return True
+
+        self.checker.send_notification = send_notification
+        self.cpt = {"id": 5, "position": "EDDM_TWR", "date": (NOW + timedelta(days=3)).isoformat(), "course_name": "TWR"}
+        self.feed = [self.cpt] + generate_cpts(200, seed=1, now=NOW, malformed_rate=0)[10:]
+
+    async def asyncTearDown(self):
+        self.tmpdir.cleanup()
+
+    async def test_unchanged_feed_is_not_reevaluated(self):
+        await self.checker.process_feed(self.feed)
+        self.assertIn("5_3day", self.sent)
+
+        with patch.object(self.checker, 'process_cpt', wraps=self.checker.process_cpt) as process_cpt:
+            diff = await self.checker.process_feed([dict(cpt) for cpt in self.feed])
+        self.assertEqual(process_cpt.call_count, 0)
+        self.assertEqual(diff.unchanged, len(self.feed))
+
+    async def test_reschedule_invalidates_announced_keys(self):
+        await self.checker.process_feed(self.feed)
+        moved = dict(self.cpt, date=(NOW + timedelta(days=4)).isoformat())
+        diff = await self.checker.process_feed([moved] + self.feed[1:])
+
+        self.assertEqual([(old.date_str, new.date_str) for old, new in diff.rescheduled], [(self.cpt["date"], moved["date"])])
+        self.assertEqual(self.sent.count("5_3day"), 2, "Rescheduled CPT is announced again for its new date")
+        self.checker.store.delete.assert_called_once_with(["5_3day"])
+
+    async def test_removed_upcoming_cpt_is_cancelled(self):
+        await self.checker.process_feed(self.feed)
+        self.assertIn("5_today", self.checker.scheduler)
+        diff = await self.checker.process_feed(self.feed[1:])
+        self.assertEqual([cpt.id for cpt in diff.cancelled], [5])
+        self.assertNotIn("5_today", self.checker.scheduler)
+
+    async def test_full_refresh_cancels_missing_cpt(self):
+        cpt = {"id": 42, "position": "EDDM_TWR", "date": (NOW + timedelta(days=6)).isoformat()}
+        with patch('src.cogs.cpt_checker.CPT_INCREMENTAL', False):
+            await self.checker.process_feed([cpt])
+            self.assertIn("42_3day", self.checker.scheduler)
+            await self.checker.process_feed([])
+        self.assertNotIn("42_3day", self.checker.scheduler)
+        self.assertNotIn("42_today", self.checker.scheduler)
+
+        self.clock.advance(days=3)
+        await self.checker.fire_scheduled(self.checker.scheduler.pop_due())
+        self.assertNotIn("42_3day", self.sent)
+
+    async def test_failed_send_is_retried_next_run(self):
+        self.fail = {"5_3day"}
+        await self.checker.process_feed(self.feed)
+        self.fail = set()
+        await self.checker.process_feed(self.feed)
+        self.assertEqual(self.sent.count("5_3day"), 1)
+        self.assertIn("5_3day", self.checker.cpts_announced)
+
+    async def test_feed_with_unhashable_field_is_processed(self):
+        nested = dict(self.cpt, course_name={"de": "Turm", "en": "Tower"})
+        await self.checker.process_feed([nested] + self.feed[1:])
+        diff = await self.checker.process_feed([dict(nested)] + self.feed[1:])
+        self.assertIn("5_3day", self.sent)
+        self.assertEqual(diff.unchanged, len(self.feed))
+
+    async def test_streamed_feed_is_evaluated_without_snapshot(self):
+        async def stream(cpts, complete):
+            for cpt in cpts:
+                yield cpt
+            self.checker.stream_complete = complete
+
+        await self.checker.process_feed(stream(self.feed, complete=True))
+        self.assertIn("5_3day", self.sent)
+        self.assertEqual(len(self.checker.cpt_diff), 0, "Streamed feeds keep no per-CPT snapshot")
+        self.assertIn("5_today", self.checker.scheduler)
+
+        # An interrupted stream cancels nothing; a complete one without the CPT does
+        await self.checker.process_feed(stream(self.feed[1:50], complete=False))
+        self.assertIn("5_today", self.checker.scheduler)
+        await self.checker.process_feed(stream(self.feed[1:], complete=True))
+        self.assertNotIn("5_today", self.checker.scheduler)
+
+
+if __name__ == '__main__':
+    unittest.main()
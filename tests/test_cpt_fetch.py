@@ -0,0 +1,165 @@
+import unittest
+import json
+import tempfile
+from unittest.mock import AsyncMock, MagicMock, patch
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.cogs.cpt_checker import CPTChecker
+
+SAMPLE_CPTS = [
+    {"id": 1, "position": "EDDM_TWR", "date": "2026-02-17T18:00:00+00:00"},
+    {"id": 2, "position": "EDGG_CTR", "date": "2026-02-18T18:00:00+00:00"},
+]
+
+
+class TestCPTFetchSession(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.requests_seen = 0
+
+        async def cpts_handler(request):
+            self.requests_seen += 1
+            return web.json_response({"data": SAMPLE_CPTS})
+
+        app = web.Application()
+        app.router.add_get("/cpts", cpts_handler)
+        self.server = TestServer(app)
+        await self.server.start_server()
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+        with patch('discord.ext.tasks.Loop.start'):
+            self.checker = CPTChecker(MagicMock())
+        self.checker.api_url = str(self.server.make_url("/cpts"))
+        self.checker.snapshot_path = os.path.join(self.tmpdir.name, "cpt_snapshot.json")
+        self.checker.payload_log.directory = os.path.join(self.tmpdir.name, "payloads")
+        await self.checker.cog_load()
+
+    async def asyncTearDown(self):
+        await self.checker.cog_unload()
+        await self.server.close()
+        self.tmpdir.cleanup()
+
+    async def test_session_is_reused_between_fetches(self):
+        session = self.checker.session
+        self.assertIsNotNone(session)
+
+        first = await self.checker.fetch_cpts()
+        self.assertEqual(first, self.checker.parse_cpts(SAMPLE_CPTS))
+        self.assertFalse(self.checker.last_fetch_timings["reused_connection"])
+        self.assertIn("connect", self.checker.last_fetch_timings)
+
+        second = await self.checker.fetch_cpts()
+        self.assertEqual(second, self.checker.parse_cpts(SAMPLE_CPTS))
+        self.assertIs(self.checker.session, session, "fetch_cpts should not create a new session")
+        self.assertTrue(self.checker.last_fetch_timings["reused_connection"],
+                        "Second fetch should reuse the keep-alive connection")
+        self.assertIn("first_byte", self.checker.last_fetch_timings)
+        self.assertIn("body", self.checker.last_fetch_timings)
+        self.assertEqual(self.requests_seen, 2)
+
+    async def test_cog_unload_closes_session(self):
+        session = self.checker.session
+        await self.checker.cog_unload()
+        self.assertTrue(session.closed)
+        self.assertIsNone(self.checker.session)
+
+    async def test_stream_cpts_feeds_process_cpts(self):
+        self.checker.send_notification = AsyncMock(return_value=True)
+        streamed = [cpt async for cpt in self.checker.stream_cpts()]
+        self.assertEqual(streamed, self.checker.parse_cpts(SAMPLE_CPTS))
+
+        with patch.object(self.checker, "process_cpt", AsyncMock()) as process_cpt:
+            await self.checker.process_cpts(self.checker.stream_cpts())
+        self.assertEqual([c.args[0] for c in process_cpt.call_args_list], self.checker.parse_cpts(SAMPLE_CPTS))
+
+
+class TestConditionalFetch(unittest.IsolatedAsyncioTestCase):
+    """Exercises ETag / If-Modified-Since handling against a local stand-in for the training API."""
+
+    ETAG = '"v1"'
+    LAST_MODIFIED = "Tue, 17 Feb 2026 12:00:00 GMT"
+
+    async def asyncSetUp(self):
+        self.status_override = None
+        self.conditional_headers = []
+
+        async def cpts_handler(request):
+            self.conditional_headers.append((request.headers.get("If-None-Match"),
+                                             request.headers.get("If-Modified-Since")))
+            if self.status_override:
+                return web.Response(status=self.status_override, text="upstream broken")
+            if request.headers.get("If-None-Match") == self.ETAG:
+                return web.Response(status=304)
+            return web.json_response({"data": SAMPLE_CPTS},
+                                     headers={"ETag": self.ETAG, "Last-Modified": self.LAST_MODIFIED})
+
+        app = web.Application()
+        app.router.add_get("/cpts", cpts_handler)
+        self.server = TestServer(app)
+        await self.server.start_server()
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.snapshot_path = os.path.join(self.tmpdir.name, "cpt_snapshot.json")
+        self.checker = await self.make_checker()
+
+    async def make_checker(self):
+        with patch('discord.ext.tasks.Loop.start'):
+            checker = CPTChecker(MagicMock())
+        checker.api_url = str(self.server.make_url("/cpts"))
+        checker.snapshot_path = self.snapshot_path
+        checker.payload_log.directory = os.path.join(self.tmpdir.name, "payloads")
+        await checker.cog_load()
+        return checker
+
+    async def asyncTearDown(self):
+        await self.checker.cog_unload()
+        await self.server.close()
+        self.tmpdir.cleanup()
+
+    async def test_200_stores_validators_and_snapshot(self):
+        cpts = await self.checker.fetch_cpts()
+        self.assertEqual(cpts, self.checker.parse_cpts(SAMPLE_CPTS))
+        self.assertEqual(self.conditional_headers, [(None, None)], "First fetch must be unconditional")
+        self.assertEqual(self.checker.api_etag, self.ETAG)
+        self.assertEqual(self.checker.api_last_modified, self.LAST_MODIFIED)
+        self.assertTrue(os.path.exists(self.snapshot_path))
+        with open(self.snapshot_path) as f:
+            self.assertEqual(json.load(f)["data"], SAMPLE_CPTS, "Snapshot keeps the API's raw entries")
+
+    async def test_304_reuses_cached_cpts(self):
+        await self.checker.fetch_cpts()
+        cpts = await self.checker.fetch_cpts()
+        self.assertEqual(cpts, self.checker.parse_cpts(SAMPLE_CPTS))
+        self.assertEqual(self.conditional_headers[1], (self.ETAG, self.LAST_MODIFIED))
+
+    async def test_snapshot_survives_restart(self):
+        await self.checker.fetch_cpts()
+        await self.checker.cog_unload()
+
+        # A fresh cog (bot restart) has the snapshot before any network call
+        self.checker = await self.make_checker()
+        self.assertEqual(self.checker.cached_cpts, self.checker.parse_cpts(SAMPLE_CPTS))
+        cpts = await self.checker.fetch_cpts()
+        self.assertEqual(cpts, self.checker.parse_cpts(SAMPLE_CPTS))
+        self.assertEqual(self.conditional_headers[-1][0], self.ETAG, "Restarted cog should send If-None-Match")
+
+    async def test_error_falls_back_to_snapshot(self):
+        await self.checker.fetch_cpts()
+        self.status_override = 503
+        cpts = await self.checker.fetch_cpts()
+        self.assertEqual(cpts, self.checker.parse_cpts(SAMPLE_CPTS))
+
+    async def test_error_without_snapshot_returns_empty(self):
+        self.status_override = 500
+        cpts = await self.checker.fetch_cpts()
+        self.assertEqual(cpts, [])
+        self.assertFalse(os.path.exists(self.snapshot_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
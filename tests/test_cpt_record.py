@@ -0,0 +1,44 @@
+import unittest
+from datetime import datetime, timezone
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.cpt_record import CPT
+from src.fir_matcher import FIRMatcher
+
+MATCHER = FIRMatcher(["EDMM", "EDDM"])
+API_CPT = {"id": 7, "position": "EDDM_TWR", "date": "2026-02-10T18:00:00+00:00", "confirmed": True,
+           "course_name": "Tower", "trainee_name": "Trainee 7", "trainee_vatsim_id": 1234567, "local_name": "Mentor 1"}
+
+
+class TestCPTRecord(unittest.TestCase):
+    def test_parsed_once_at_ingest(self):
+        cpt = CPT.from_api(API_CPT, MATCHER)
+        self.assertEqual(cpt.date, datetime(2026, 2, 10, 18, 0, tzinfo=timezone.utc))
+        self.assertTrue(cpt.in_fir)
+        self.assertTrue(cpt.confirmed)
+        self.assertIsNone(cpt.raw_date)
+        self.assertFalse(hasattr(cpt, "__dict__"), "Records are slotted")
+        self.assertEqual(cpt.to_dict(), API_CPT)
+
+    def test_validation(self):
+        self.assertEqual(CPT.from_api({"id": 1, "date": "2026-02-10T18:00:00"}).date.tzinfo, timezone.utc)
+
+        invalid = CPT.from_api({"id": 2, "position": "edmm_ctr", "date": "10/02/2026 at 18:00"}, MATCHER)
+        self.assertIsNone(invalid.date)
+        self.assertEqual(invalid.raw_date, "10/02/2026 at 18:00")
+        self.assertFalse(invalid.in_fir)
+
+        missing = CPT.from_api({"id": 3, "position": None, "date": None}, MATCHER)
+        self.assertEqual((missing.position, missing.date, missing.raw_date, missing.in_fir), ("", None, None, False))
+
+    def test_hash_follows_content(self):
+        self.assertEqual(hash(CPT.from_api(API_CPT, MATCHER)), hash(CPT.from_api(dict(API_CPT), MATCHER)))
+        self.assertNotEqual(CPT.from_api(API_CPT, MATCHER), CPT.from_api(dict(API_CPT, confirmed=False), MATCHER))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+import tempfile
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.clock import ManualClock
+from src.cogs.cpt_checker import CPTChecker
+from src.outbox import Outbox
+from src.rate_limit import RateLimiter
+
+NOW = datetime(2026, 2, 7, 19, 0, 0, tzinfo=timezone.utc)
+
+
+class RecordingChannel:
+    def __init__(self, fail_first=False):
+        self.messages = []
+        self.fail_first = fail_first
+
+    async def send(self, content=None, embeds=None, embed=None):
+        if self.fail_first:
+            self.fail_first = False
+            raise RuntimeError("Discord unavailable")
+        self.messages.append((content, embeds if embeds is not None else [embed]))
+
+
+def make_cpts(count, start_id, date):
+    return [{"id": i, "position": "EDDM_TWR", "date": date.isoformat(), "trainee_name": f"Trainee {i}",
+             "course_name": "Tower"} for i in range(start_id, start_id + count)]
+
+
+class TestDigestMode(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.patches = [patch('src.cogs.cpt_checker.CPT_DIGEST_MODE', True),
+                        patch('src.cogs.cpt_checker.CPT_ROLE_ID', 42)]
+        for p in self.patches:
+            p.start()
+
+    async def asyncTearDown(self):
+        for p in self.patches:
+            p.stop()
+        self.tmpdir.cleanup()
+
+    def make_checker(self, channel):
+        bot = MagicMock()
+        bot.get_channel.return_value = channel
+        with patch('discord.ext.tasks.Loop.start'):
+            checker = CPTChecker(bot, clock=ManualClock(NOW))
+        checker.store = MagicMock()
+        checker.outbox = Outbox(os.path.join(self.tmpdir.name, "cpt.jsonl"))
+        checker.channel_limiter = RateLimiter(rate=0)
+        return checker
+
+    async def test_groups_by_type_with_one_ping(self):
+        channel = RecordingChannel()
+        checker = self.make_checker(channel)
+        cpts = make_cpts(12, 1, NOW + timedelta(days=3)) + make_cpts(2, 100, NOW + timedelta(hours=3))
+
+        await checker.process_cpts(cpts)
+
+        self.assertEqual([len(embeds) for _, embeds in channel.messages], [10, 2, 2])
+        self.assertEqual([content for content, _ in channel.messages], ["<@&42>", "", ""])
+        self.assertTrue(channel.messages[2][1][0].title.startswith("CPT Heute!"))
+        self.assertEqual(len(checker.cpts_announced), 14)
+        self.assertEqual(checker.outbox.pending(), [])
+
+    async def test_overflow_is_summarized(self):
+        channel = RecordingChannel()
+        checker = self.make_checker(channel)
+        with patch('src.cogs.cpt_checker.CPT_DIGEST_MAX_MESSAGES', 2):
+            await checker.process_cpts(make_cpts(35, 1, NOW + timedelta(days=3)))
+
+        self.assertEqual([len(embeds) for _, embeds in channel.messages], [10, 1])
+        summary = channel.messages[1][1][0]
+        self.assertEqual(summary.title, "Weitere CPTs (25)")
+        self.assertEqual(len(summary.description.splitlines()), 25)
+        self.assertIn("Trainee 35", summary.description)
+        self.assertEqual(len(checker.cpts_announced), 35)
+
+    async def test_failed_message_keeps_ping_and_stays_pending(self):
+        channel = RecordingChannel(fail_first=True)
+        checker = self.make_checker(channel)
+        await checker.process_cpts(make_cpts(11, 1, NOW + timedelta(days=3)))
+
+        # The first message (10 embeds) failed; the second carries the ping
+        self.assertEqual([(content, len(embeds)) for content, embeds in channel.messages], [("<@&42>", 1)])
+        self.assertEqual(set(checker.cpts_announced), {"11_3day"})
+        self.assertEqual(len(checker.outbox.pending()), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
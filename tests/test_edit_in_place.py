@@ -0,0 +1,127 @@
+import unittest
+import tempfile
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+import sys
+import os
+
+import discord
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.clock import ManualClock
+from src.cogs.cpt_checker import CPTChecker
+from src.cpt_messages import CPTMessageStore, embed_hash
+from src.outbox import Outbox
+from src.rate_limit import RateLimiter
+
+NOW = datetime(2026, 2, 7, 19, 0, 0, tzinfo=timezone.utc)
+
+
+class FakeMessage:
+    def __init__(self, channel, message_id):
+        self.channel = channel
+        self.id = message_id
+
+    async def edit(self, embed=None):
+        if self.id in self.channel.deleted:
+            raise discord.NotFound(MagicMock(status=404), "Unknown Message")
+        self.channel.edits.append((self.id, embed))
+
+
+class FakeChannel:
+    def __init__(self):
+        self.posts = []
+        self.edits = []
+        self.deleted = set()
+
+    async def send(self, content=None, embed=None):
+        self.posts.append((content, embed))
+        return FakeMessage(self, len(self.posts))
+
+    def get_partial_message(self, message_id):
+        return FakeMessage(self, message_id)
+
+
+class TestEditInPlace(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.patch = patch('src.cogs.cpt_checker.CPT_EDIT_IN_PLACE', True)
+        self.patch.start()
+        self.channel = FakeChannel()
+        self.clock = ManualClock(NOW)
+        bot = MagicMock()
+        bot.get_channel.return_value = self.channel
+        with patch('discord.ext.tasks.Loop.start'):
+            self.checker = CPTChecker(bot, clock=self.clock)
+        self.checker.store = MagicMock()
+        self.checker.outbox = Outbox(os.path.join(self.tmpdir.name, "cpt.jsonl"))
+        self.checker.channel_limiter = RateLimiter(rate=0)
+        self.checker.cpt_messages = CPTMessageStore(os.path.join(self.tmpdir.name, "cpt_messages.json"))
+        self.cpt = {"id": 7, "position": "EDDM_TWR", "date": (NOW + timedelta(days=3, hours=2)).isoformat(),
+                    "course_name": "Tower", "confirmed": False}
+
+    async def asyncTearDown(self):
+        self.patch.stop()
+        self.tmpdir.cleanup()
+
+    async def test_first_post_is_tracked_and_unchanged_rerun_is_free(self):
+        await self.checker.process_cpts([self.cpt])
+        self.assertEqual(len(self.channel.posts), 1)
+        tracked = self.checker.cpt_messages.get(7)
+        self.assertEqual(tracked["message_id"], 1)
+        self.assertEqual(tracked["hash"], embed_hash(self.channel.posts[0][1]))
+
+        await self.checker.process_cpts([dict(self.cpt)])
+        self.assertEqual((len(self.channel.posts), len(self.channel.edits)), (1, 0))
+
+    async def test_confirmed_flip_edits_the_message(self):
+        await self.checker.process_cpts([self.cpt])
+        await self.checker.process_cpts([dict(self.cpt, confirmed=True)])
+
+        self.assertEqual(len(self.channel.posts), 1)
+        self.assertEqual(len(self.channel.edits), 1)
+        message_id, embed = self.channel.edits[0]
+        self.assertEqual(message_id, 1)
+        self.assertEqual(embed.color, discord.Color.green())
+        self.assertEqual(self.checker.cpt_messages.get(7)["hash"], embed_hash(embed))
+
+        await self.checker.process_cpts([dict(self.cpt, confirmed=True)])
+        self.assertEqual(len(self.channel.edits), 1)
+
+    async def test_today_stage_edits_instead_of_posting(self):
+        await self.checker.process_cpts([self.cpt])
+        self.clock.advance(days=3)
+        await self.checker.process_cpts([self.cpt])
+
+        self.assertEqual(len(self.channel.posts), 1)
+        self.assertEqual(len(self.channel.edits), 1)
+        self.assertTrue(self.channel.edits[0][1].title.startswith("CPT Heute!"))
+        self.assertIn("7_today", self.checker.cpts_announced)
+        self.assertEqual(self.checker.cpt_messages.get(7)["title"], "CPT Heute!")
+
+    async def test_deleted_message_is_posted_again(self):
+        await self.checker.process_cpts([self.cpt])
+        self.channel.deleted.add(1)
+        self.clock.advance(days=3)
+        await self.checker.process_cpts([self.cpt])
+
+        self.assertEqual(len(self.channel.posts), 2)
+        self.assertTrue(self.channel.posts[1][1].title.startswith("CPT Heute!"))
+        self.assertEqual(self.checker.cpt_messages.get(7)["message_id"], 2)
+        self.assertIn("7_today", self.checker.cpts_announced)
+
+    async def test_store_persists_and_expires(self):
+        await self.checker.process_cpts([self.cpt])
+        self.checker.save_announced_cpts()
+
+        reloaded = CPTMessageStore(self.checker.cpt_messages.path)
+        self.assertEqual(reloaded.get(7)["message_id"], 1)
+        self.assertEqual(reloaded.remove_expired(NOW + timedelta(days=3)), 0)
+        self.assertEqual(reloaded.remove_expired(NOW + timedelta(days=4)), 1)
+        self.assertEqual(len(reloaded), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+import unittest
+import asyncio
+import tempfile
+from unittest.mock import MagicMock
+from aiohttp.test_utils import TestClient, TestServer
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.cogs.event_bridge import EventBridge
+from src.outbox import Outbox
+from src.config import EVENT_MANAGER_API_TOKEN
+
+AUTH = {"Authorization": f"Bearer {EVENT_MANAGER_API_TOKEN}"}
+
+
+class FakeChannel:
+    """Channel whose send blocks until the test releases it."""
+
+    def __init__(self, channel_id):
+        self.id = channel_id
+        self.sent = []
+        self.release = asyncio.Event()
+
+    async def send(self, content=None, embed=None, embeds=None):
+        await self.release.wait()
+        self.sent.append((content, embed, embeds))
+
+
+class TestEventBridgeDeliveryQueue(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.channels = {1: FakeChannel(1), 2: FakeChannel(2)}
+        bot = MagicMock()
+        bot.get_channel.side_effect = self.channels.get
+        self.cog = EventBridge(bot)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cog.outbox = Outbox(os.path.join(self.tmpdir.name, "bridge.jsonl"))
+        self.client = TestClient(TestServer(self.cog.app))
+        await self.client.start_server()
+
+    async def asyncTearDown(self):
+        await self.cog.queue.close()
+        await self.client.close()
+        await self.cog.outbox.flush()
+        self.tmpdir.cleanup()
+
+    async def notify(self, payload, headers=AUTH):
+        return await self.client.post("/api/notify", json=payload, headers=headers)
+
+    async def test_returns_202_before_discord_send_completes(self):
+        resp = await self.notify({"channel_id": 1, "message": "hello"})
+        self.assertEqual(resp.status, 202)
+        delivery_id = (await resp.json())["delivery_id"]
+        self.assertEqual(self.channels[1].sent, [], "Handler must not wait for the Discord send")
+
+        status = await (await self.client.get(f"/api/notify/{delivery_id}", headers=AUTH)).json()
+        self.assertIn(status["status"], ("queued", "sending"))
+
+        self.channels[1].release.set()
+        await self.cog.queue.join()
+        status = await (await self.client.get(f"/api/notify/{delivery_id}", headers=AUTH)).json()
+        self.assertEqual(status["status"], "sent")
+        self.assertEqual(self.channels[1].sent, [("hello", None, None)])
+
+    async def test_lanes_are_independent_per_channel(self):
+        await self.notify({"channel_id": 1, "message": "stuck"})
+        await self.notify({"channel_id": 2, "message": "free"})
+        self.channels[2].release.set()
+        for _ in range(10):
+            await asyncio.sleep(0)
+        self.assertEqual(self.channels[2].sent, [("free", None, None)])
+        self.assertEqual(self.channels[1].sent, [])
+        self.channels[1].release.set()
+
+    async def test_full_queue_returns_503_with_retry_after(self):
+        self.cog.queue.max_depth = 2
+        for _ in range(2):
+            self.assertEqual((await self.notify({"channel_id": 1, "message": "x"})).status, 202)
+        resp = await self.notify({"channel_id": 1, "message": "x"})
+        self.assertEqual(resp.status, 503)
+        self.assertIn("Retry-After", resp.headers)
+        self.channels[1].release.set()
+        await self.cog.queue.join()
+        self.assertEqual((await self.notify({"channel_id": 1, "message": "x"})).status, 202)
+
+    async def test_validation_errors_are_synchronous(self):
+        self.assertEqual((await self.notify({"channel_id": 1}, headers={})).status, 401)
+        self.assertEqual((await self.notify({"message": "no channel"})).status, 400)
+        self.assertEqual((await self.notify({"channel_id": 99})).status, 404)
+        self.assertEqual((await self.client.get("/api/notify/unknown", headers=AUTH)).status, 404)
+        self.assertEqual(self.cog.queue.depth, 0)
+
+
+
+class TestEventBridgeBatch(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.channels = {1: FakeChannel(1), 2: FakeChannel(2)}
+        for channel in self.channels.values():
+            channel.release.set()
+        bot = MagicMock()
+        bot.get_channel.side_effect = self.channels.get
+        self.cog = EventBridge(bot)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cog.outbox = Outbox(os.path.join(self.tmpdir.name, "bridge.jsonl"))
+        self.client = TestClient(TestServer(self.cog.app))
+        await self.client.start_server()
+
+    async def asyncTearDown(self):
+        await self.cog.queue.close()
+        await self.client.close()
+        await self.cog.outbox.flush()
+        self.tmpdir.cleanup()
+
+    async def batch(self, notifications, headers=AUTH):
+        return await self.client.post("/api/notify/batch", json={"notifications": notifications}, headers=headers)
+
+    async def test_packs_embeds_per_channel(self):
+        position = lambda i: {"title": f"Position {i}", "description": "EDDM_TWR"}
+        notifications = [{"channel_id": 1, "role_id": 5, "message": "Neue Positionen", "embed": position(i)}
+                         for i in range(12)]
+        notifications.insert(3, {"channel_id": 2, "message": "other channel", "embed": position(99)})
+        notifications.append({"channel_id": 1, "message": "plain text only"})
+
+        resp = await self.batch(notifications)
+        self.assertEqual(resp.status, 202)
+        results = (await resp.json())["results"]
+        self.assertEqual([r["index"] for r in results], list(range(len(notifications))))
+        self.assertTrue(all(r["status"] == 202 for r in results))
+
+        await self.cog.queue.join()
+        sent = self.channels[1].sent
+        self.assertEqual(len(sent), 3, "12 embeds -> 10 + 2, plus one text-only message")
+        self.assertEqual(sent[0][0], "<@&5> Neue Positionen")
+        self.assertEqual(len(sent[0][2]), 10)
+        self.assertEqual([e.title for e in sent[1][2]], ["Position 10", "Position 11"])
+        self.assertEqual(sent[2], ("plain text only", None, None))
+        self.assertEqual(len(self.channels[2].sent), 1)
+
+        delivery_ids = {r["delivery_id"] for r in results if r["index"] != 3}
+        self.assertEqual(len(delivery_ids), 3)
+
+    async def test_per_item_errors(self):
+        resp = await self.batch([
+            {"channel_id": 1, "message": "ok"},
+            {"message": "missing channel"},
+            {"channel_id": 42, "message": "unknown channel"},
+            "not an object",
+        ])
+        self.assertEqual(resp.status, 202)
+        statuses = [r["status"] for r in (await resp.json())["results"]]
+        self.assertEqual(statuses, [202, 400, 404, 400])
+
+    async def test_rejects_bad_requests(self):
+        self.assertEqual((await self.batch([{"channel_id": 1}], headers={})).status, 401)
+        self.assertEqual((await self.batch([])).status, 400)
+        self.assertEqual((await self.batch([{"message": "no channel"}])).status, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.fir_matcher import FIRMatcher
+
+
+class TestFIRMatcher(unittest.TestCase):
+    def test_plain_prefixes(self):
+        matcher = FIRMatcher(["EDMM", "EDDM", " EDDN "])
+        self.assertTrue(matcher.matches("EDMM_CTR"))
+        self.assertTrue(matcher.matches("EDDN_TWR"), "Whitespace around patterns should be ignored")
+        self.assertFalse(matcher.matches("EDGG_CTR"))
+        self.assertFalse(matcher.matches(""))
+        self.assertFalse(matcher.matches(None))
+
+    def test_wildcard(self):
+        matcher = FIRMatcher(["EDMM_*_CTR"])
+        self.assertTrue(matcher.matches("EDMM_ALB_CTR"))
+        self.assertTrue(matcher.matches("EDMM_ZUG_N_CTR"))
+        self.assertFalse(matcher.matches("EDMM_CTR"))
+        self.assertFalse(matcher.matches("EDMM_ALB_APP"))
+
+    def test_exclusion_wins_over_includes(self):
+        matcher = FIRMatcher(["EDDM", "!EDDM_DEL", "EDMM_*_CTR", "!EDMM_TEST_*"])
+        self.assertTrue(matcher.matches("EDDM_TWR"))
+        self.assertFalse(matcher.matches("EDDM_DEL"))
+        self.assertTrue(matcher.matches("EDMM_ALB_CTR"))
+        self.assertFalse(matcher.matches("EDMM_TEST_CTR"))
+
+    def test_regex_characters_are_literal(self):
+        matcher = FIRMatcher(["ED.M*"])
+        self.assertTrue(matcher.matches("ED.M_TWR"))
+        self.assertFalse(matcher.matches("EDMM_TWR"))
+
+    def test_matches_legacy_prefix_loop(self):
+        prefixes = "EDMM,EDDM,EDDN,ETSI,ETSL,ETSN,EDJA,EDMA,EDMO,EDMS,EDMT,EDMV,EDMY,EDDP,EDDC,EDDE".split(",")
+        matcher = FIRMatcher(prefixes)
+        for position in ["EDDP_APP", "EDDC_TWR", "EDGG_CTR", "EDDF_APP", "ETSI_TWR", "EDM", "XEDMM_CTR"]:
+            with self.subTest(position=position):
+                expected = any(position.startswith(prefix) for prefix in prefixes)
+                self.assertEqual(matcher.matches(position), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+import unittest
+import asyncio
+import os
+import sys
+import tempfile
+from unittest.mock import MagicMock
+from aiohttp.test_utils import TestClient, TestServer
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.idempotency import IdempotencyCache
+from src.outbox import Outbox
+from src.cogs.event_bridge import EventBridge
+from src.config import EVENT_MANAGER_API_TOKEN
+
+AUTH = {"Authorization": f"Bearer {EVENT_MANAGER_API_TOKEN}"}
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestIdempotencyCache(unittest.IsolatedAsyncioTestCase):
+    async def test_runs_once_until_ttl_expires(self):
+        timer = FakeTimer()
+        cache = IdempotencyCache(ttl=60, timer=timer)
+        calls = []
+
+        async def func():
+            calls.append(1)
+            return len(calls)
+
+        self.assertEqual(await cache.run("k", func), (1, False))
+        timer.now = 59
+        self.assertEqual(await cache.run("k", func), (1, True))
+        timer.now = 61
+        self.assertEqual(await cache.run("k", func), (2, False))
+
+    async def test_evicts_least_recently_used(self):
+        cache = IdempotencyCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertEqual((cache.get("a"), cache.get("b"), cache.get("c")), (1, None, 3))
+
+    async def test_concurrent_requests_wait_for_first(self):
+        cache = IdempotencyCache()
+        release = asyncio.Event()
+        calls = 0
+
+        async def func():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return "done"
+
+        first = asyncio.create_task(cache.run("k", func))
+        second = asyncio.create_task(cache.run("k", func))
+        await asyncio.sleep(0)
+        release.set()
+        self.assertEqual(await first, ("done", False))
+        self.assertEqual(await second, ("done", True))
+        self.assertEqual(calls, 1)
+
+    async def test_failures_and_uncacheable_results_are_retried(self):
+        cache = IdempotencyCache()
+
+        async def boom():
+            raise RuntimeError("boom")
+
+        async def busy():
+            return 503
+
+        with self.assertRaises(RuntimeError):
+            await cache.run("k", boom)
+        self.assertEqual(await cache.run("k", busy, cacheable=lambda status: status < 500), (503, False))
+        self.assertEqual(len(cache), 0)
+
+
+class FakeChannel:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, content=None, embed=None, embeds=None):
+        self.sent.append(content)
+
+
+class TestNotifyIdempotencyKey(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.channel = FakeChannel()
+        bot = MagicMock()
+        bot.get_channel.side_effect = lambda channel_id: self.channel if channel_id == 1 else None
+        self.cog = EventBridge(bot)
+        self.cog.outbox = Outbox(os.path.join(self.tmpdir.name, "bridge.jsonl"))
+        self.client = TestClient(TestServer(self.cog.app))
+        await self.client.start_server()
+
+    async def asyncTearDown(self):
+        await self.cog.queue.close()
+        await self.client.close()
+        self.tmpdir.cleanup()
+
+    async def notify(self, payload, key, path="/api/notify"):
+        return await self.client.post(path, json=payload, headers={**AUTH, "Idempotency-Key": key})
+
+    async def test_retry_returns_stored_response_without_second_send(self):
+        first = await self.notify({"channel_id": 1, "message": "hello"}, "evt-1")
+        second = await self.notify({"channel_id": 1, "message": "hello"}, "evt-1")
+        await self.cog.queue.join()
+
+        self.assertEqual((first.status, second.status), (202, 202))
+        self.assertEqual((await first.json())["delivery_id"], (await second.json())["delivery_id"])
+        self.assertEqual(second.headers.get("Idempotent-Replayed"), "true")
+        self.assertNotIn("Idempotent-Replayed", first.headers)
+        self.assertEqual(self.channel.sent, ["hello"])
+
+        other = await self.notify({"channel_id": 1, "message": "hello"}, "evt-2")
+        await self.cog.queue.join()
+        self.assertNotEqual((await other.json())["delivery_id"], (await first.json())["delivery_id"])
+        self.assertEqual(len(self.channel.sent), 2)
+
+    async def test_retry_during_first_request_waits_for_it(self):
+        release = asyncio.Event()
+        accept = self.cog.accept_notification
+
+        async def slow_accept(request):
+            await release.wait()
+            return await accept(request)
+
+        self.cog.accept_notification = slow_accept
+        first = asyncio.create_task(self.notify({"channel_id": 1, "message": "hello"}, "evt-1"))
+        second = asyncio.create_task(self.notify({"channel_id": 1, "message": "hello"}, "evt-1"))
+        await asyncio.sleep(0.05)
+        release.set()
+        responses = await asyncio.gather(first, second)
+        await self.cog.queue.join()
+
+        ids = {(await resp.json())["delivery_id"] for resp in responses}
+        self.assertEqual(len(ids), 1)
+        self.assertEqual(self.channel.sent, ["hello"])
+
+    async def test_queue_full_is_not_remembered(self):
+        self.cog.queue.max_depth = 0
+        self.assertEqual((await self.notify({"channel_id": 1, "message": "x"}, "evt-1")).status, 503)
+        self.cog.queue.max_depth = 10
+        self.assertEqual((await self.notify({"channel_id": 1, "message": "x"}, "evt-1")).status, 202)
+
+    async def test_client_errors_are_remembered_and_keys_scoped_per_route(self):
+        resp = await self.notify({"channel_id": 2, "message": "x"}, "evt-1")
+        self.assertEqual(resp.status, 404)
+        self.assertEqual((await self.notify({"channel_id": 2, "message": "x"}, "evt-1")).headers.get("Idempotent-Replayed"), "true")
+
+        resp = await self.notify({"notifications": [{"channel_id": 1, "message": "x"}]}, "evt-1", path="/api/notify/batch")
+        self.assertEqual(resp.status, 202)
+
+    async def test_rejects_invalid_key_and_checks_auth_first(self):
+        self.assertEqual((await self.notify({"channel_id": 1}, "k" * 256)).status, 400)
+        await self.notify({"channel_id": 1, "message": "x"}, "evt-1")
+        resp = await self.client.post("/api/notify", json={}, headers={"Idempotency-Key": "evt-1"})
+        self.assertEqual(resp.status, 401)
+
+
+if __name__ == '__main__':
+    unittest.main()
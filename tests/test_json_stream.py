@@ -0,0 +1,70 @@
+import unittest
+import json
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.json_stream import iter_json_array
+
+
+async def chunked(payload, size):
+    data = payload.encode("utf-8") if isinstance(payload, str) else payload
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+async def collect(payload, size=7, key="data"):
+    return [item async for item in iter_json_array(chunked(payload, size), key=key)]
+
+
+class TestIterJsonArray(unittest.IsolatedAsyncioTestCase):
+    async def test_items_match_json_loads_for_any_chunk_size(self):
+        document = {
+            "meta": {"page": 1, "tags": ["a", "b"], "note": "contains ] and } and \"data\""},
+            "data": [
+                {"id": 1, "position": "EDDM_TWR", "trainee_name": "Jürgen", "confirmed": True},
+                {"id": 2, "position": "EDMM_CTR", "date": None, "score": 12.5e3},
+                17,
+                "plain string",
+            ],
+            "links": {"next": None},
+        }
+        payload = json.dumps(document, ensure_ascii=False)
+        for size in (1, 2, 3, 16, 4096):
+            with self.subTest(chunk_size=size):
+                self.assertEqual(await collect(payload, size), document["data"])
+
+    async def test_missing_key_and_empty_array(self):
+        self.assertEqual(await collect('{"other": [1, 2]}'), [])
+        self.assertEqual(await collect('{}'), [])
+        self.assertEqual(await collect('{"data": []}'), [])
+
+    async def test_rest_collects_members_around_the_array(self):
+        payload = '{"meta": {"page": 1}, "data": [1, 2], "links": {"next": "?page=2"}}'
+        for size in (1, 5, 4096):
+            with self.subTest(chunk_size=size):
+                rest = {}
+                items = [item async for item in iter_json_array(chunked(payload, size), rest=rest)]
+                self.assertEqual(items, [1, 2])
+                self.assertEqual(rest, {"meta": {"page": 1}, "links": {"next": "?page=2"}})
+
+        rest = {}
+        self.assertEqual([item async for item in iter_json_array(chunked('{"data": [], "links": {}}', 3), rest=rest)], [])
+        self.assertEqual(rest, {"links": {}})
+
+    async def test_truncated_payload_raises_after_complete_items(self):
+        items = []
+        with self.assertRaises(ValueError):
+            async for item in iter_json_array(chunked('{"data": [{"id": 1}, {"id": 2', 4)):
+                items.append(item)
+        self.assertEqual(items, [{"id": 1}])
+
+    async def test_not_an_object_raises(self):
+        with self.assertRaises(ValueError):
+            await collect('[{"id": 1}]')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -76,18 +76,18 @@ class TestLoggingImprovements(unittest.TestCase):
         """Verify that logging uses INFO level for important messages."""
         import src.cogs.cpt_checker as cpt_module
         
-        # Read the source code and verify INFO level is used
+        # Read the source code and verify INFO level is used (with lazy %-style arguments)
         with open(cpt_module.__file__, 'r') as f:
             source = f.read()
             
         # Should use INFO level for API fetching
-        self.assertIn('logger.info(f"Fetching CPTs from', source)
+        self.assertIn('logger.info("Fetching CPTs from', source)
         
         # Should use INFO level for processing
-        self.assertIn('logger.info(f"Processing', source)
+        self.assertIn('logger.info("Processing', source)
         
-        # Should use INFO level for API response
-        self.assertIn('logger.info(f"Raw API response:', source)
+        # Raw API responses go through the payload logger (size + hash in the main log)
+        self.assertIn('self.payload_log.record(body)', source)
 
 if __name__ == '__main__':
     # Run tests with proper async handling
@@ -0,0 +1,71 @@
+import unittest
+import io
+import logging
+import os
+import queue
+import sys
+import tempfile
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.logging_setup import DroppingQueueHandler, LOG_RECORDS_DROPPED, setup_logging, shutdown_logging
+
+
+def make_record(message):
+    return logging.LogRecord("Test", logging.INFO, __file__, 0, message, None, None)
+
+
+class TestDroppingQueueHandler(unittest.TestCase):
+    def test_drops_and_counts_when_full(self):
+        log_queue = queue.SimpleQueue()
+        handler = DroppingQueueHandler(log_queue, max_size=2)
+        dropped_before = LOG_RECORDS_DROPPED.labels().get()
+
+        for i in range(5):
+            handler.handle(make_record(f"record {i}"))
+
+        self.assertEqual(handler.dropped, 3)
+        self.assertEqual(LOG_RECORDS_DROPPED.labels().get() - dropped_before, 3)
+        self.assertEqual([log_queue.get_nowait().getMessage() for _ in range(2)], ["record 0", "record 1"])
+
+        # Once there is room again, the loss is reported before the next record
+        handler.handle(make_record("record 5"))
+        messages = [log_queue.get_nowait().getMessage() for _ in range(2)]
+        self.assertEqual(messages, ["Logging queue was full, dropped 3 record(s)", "record 5"])
+
+
+class TestSetupLogging(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root_level = logging.getLogger().level
+
+    def tearDown(self):
+        shutdown_logging()
+        logging.getLogger().setLevel(self.root_level)
+        self.tmpdir.cleanup()
+
+    def test_shutdown_flushes_everything_to_file_and_console(self):
+        console = io.StringIO()
+        setup_logging(self.tmpdir.name, queue_size=5000, console_stream=console)
+        logger = logging.getLogger("CPTChecker")
+        for i in range(1000):
+            logger.info(f"Processing CPT {i}")
+        shutdown_logging()
+
+        with open(os.path.join(self.tmpdir.name, "bot.log")) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(len(lines), 1000)
+        self.assertTrue(lines[-1].endswith("CPTChecker - INFO - Processing CPT 999"))
+        self.assertEqual(len(console.getvalue().splitlines()), 1000)
+        self.assertFalse(any(isinstance(h, DroppingQueueHandler) for h in logging.getLogger().handlers))
+
+    def test_setup_twice_keeps_a_single_queue_handler(self):
+        setup_logging(self.tmpdir.name, console_stream=io.StringIO())
+        setup_logging(self.tmpdir.name, console_stream=io.StringIO())
+        handlers = [h for h in logging.getLogger().handlers if isinstance(h, DroppingQueueHandler)]
+        self.assertEqual(len(handlers), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+import unittest
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+from aiohttp.test_utils import TestClient, TestServer
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.metrics import Registry, Counter, Gauge, Histogram, RateLimitCounter
+from src.outbox import Outbox
+from src.cogs.event_bridge import EventBridge
+from src.cogs.cpt_checker import CPTChecker, CPTS_TOTAL
+from src.config import EVENT_MANAGER_API_TOKEN
+
+AUTH = {"Authorization": f"Bearer {EVENT_MANAGER_API_TOKEN}"}
+
+
+def sample(text, line_start):
+    """Value of the first exposition line starting with ``line_start``."""
+    for line in text.splitlines():
+        if line.startswith(line_start + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return None
+
+
+class TestRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = Registry()
+
+    def test_text_format(self):
+        requests = Counter("requests_total", "Requests", ["route", "status"], registry=self.registry)
+        depth = Gauge("queue_depth", "Depth", registry=self.registry)
+        latency = Histogram("latency_seconds", "Latency", buckets=(0.1, 1.0), registry=self.registry)
+
+        requests.labels("/api/notify", 202).inc()
+        requests.labels("/api/notify", 202).inc()
+        depth.set_function(lambda: 3)
+        for value in (0.05, 0.5, 5):
+            latency.observe(value)
+
+        text = self.registry.render()
+        self.assertIn("# TYPE requests_total counter", text)
+        self.assertEqual(sample(text, 'requests_total{route="/api/notify",status="202"}'), 2)
+        self.assertEqual(sample(text, "queue_depth"), 3)
+        self.assertEqual(sample(text, 'latency_seconds_bucket{le="0.1"}'), 1)
+        self.assertEqual(sample(text, 'latency_seconds_bucket{le="1"}'), 2)
+        self.assertEqual(sample(text, 'latency_seconds_bucket{le="+Inf"}'), 3)
+        self.assertEqual(sample(text, "latency_seconds_count"), 3)
+        self.assertAlmostEqual(sample(text, "latency_seconds_sum"), 5.55)
+
+    def test_label_values_are_escaped_and_checked(self):
+        counter = Counter("c_total", "C", ["name"], registry=self.registry)
+        counter.labels('a"b').inc()
+        self.assertIn('c_total{name="a\\"b"} 1', self.registry.render())
+        with self.assertRaises(ValueError):
+            counter.inc()
+        with self.assertRaises(ValueError):
+            Counter("c_total", "again", registry=self.registry)
+
+    def test_cogs_can_be_reloaded(self):
+        # reload_extension re-executes the cog modules; their metrics must not be registered twice.
+        # Runs in a subprocess, since reloading here would swap the classes under the other tests
+        root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+        code = ("import importlib, sys; sys.path.insert(0, %r)\n"
+                "import src.cogs.cpt_checker, src.cogs.event_bridge\n"
+                "importlib.reload(src.cogs.cpt_checker); importlib.reload(src.cogs.event_bridge)" % root)
+        with tempfile.TemporaryDirectory() as cwd:
+            result = subprocess.run([sys.executable, "-c", code], cwd=cwd, capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+    def test_rate_limit_log_records_are_counted(self):
+        counter = Counter("rl_total", "Rate limits", ["scope"], registry=self.registry)
+        http_logger = logging.getLogger("test.discord.http")
+        handler = RateLimitCounter(counter)
+        http_logger.addHandler(handler)
+        try:
+            http_logger.warning('We are being rate limited. %s %s responded with 429. Retrying in %.2f seconds.',
+                                "POST", "/channels/1/messages", 1.5)
+            http_logger.warning('Global rate limit has been hit. Retrying in %.2f seconds.', 1.5)
+            http_logger.warning("Something else")
+        finally:
+            http_logger.removeHandler(handler)
+        text = self.registry.render()
+        self.assertEqual(sample(text, 'rl_total{scope="route"}'), 1)
+        self.assertEqual(sample(text, 'rl_total{scope="global"}'), 1)
+
+
+class TestMetricsEndpoint(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.channel = MagicMock()
+        self.channel.send = AsyncMock()
+        bot = MagicMock()
+        bot.get_channel.return_value = self.channel
+        self.cog = EventBridge(bot)
+        self.cog.outbox = Outbox(os.path.join(self.tmpdir.name, "bridge.jsonl"))
+        self.client = TestClient(TestServer(self.cog.app))
+        await self.client.start_server()
+
+    async def asyncTearDown(self):
+        await self.cog.queue.close()
+        await self.client.close()
+        self.tmpdir.cleanup()
+
+    async def scrape(self):
+        resp = await self.client.get("/metrics")
+        self.assertEqual(resp.status, 200)
+        self.assertTrue(resp.headers["Content-Type"].startswith("text/plain; version=0.0.4"))
+        return await resp.text()
+
+    async def test_exposes_request_send_and_queue_metrics(self):
+        before = await self.scrape()
+        route = 'event_bridge_requests_total{route="/api/notify/{delivery_id}",status="404"}'
+
+        await self.client.post("/api/notify", json={"channel_id": 42, "message": "hi"}, headers=AUTH)
+        await self.client.get("/api/notify/unknown", headers=AUTH)
+        await self.cog.queue.join()
+
+        text = await self.scrape()
+        self.assertEqual(sample(text, route), (sample(before, route) or 0) + 1)
+        self.assertIsNotNone(sample(text, 'event_bridge_request_duration_seconds_count{route="/api/notify",status="202"}'))
+        self.assertIsNotNone(sample(text, 'discord_send_duration_seconds_count{channel_id="42"}'))
+        self.assertEqual(sample(text, "event_bridge_queue_depth"), 0)
+
+
+class TestCPTCheckerMetrics(unittest.IsolatedAsyncioTestCase):
+    async def test_process_counts_are_exported(self):
+        with patch('discord.ext.tasks.Loop.start'):
+            checker = CPTChecker(MagicMock())
+        checker.send_notification = AsyncMock(return_value=True)
+        checker.save_announced_cpts = MagicMock()
+        before = {outcome: CPTS_TOTAL.labels(outcome).get() for outcome in ("processed", "filtered", "notified")}
+
+        date = (datetime.now(timezone.utc) + timedelta(hours=4)).isoformat()
+        await checker.process_cpts([
+            {"id": 1, "position": "EDDM_TWR", "date": date},
+            {"id": 2, "position": "LOWW_TWR", "date": date},
+        ])
+
+        self.assertEqual(CPTS_TOTAL.labels("processed").get() - before["processed"], 1)
+        self.assertEqual(CPTS_TOTAL.labels("filtered").get() - before["filtered"], 1)
+        self.assertEqual(CPTS_TOTAL.labels("notified").get() - before["notified"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
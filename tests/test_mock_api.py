@@ -0,0 +1,137 @@
+import unittest
+import tempfile
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.clock import ManualClock
+from src.cogs.cpt_checker import CPTChecker
+from src.mock_api import MockTrainingAPI, parse_script
+from src.synthetic_feed import generate_cpts
+
+NOW = datetime(2026, 2, 7, 19, 0, 0, tzinfo=timezone.utc)
+
+
+class TestMockTrainingAPI(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.clock = ManualClock(NOW)
+        with patch('discord.ext.tasks.Loop.start'):
+            self.checker = CPTChecker(MagicMock(), clock=self.clock)
+        self.checker.snapshot_path = os.path.join(self.tmpdir.name, "cpt_snapshot.json")
+        self.checker.payload_log.directory = os.path.join(self.tmpdir.name, "payloads")
+        self.mock_api = None
+
+    async def asyncTearDown(self):
+        await self.checker.cog_unload()
+        if self.mock_api:
+            await self.mock_api.stop()
+        self.tmpdir.cleanup()
+
+    async def start(self, script, **kwargs):
+        self.mock_api = MockTrainingAPI(parse_script(script), clock=self.clock, **kwargs)
+        self.checker.api_url = await self.mock_api.start()
+
+    async def test_scripted_failures_fall_back_to_snapshot(self):
+        await self.start("ok,ok,error,truncated,change", count=50)
+        first = await self.checker.fetch_cpts()
+        self.assertEqual(len(first), 50)
+        self.assertIs(await self.checker.fetch_cpts(), first)  # ETag matches: 304, cached list reused
+        self.assertIs(await self.checker.fetch_cpts(), first)  # 503
+        self.assertIs(await self.checker.fetch_cpts(), first)  # truncated JSON
+        changed = await self.checker.fetch_cpts()
+        self.assertNotEqual(changed, first)
+        self.assertEqual(dict(self.mock_api.responses), {"ok": 1, 304: 1, 503: 1, "truncated": 1, "change": 1})
+
+    async def test_pages_are_followed(self):
+        await self.start("steady", count=250, page_size=100)
+        cpts = await self.checker.fetch_cpts()
+        self.assertEqual([cpt.id for cpt in cpts], list(range(1, 251)))
+        self.assertEqual(self.mock_api.requests, 3)
+
+    async def test_streamed_pages_are_followed(self):
+        await self.start("steady", count=200, page_size=50)
+        self.checker.store = MagicMock()
+        self.checker.send_notification = AsyncMock(return_value=True)
+        ids = [cpt.id async for cpt in self.checker.stream_cpts()]
+        self.assertEqual(ids, list(range(1, 201)))
+        self.assertTrue(self.checker.stream_complete)
+        self.assertEqual(self.mock_api.requests, 4)
+
+        await self.checker.process_feed(self.checker.stream_cpts())
+        scheduled = len(self.checker.scheduler)
+        self.assertGreater(scheduled, 0)
+        await self.checker.process_feed(self.checker.stream_cpts())
+        self.assertEqual(len(self.checker.scheduler), scheduled, "CPTs on later pages are not cancelled")
+
+        # Hitting the page limit is an incomplete feed: nothing counts as cancelled
+        with patch('src.cogs.cpt_checker.TRAINING_API_MAX_PAGES', 2):
+            await self.checker.process_feed(self.checker.stream_cpts())
+        self.assertFalse(self.checker.stream_complete)
+        self.assertEqual(len(self.checker.scheduler), scheduled)
+
+    async def test_dates_are_relative_to_the_clock(self):
+        await self.start("ok,ok,change", count=20, time_shift=timedelta(days=-1))
+        self.assertEqual(self.mock_api.cpts, generate_cpts(20, seed=0, now=NOW - timedelta(days=1)))
+
+        session = self.checker.get_session()
+        async with session.post(self.checker.api_url.replace("/cpts", "/_mock/advance?seconds=86400")) as response:
+            self.assertEqual(response.status, 200)
+        self.assertEqual(self.clock.now(), NOW + timedelta(days=1))
+
+        # Advancing keeps the feed; the next "change" step regenerates it relative to the new time
+        await self.checker.fetch_cpts()
+        await self.checker.fetch_cpts()
+        await self.checker.fetch_cpts()
+        self.assertEqual(self.mock_api.cpts, generate_cpts(20, seed=1, now=NOW))
+        async with session.get(self.checker.api_url.replace("/cpts", "/_mock/stats")) as response:
+            self.assertEqual((await response.json())["requests"], 3)
+
+    async def test_cog_load_starts_mock_when_enabled(self):
+        with patch('src.cogs.cpt_checker.USE_MOCK_API', True), patch('src.cogs.cpt_checker.MOCK_API_PORT', 0), \
+                patch('src.cogs.cpt_checker.MOCK_API_CPTS', 10):
+            await self.checker.cog_load()
+        self.assertTrue(self.checker.api_url.startswith("http://127.0.0.1:"))
+        self.assertEqual(len(await self.checker.fetch_cpts()), 10)
+
+    async def test_mock_mode_keeps_state_out_of_production_paths(self):
+        workdir = os.path.join(self.tmpdir.name, "work")
+        os.makedirs(workdir)
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            with patch('src.cogs.cpt_checker.USE_MOCK_API', True), patch('src.cogs.cpt_checker.MOCK_API_PORT', 0), \
+                    patch('src.cogs.cpt_checker.MOCK_API_CPTS', 50), \
+                    patch('src.cogs.cpt_checker.CPT_EDIT_IN_PLACE', True), patch('discord.ext.tasks.Loop.start'):
+                checker = CPTChecker(MagicMock(), clock=self.clock)
+                await checker.cog_load()
+                try:
+                    await checker.process_feed(await checker.fetch_cpts())
+                    checker.save_announced_cpts()
+                finally:
+                    await checker.cog_unload()
+
+            paths = [checker.snapshot_path, checker.outbox.path, checker.cpt_messages.path,
+                     checker.store.path, checker.payload_log.directory]
+            for path in paths:
+                self.assertTrue(path.startswith(os.path.join("data", "mock") + os.sep), path)
+            written = [os.path.join(root, name) for root, _, names in os.walk(".") for name in names]
+            self.assertTrue(written, "Mock run should have persisted its state")
+            for path in written:
+                self.assertTrue(path.startswith(os.path.join(".", "data", "mock") + os.sep), path)
+        finally:
+            os.chdir(cwd)
+
+    def test_unknown_scenario_is_rejected(self):
+        self.assertEqual(parse_script("flaky")[:2], ["ok", "ok"])
+        self.assertEqual(parse_script("ok, slow"), ["ok", "slow"])
+        with self.assertRaises(ValueError):
+            parse_script("ok,explode")
+
+
+if __name__ == '__main__':
+    unittest.main()
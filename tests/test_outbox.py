@@ -0,0 +1,288 @@
+import unittest
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import discord
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.outbox import Outbox, find_delivered_message
+from src.cogs.cpt_checker import CPTChecker
+from src.cogs.event_bridge import EventBridge
+
+
+class OutboxTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "outbox", "test.jsonl")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def read_lines(self):
+        with open(self.path) as f:
+            return [json.loads(line) for line in f]
+
+
+class TestOutboxJournal(OutboxTestCase):
+    def test_pending_survives_reload_and_is_compacted(self):
+        outbox = Outbox(self.path)
+        self.assertTrue(outbox.record_intent("a", "cpt", {"n": 1}))
+        self.assertFalse(outbox.record_intent("a", "cpt", {"n": 2}), "Duplicate key must not be journaled twice")
+        outbox.record_intent("b", "cpt", {"n": 3})
+        outbox.mark_done("a")
+        self.assertEqual(len(self.read_lines()), 3)
+
+        reloaded = Outbox(self.path)
+        self.assertEqual([record["key"] for record in reloaded.pending()], ["b"])
+        self.assertEqual([record["key"] for record in self.read_lines()], ["b"], "Load should compact done records away")
+
+    def test_torn_last_line_is_ignored(self):
+        outbox = Outbox(self.path)
+        outbox.record_intent("a", "cpt", {})
+        with open(self.path, "a") as f:
+            f.write('{"op": "done", "ke')  # crash mid-append
+
+        self.assertIn("a", Outbox(self.path))
+
+    def test_compacts_after_many_done_records(self):
+        outbox = Outbox(self.path, compact_every=3)
+        for i in range(3):
+            outbox.record_intent(str(i), "cpt", {})
+        for i in range(3):
+            outbox.mark_done(str(i))
+        self.assertEqual(self.read_lines(), [])
+
+
+class TestOutboxWriter(OutboxTestCase):
+    async def test_writes_are_grouped_off_the_event_loop(self):
+        outbox = Outbox(self.path)
+        threads = []
+        fsync = os.fsync
+
+        def recording_fsync(fd):
+            threads.append(threading.current_thread())
+            fsync(fd)
+
+        with patch('src.outbox.os.fsync', side_effect=recording_fsync):
+            for i in range(5):
+                outbox.record_intent(str(i), "cpt", {"i": i})
+            outbox.mark_done("0")
+            self.assertFalse(os.path.exists(self.path), "Nothing is written on the event loop")
+            await outbox.flush()
+
+        self.assertEqual(len(threads), 1, "Records appended in one tick share one fsync")
+        self.assertIsNot(threads[0], threading.main_thread())
+        self.assertEqual([record["key"] for record in self.read_lines()], ["0", "1", "2", "3", "4", "0"])
+        self.assertEqual(sorted(record["key"] for record in Outbox(self.path).pending()), ["1", "2", "3", "4"])
+
+    async def test_failed_write_is_retried_on_flush(self):
+        outbox = Outbox(self.path)
+        with patch('src.outbox.os.fsync', side_effect=OSError("disk full")):
+            outbox.record_intent("a", "cpt", {})
+            with self.assertRaises(OSError):
+                await outbox.flush()
+        await outbox.flush()
+        self.assertIn("a", Outbox(self.path))
+
+
+class TestOutboxReplay(OutboxTestCase):
+    async def test_replay_limits_concurrency_and_keeps_failures(self):
+        outbox = Outbox(self.path)
+        for i in range(6):
+            outbox.record_intent(str(i), "cpt", {"i": i})
+
+        in_flight = 0
+        peak = 0
+
+        async def handler(record):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            if record["payload"]["i"] == 4:
+                raise RuntimeError("Discord unavailable")
+            return record["payload"]["i"] != 5
+
+        delivered = await outbox.replay(handler, concurrency=2)
+
+        self.assertEqual(delivered, 4)
+        self.assertEqual(peak, 2)
+        self.assertEqual(sorted(record["key"] for record in Outbox(self.path).pending()), ["4", "5"])
+
+    async def test_stale_intents_are_dropped(self):
+        outbox = Outbox(self.path, max_age=60)
+        outbox.record_intent("old", "cpt", {})
+        outbox._pending["old"]["ts"] = time.time() - 120
+        handler = AsyncMock(return_value=True)
+
+        self.assertEqual(await outbox.replay(handler), 0)
+        handler.assert_not_awaited()
+        self.assertEqual(len(Outbox(self.path)), 0)
+
+
+class TestFindDeliveredMessage(unittest.IsolatedAsyncioTestCase):
+    def make_channel(self, messages):
+        channel = MagicMock()
+
+        async def history(limit, after):
+            for message in messages:
+                yield message
+
+        channel.history = history
+        return channel
+
+    def make_message(self, author_id, content, titles):
+        return MagicMock(author=MagicMock(id=author_id), content=content,
+                         embeds=[MagicMock(title=title) for title in titles])
+
+    async def test_matches_own_message_by_content_and_titles(self):
+        target = self.make_message(1, "<@&5>", ["CPT: Tower"])
+        channel = self.make_channel([
+            self.make_message(2, "<@&5>", ["CPT: Tower"]),  # someone else
+            self.make_message(1, "<@&5>", ["CPT: Ground"]),
+            target,
+        ])
+        self.assertIs(await find_delivered_message(channel, time.time(), "<@&5> ", ["CPT: Tower"], 1), target)
+
+    async def test_unreadable_history_counts_as_not_delivered(self):
+        channel = MagicMock()
+        channel.history = MagicMock(side_effect=discord.Forbidden(MagicMock(status=403), "Missing Access"))
+        self.assertIsNone(await find_delivered_message(channel, time.time(), "", [], 1))
+
+
+class TestCPTCheckerOutbox(OutboxTestCase):
+    def setUp(self):
+        super().setUp()
+        self.bot = MagicMock()
+        self.bot.user.id = 1
+        self.channel = MagicMock()
+        self.channel.send = AsyncMock()
+        self.bot.get_channel.return_value = self.channel
+        with patch('discord.ext.tasks.Loop.start'):
+            self.checker = CPTChecker(self.bot)
+        self.checker.outbox = Outbox(self.path)
+        self.checker.save_announced_cpts = MagicMock()
+        self.cpt = {"id": 7, "position": "EDDM_TWR", "course_name": "Tower",
+                    "date": (datetime.now(timezone.utc) + timedelta(hours=4)).isoformat()}
+
+    async def test_failed_send_is_replayed_once(self):
+        self.channel.send.side_effect = discord.HTTPException(MagicMock(status=500), "Server Error")
+        await self.checker.process_cpts([self.cpt])
+        self.assertNotIn("7_today", self.checker.cpts_announced)
+        self.assertIn("cpt:7_today", Outbox(self.path))
+
+        # Restart: the journal is read from disk and the notification goes out on replay
+        self.channel.send.side_effect = None
+        self.channel.send.reset_mock()
+        self.checker.outbox = Outbox(self.path)
+        self.channel.history = MagicMock(return_value=self.async_iter([]))
+        await self.checker.replay_outbox()
+
+        self.channel.send.assert_awaited_once()
+        self.assertEqual(self.checker.cpts_announced["7_today"], self.cpt["date"])
+        self.assertEqual(len(Outbox(self.path)), 0)
+        self.checker.save_announced_cpts.assert_called_once()
+
+    async def test_send_that_landed_before_crash_is_not_repeated(self):
+        self.checker.outbox.record_intent("cpt:7_today", "cpt", {"key": "7_today", "title": "CPT Heute", "cpt": self.cpt})
+        content, embed = self.checker.build_notification(self.checker.ingest(self.cpt), "CPT Heute")
+        posted = MagicMock(author=MagicMock(id=1), content=content, embeds=[MagicMock(title=embed.title)])
+        self.channel.history = MagicMock(return_value=self.async_iter([posted]))
+
+        await self.checker.replay_outbox()
+
+        self.channel.send.assert_not_awaited()
+        self.assertIn("7_today", self.checker.cpts_announced)
+        self.assertEqual(len(self.checker.outbox), 0)
+
+    @staticmethod
+    async def async_iter(items):
+        for item in items:
+            yield item
+
+
+class TestEventBridgeOutbox(OutboxTestCase):
+    async def test_accepted_notification_is_journaled_until_sent(self):
+        bot = MagicMock()
+        bot.wait_until_ready = AsyncMock()
+        channel = MagicMock()
+        channel.send = AsyncMock()
+        bot.get_channel.return_value = channel
+        cog = EventBridge(bot)
+        cog.outbox = Outbox(self.path)
+
+        release = asyncio.Event()
+
+        async def slow_send(**kwargs):
+            await release.wait()
+
+        channel.send.side_effect = slow_send
+        delivery = cog.enqueue(123, content="Hello", embeds=[discord.Embed(title="Event")])
+        await cog.outbox.flush()
+        self.assertIn(f"bridge:{delivery.id}", Outbox(self.path))
+
+        release.set()
+        await cog.queue.join()
+        await cog.outbox.flush()
+        self.assertEqual(len(Outbox(self.path)), 0)
+        await cog.queue.close()
+
+    async def test_replay_resends_with_original_delivery_id(self):
+        bot = MagicMock()
+        bot.wait_until_ready = AsyncMock()
+        bot.user.id = 1
+        channel = MagicMock()
+        channel.send = AsyncMock()
+        channel.history = MagicMock(return_value=TestCPTCheckerOutbox.async_iter([]))
+        bot.get_channel.return_value = channel
+        journal = Outbox(self.path)
+        journal.record_intent("bridge:abc", "bridge", {
+            "delivery_id": "abc", "channel_id": 123, "content": "Hello",
+            "embeds": [discord.Embed(title="Event").to_dict()],
+        })
+        await journal.flush()
+
+        cog = EventBridge(bot)
+        cog.outbox = Outbox(self.path)
+        await cog.replay_outbox()
+
+        channel.send.assert_awaited_once()
+        self.assertEqual(channel.send.call_args.kwargs["embed"].title, "Event")
+        self.assertEqual(len(Outbox(self.path)), 0)
+
+    async def test_terminal_send_error_is_not_replayed(self):
+        bot = MagicMock()
+        channel = MagicMock()
+        channel.send = AsyncMock(side_effect=discord.Forbidden(MagicMock(status=403), "Missing Permissions"))
+        bot.get_channel.side_effect = lambda channel_id: channel if channel_id == 123 else None
+        cog = EventBridge(bot)
+        cog.outbox = Outbox(self.path)
+
+        forbidden = cog.enqueue(123, content="Hello", embeds=[discord.Embed(title="Event")])
+        deleted = cog.enqueue(456, content="Hello", embeds=[discord.Embed(title="Event")])
+        await cog.queue.join()
+        await cog.outbox.flush()
+        self.assertEqual((forbidden.status, deleted.status), ("failed", "failed"))
+        self.assertEqual(len(Outbox(self.path)), 0)
+
+        # Transient errors stay pending for the next replay
+        channel.send.side_effect = RuntimeError("connection reset")
+        transient = cog.enqueue(123, content="Hello", embeds=[discord.Embed(title="Event")])
+        await cog.queue.join()
+        await cog.outbox.flush()
+        self.assertIn(f"bridge:{transient.id}", Outbox(self.path))
+        await cog.queue.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+import gzip
+import os
+import sys
+import tempfile
+import threading
+from unittest.mock import patch
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.payload_log import PayloadLogger
+
+
+class TestPayloadLogger(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.tmpdir.name, "payloads")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def make(self, **kwargs):
+        return PayloadLogger("cpts", directory=self.directory, **kwargs)
+
+    async def test_dumps_only_when_hash_changes(self):
+        payload_log = self.make()
+        first = await payload_log.record(b'{"data": [1]}')
+        self.assertIsNotNone(first)
+        self.assertIsNone(await payload_log.record(b'{"data": [1]}'))
+        self.assertIsNotNone(await payload_log.record(b'{"data": [2]}'))
+        with gzip.open(first, "rb") as f:
+            self.assertEqual(f.read(), b'{"data": [1]}')
+
+        # A restart remembers the last dumped hash from the file name, read on the first payload
+        with patch('src.payload_log.os.listdir', wraps=os.listdir) as listdir:
+            restarted = self.make()
+            listdir.assert_not_called()
+            self.assertIsNone(await restarted.record(b'{"data": [2]}'))
+            listdir.assert_called_once()
+
+    async def test_dump_is_written_off_the_event_loop(self):
+        threads = []
+        real_open = gzip.open
+
+        def recording_open(*args, **kwargs):
+            threads.append(threading.current_thread())
+            return real_open(*args, **kwargs)
+
+        with patch('src.payload_log.gzip.open', side_effect=recording_open):
+            self.assertIsNotNone(await self.make().record(b'{"data": [1]}'))
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], threading.main_thread())
+
+    async def test_every_nth_payload_without_change_detection(self):
+        payload_log = self.make(every=3, on_change=False)
+        dumped = [await payload_log.record(b"same") is not None for _ in range(6)]
+        self.assertEqual(dumped, [False, False, True, False, False, True])
+
+    async def test_dump_is_capped_and_uncompressed_on_request(self):
+        payload_log = self.make(max_bytes=10, compress=False)
+        capture = payload_log.capture()
+        for chunk in (b"0123456", b"789abcdef"):
+            capture.update(chunk)
+        path = await payload_log.finish(capture)
+
+        self.assertEqual(capture.size, 16)
+        self.assertTrue(path.endswith("-truncated.json"))
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), b"0123456789")
+
+    async def test_keeps_newest_dumps_only(self):
+        payload_log = self.make(keep=2)
+        paths = [await payload_log.record(str(i).encode()) for i in range(4)]
+        self.assertEqual(sorted(os.listdir(self.directory)), [os.path.basename(p) for p in paths[2:]])
+
+
+if __name__ == '__main__':
+    unittest.main()
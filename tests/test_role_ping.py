@@ -35,8 +35,9 @@ class TestEventBridgeRolePing(unittest.TestCase):
         # Execute handler
         response = await self.cog.notify_handler(request)
         
-        # Verify response
-        self.assertEqual(response.status, 200)
+        # Verify response: accepted for background delivery
+        self.assertEqual(response.status, 202)
+        await self.cog.queue.join()
         
         # Verify channel.send called with correct content
         self.channel_mock.send.assert_called_once()
@@ -0,0 +1,102 @@
+import unittest
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, AsyncMock, patch
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.clock import ManualClock
+from src.scheduler import NotificationScheduler
+from src.cogs.cpt_checker import CPTChecker
+
+START = datetime(2026, 2, 10, 9, 0, 0, tzinfo=timezone.utc)
+
+
+async def settle():
+    # Give the scheduler task a few loop iterations to react to a clock change
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+
+class TestNotificationScheduler(unittest.IsolatedAsyncioTestCase):
+    async def test_pop_due_in_order_and_skips_cancelled(self):
+        scheduler = NotificationScheduler(ManualClock(START))
+        scheduler.schedule("b", START + timedelta(hours=2), "B")
+        scheduler.schedule("a", START + timedelta(hours=1), "A")
+        scheduler.schedule("c", START + timedelta(hours=3), "C")
+        scheduler.cancel("b")
+        scheduler.schedule("c", START + timedelta(minutes=30), "C2")  # rescheduled earlier
+
+        self.assertEqual(len(scheduler), 2)
+        self.assertEqual(scheduler.next_fire_time(), START + timedelta(minutes=30))
+        self.assertEqual(scheduler.pop_due(START + timedelta(hours=5)), [("c", "C2"), ("a", "A")])
+        self.assertIsNone(scheduler.next_fire_time())
+
+    async def test_run_sleeps_until_due(self):
+        clock = ManualClock(START)
+        scheduler = NotificationScheduler(clock)
+        fired = []
+
+        async def callback(due):
+            fired.extend(key for key, _ in due)
+
+        task = asyncio.create_task(scheduler.run(callback))
+        try:
+            scheduler.schedule("later", START + timedelta(hours=2))
+            await settle()
+            # Scheduling an earlier entry must wake the runner out of its long sleep
+            scheduler.schedule("sooner", START + timedelta(hours=1))
+            await settle()
+            self.assertEqual(fired, [])
+
+            clock.advance(hours=1)
+            await settle()
+            self.assertEqual(fired, ["sooner"])
+
+            clock.advance(hours=1)
+            await settle()
+            self.assertEqual(fired, ["sooner", "later"])
+        finally:
+            task.cancel()
+
+
+class TestCPTCheckerScheduling(unittest.IsolatedAsyncioTestCase):
+    async def test_notifications_fire_at_exact_time(self):
+        clock = ManualClock(START)
+        with patch('discord.ext.tasks.Loop.start'):
+            checker = CPTChecker(MagicMock(), clock=clock)
+        checker.send_notification = AsyncMock(return_value=True)
+        checker.save_announced_cpts = MagicMock()
+
+        # 6 days away: nothing due now, "3day" opens at 00:00 UTC four days before
+        cpt = {"id": 42, "position": "EDDM_TWR", "date": "2026-02-16T19:00:00+00:00"}
+        await checker.process_cpts([cpt])
+        checker.send_notification.assert_not_called()
+        self.assertEqual(checker.scheduler.next_fire_time(), datetime(2026, 2, 12, tzinfo=timezone.utc))
+
+        task = asyncio.create_task(checker.scheduler.run(checker.fire_scheduled))
+        try:
+            clock.set(datetime(2026, 2, 11, 23, 59, tzinfo=timezone.utc))
+            await settle()
+            checker.send_notification.assert_not_called()
+
+            clock.set(datetime(2026, 2, 12, tzinfo=timezone.utc))
+            await settle()
+            self.assertIn("42_3day", checker.cpts_announced)
+            self.assertEqual(checker.send_notification.call_args[0][1], "CPT in 4 Tagen!")
+
+            clock.set(datetime(2026, 2, 16, 7, 0, tzinfo=timezone.utc))
+            await settle()
+            self.assertIn("42_today", checker.cpts_announced)
+            self.assertEqual(checker.send_notification.call_args[0][1], "CPT Heute!")
+            self.assertEqual(checker.send_notification.await_count, 2)
+            self.assertEqual(len(checker.scheduler), 0)
+        finally:
+            task.cancel()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+import asyncio
+import gc
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.clock import ManualClock
+from src.cogs.cpt_checker import CPTChecker
+from src.outbox import Outbox
+from src.rate_limit import RateLimiter
+
+NOW = datetime(2026, 2, 7, 19, 0, 0, tzinfo=timezone.utc)
+SEND_LATENCY = 0.2
+
+
+class StubChannel:
+    """Channel whose send takes SEND_LATENCY seconds; records peak concurrency."""
+
+    def __init__(self, fail_titles=()):
+        self.sent = []
+        self.in_flight = 0
+        self.peak = 0
+        self.fail_titles = fail_titles
+
+    async def send(self, content=None, embed=None):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(SEND_LATENCY)
+            if embed.title.startswith(self.fail_titles):
+                raise RuntimeError("send failed")
+            self.sent.append(embed.title)
+        finally:
+            self.in_flight -= 1
+
+
+def due_cpts(count):
+    # Three days out: every CPT is due for its "3day" notification
+    date = (NOW + timedelta(days=3)).isoformat()
+    return [{"id": i, "position": "EDDM_TWR", "date": date, "course_name": f"Course {i}"} for i in range(count)]
+
+
+class TestConcurrentSends(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.channel = StubChannel(fail_titles=("CPT in 3 Tagen!: Course 3",))
+        bot = MagicMock()
+        bot.get_channel.return_value = self.channel
+        with patch('discord.ext.tasks.Loop.start'):
+            self.checker = CPTChecker(bot, clock=ManualClock(NOW))
+        self.checker.store = MagicMock()
+        self.checker.outbox = Outbox(os.path.join(self.tmpdir.name, "cpt.jsonl"))
+        self.checker.channel_limiter = RateLimiter(rate=0)
+
+    async def asyncTearDown(self):
+        self.tmpdir.cleanup()
+
+    async def test_run_time_follows_slowest_send(self):
+        with patch('src.cogs.cpt_checker.CPT_SEND_CONCURRENCY', 10):
+            start = time.perf_counter()
+            await self.checker.process_cpts(due_cpts(10))
+            elapsed = time.perf_counter() - start
+
+        self.assertLess(elapsed, 3 * SEND_LATENCY, "10 sends should overlap, not take 10 x the latency")
+        self.assertEqual(self.channel.peak, 10)
+        self.assertEqual(len(self.channel.sent), 9)
+        # Only successful sends are recorded; the failed one stays pending in the outbox for replay
+        self.assertEqual(set(self.checker.cpts_announced), {f"{i}_3day" for i in range(10) if i != 3})
+        self.assertEqual(self.checker.store.upsert.call_count, 9)
+        self.assertEqual([record["key"] for record in self.checker.outbox.pending()], ["cpt:3_3day"])
+
+    async def test_concurrency_is_bounded_and_duplicates_sent_once(self):
+        cpts = due_cpts(6)
+        with patch('src.cogs.cpt_checker.CPT_SEND_CONCURRENCY', 2):
+            await self.checker.process_cpts(cpts + cpts[:2])
+        self.assertEqual(self.channel.peak, 2)
+        self.assertEqual(len(self.channel.sent), 5)
+
+    async def test_overlapping_runs_send_each_key_once(self):
+        # Refresh loop, scheduler and /testcpt overlapping while sends are in flight
+        cpts = due_cpts(4)
+        await asyncio.gather(self.checker.process_cpts(cpts), self.checker.process_cpts(cpts),
+                             self.checker.process_feed(cpts))
+        self.assertEqual(sorted(self.channel.sent), sorted(set(self.channel.sent)))
+        self.assertEqual(len(self.channel.sent), 3)
+
+
+class TestRateLimiter(unittest.IsolatedAsyncioTestCase):
+    async def test_spreads_acquisitions_per_key(self):
+        limiter = RateLimiter(rate=2, period=0.2)
+        gc.collect()  # A full collection inside the timed window would read as limiter delay
+        start = time.perf_counter()
+        times = []
+
+        async def acquire(key):
+            await limiter.acquire(key)
+            times.append((key, time.perf_counter() - start))
+
+        await asyncio.gather(*(acquire("a") for _ in range(5)), acquire("b"))
+        a_times = sorted(t for key, t in times if key == "a")
+        self.assertLess(a_times[1], 0.05)
+        self.assertGreaterEqual(a_times[2], 0.19)
+        self.assertGreaterEqual(a_times[4], 0.39)
+        self.assertLess([t for key, t in times if key == "b"][0], 0.05, "Other channels are not delayed")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+import textwrap
+from unittest.mock import MagicMock, patch
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import startup_profile
+from src.startup_profile import StartupProfiler
+from src.cogs.cpt_checker import CPTChecker
+from src.cogs.event_bridge import EventBridge
+
+
+class TestStartupProfiler(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "logs", "startup.json")
+        sys.path.insert(0, self.tmpdir.name)
+
+    def tearDown(self):
+        sys.path.remove(self.tmpdir.name)
+        for name in ("profiled_outer", "profiled_inner"):
+            sys.modules.pop(name, None)
+        startup_profile._profiler = None
+        self.tmpdir.cleanup()
+
+    def write_module(self, name, source):
+        with open(os.path.join(self.tmpdir.name, f"{name}.py"), "w") as f:
+            f.write(textwrap.dedent(source))
+
+    def test_records_nested_import_times(self):
+        self.write_module("profiled_inner", "import time\ntime.sleep(0.02)\n")
+        self.write_module("profiled_outer", "import profiled_inner\n")
+        profiler = StartupProfiler(self.path)
+        profiler.install()
+        try:
+            import profiled_outer
+        finally:
+            profiler.uninstall()
+
+        # The module keeps its real loader; the proxy is only used while importing
+        self.assertNotIn("_TimedLoader", type(profiled_outer.__loader__).__name__)
+        outer_self, outer_cumulative = profiler.imports.modules["profiled_outer"]
+        inner_self, inner_cumulative = profiler.imports.modules["profiled_inner"]
+        self.assertGreaterEqual(inner_self, 0.02)
+        self.assertGreaterEqual(outer_cumulative, inner_cumulative)
+        self.assertLess(outer_self, 0.02)
+
+    def test_report_written_once(self):
+        self.assertIsNone(startup_profile.finish())  # Profiling not enabled
+        with startup_profile.phase("disabled"):
+            pass
+
+        startup_profile.start_profiling(self.path)
+        with startup_profile.phase("load_extension:test"):
+            pass
+        startup_profile.mark("setup_hook")
+        self.assertEqual(startup_profile.finish(), self.path)
+        self.assertNotIn(startup_profile._profiler.imports, sys.meta_path)
+        self.assertIsNone(startup_profile.finish())  # A reconnect fires on_ready again
+
+        with open(self.path) as f:
+            report = json.load(f)
+        self.assertEqual([phase["name"] for phase in report["phases"]], ["load_extension:test"])
+        self.assertEqual(set(report["marks_ms"]), {"setup_hook", "ready"})
+        self.assertIsInstance(report["imports"], list)
+
+
+class TestLazyStartup(unittest.TestCase):
+    def test_cogs_do_no_io_until_used(self):
+        with patch('discord.ext.tasks.Loop.start'):
+            checker = CPTChecker(MagicMock())
+        bridge = EventBridge(MagicMock())
+        self.assertIsNone(checker._store)
+        self.assertFalse(checker._snapshot_loaded)
+        self.assertIsNone(bridge._app)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            checker.snapshot_path = os.path.join(tmpdir, "missing.json")
+            self.assertIsNone(checker.cached_cpts)
+            self.assertTrue(checker._snapshot_loaded)
+        paths = {route.resource.canonical for route in bridge.app.router.routes()}
+        self.assertIn("/api/notify", paths)
+        self.assertIs(bridge.app, bridge._app)
+
+
+if __name__ == '__main__':
+    unittest.main()
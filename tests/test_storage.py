@@ -0,0 +1,146 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.storage import RECORDED_AT_KEY, AnnouncedStore, JsonAnnouncedStore, SqliteAnnouncedStore, create_announced_store
+from src.cogs.cpt_checker import CPTChecker
+
+
+class StoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.json_path = os.path.join(self.tmpdir.name, "cpts.json")
+        self.db_path = os.path.join(self.tmpdir.name, "cpts.sqlite3")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write_legacy(self, data):
+        with open(self.json_path, "w") as f:
+            json.dump(data, f)
+
+
+class TestJsonAnnouncedStore(StoreTestCase):
+    def test_save_is_atomic_and_round_trips(self):
+        store = JsonAnnouncedStore(self.json_path)
+        entries = {"1_3day": "2026-02-10T19:00:00+00:00", "2_today": None}
+        store.save(entries)
+        self.assertEqual(store.load(), entries)
+        self.assertFalse(os.path.exists(self.json_path + ".tmp"), "Temp file should be renamed into place")
+
+    def test_failed_write_keeps_previous_file(self):
+        store = JsonAnnouncedStore(self.json_path)
+        store.save({"1_3day": None})
+        with self.assertRaises(TypeError):
+            store.save({"2_3day": object()})  # not JSON serializable
+        self.assertEqual(store.load(), {"1_3day": None})
+
+    def test_loads_legacy_list_format(self):
+        self.write_legacy(["1_3day", "2_today"])
+        self.assertEqual(JsonAnnouncedStore(self.json_path).load(), {"1_3day": None, "2_today": None})
+
+    def test_legacy_recorded_at_survives_reload(self):
+        self.write_legacy(["1_3day"])
+        store = JsonAnnouncedStore(self.json_path)
+        store.load()
+        first_seen = store.load_recorded_at()["1_3day"]
+        with open(self.json_path) as f:
+            self.assertEqual(json.load(f)[RECORDED_AT_KEY], {"1_3day": first_seen.isoformat()})
+
+        # Neither a reload nor a save with the in-memory state restarts the TTL
+        later = datetime.now(timezone.utc) + timedelta(days=10)
+        with patch('src.storage.datetime', wraps=datetime) as fake_datetime:
+            fake_datetime.now.return_value = later
+            reloaded = JsonAnnouncedStore(self.json_path)
+            entries = reloaded.load()
+            reloaded.save(dict(entries, **{"2_3day": "2026-02-10T19:00:00+00:00"}))
+            self.assertEqual(JsonAnnouncedStore(self.json_path).load_recorded_at(), {"1_3day": first_seen})
+        self.assertEqual(entries, {"1_3day": None})
+
+        # Carried over when the JSON file is migrated to SQLite
+        sqlite = SqliteAnnouncedStore(self.db_path, legacy_json_path=self.json_path)
+        self.assertAlmostEqual(sqlite.load_recorded_at()["1_3day"].timestamp(), first_seen.timestamp(), places=3)
+        sqlite.close()
+
+
+class TestSqliteAnnouncedStore(StoreTestCase):
+    def test_upsert_delete_and_range_delete(self):
+        store = SqliteAnnouncedStore(self.db_path)
+        now = datetime(2026, 2, 10, tzinfo=timezone.utc)
+        store.upsert("old_3day", (now - timedelta(days=3)).isoformat())
+        store.upsert("new_3day", (now + timedelta(days=3)).isoformat())
+        store.upsert("legacy", None)
+        store.upsert("broken", "not-a-date")
+        store.upsert("new_3day", (now + timedelta(days=4)).isoformat())  # update in place
+        store.delete(["missing"])
+
+        removed = store.delete_expired(now - timedelta(days=1))
+        self.assertEqual(removed, 2)
+        self.assertEqual(store.load(), {"new_3day": (now + timedelta(days=4)).isoformat(), "legacy": None})
+
+        mode = store.conn.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode.lower(), "wal")
+        store.close()
+
+        # Data is durable without any save() call
+        reopened = SqliteAnnouncedStore(self.db_path)
+        self.assertIn("new_3day", reopened.load())
+        reopened.close()
+
+    def test_migrates_dict_json(self):
+        self.write_legacy({"1_3day": "2026-02-10T19:00:00+00:00", "2_today": None})
+        store = SqliteAnnouncedStore(self.db_path, legacy_json_path=self.json_path)
+        self.assertEqual(store.load(), {"1_3day": "2026-02-10T19:00:00+00:00", "2_today": None})
+        self.assertFalse(os.path.exists(self.json_path))
+        self.assertTrue(os.path.exists(self.json_path + ".migrated"))
+        store.close()
+
+    def test_migrates_list_json_only_once(self):
+        self.write_legacy(["1_3day"])
+        store = SqliteAnnouncedStore(self.db_path, legacy_json_path=self.json_path)
+        self.assertEqual(store.load(), {"1_3day": None})
+        store.delete(["1_3day"])
+        store.close()
+
+        # A JSON file showing up later must not be imported again into an existing database
+        self.write_legacy(["1_3day"])
+        store = SqliteAnnouncedStore(self.db_path, legacy_json_path=self.json_path)
+        self.assertEqual(store.load(), {})
+        store.close()
+
+    def test_factory(self):
+        self.assertIsInstance(create_announced_store("json", self.json_path), JsonAnnouncedStore)
+        self.assertIsInstance(create_announced_store("SQLite", self.db_path), SqliteAnnouncedStore)
+        with self.assertRaises(ValueError):
+            create_announced_store("redis")
+        with self.assertRaises(TypeError):
+            AnnouncedStore()  # Abstract: backends must implement the full interface
+
+
+class TestCPTCheckerWithSqliteStore(StoreTestCase, unittest.IsolatedAsyncioTestCase):
+    async def test_process_and_cleanup_write_through(self):
+        with patch('discord.ext.tasks.Loop.start'):
+            checker = CPTChecker(MagicMock())
+        checker.store = SqliteAnnouncedStore(self.db_path)
+        checker.send_notification = AsyncMock(return_value=True)
+
+        now = datetime.now(timezone.utc)
+        await checker.process_cpts([{"id": 7, "position": "EDDM_TWR", "date": (now + timedelta(hours=4)).isoformat()}])
+        self.assertIn("7_today", checker.store.load())
+
+        checker.cpts_announced["7_today"] = (now - timedelta(days=2)).isoformat()
+        checker.store.upsert("7_today", checker.cpts_announced["7_today"])
+        checker.cleanup_old_cpts()
+        self.assertEqual(checker.store.load(), {})
+        checker.store.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
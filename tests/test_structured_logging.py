@@ -0,0 +1,164 @@
+import unittest
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+from aiohttp.test_utils import TestClient, TestServer
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.log_context import CorrelationIdFilter, correlation_id, new_correlation_id
+from src.logging_setup import JsonFormatter, setup_logging, shutdown_logging
+from src.outbox import Outbox
+from src.cogs.cpt_checker import CPTChecker
+from src.cogs.event_bridge import EventBridge
+from src.config import EVENT_MANAGER_API_TOKEN
+
+AUTH = {"Authorization": f"Bearer {EVENT_MANAGER_API_TOKEN}"}
+
+
+class RecordCollector(logging.Handler):
+    """Keeps records (with correlation IDs stamped) for assertions."""
+
+    def __init__(self):
+        super().__init__(level=logging.DEBUG)
+        self.addFilter(CorrelationIdFilter())
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class CollectLogs:
+    def __init__(self, *names):
+        self.loggers = [logging.getLogger(name) for name in names]
+        self.handler = RecordCollector()
+
+    def __enter__(self):
+        self.levels = [logger.level for logger in self.loggers]
+        for logger in self.loggers:
+            logger.addHandler(self.handler)
+            logger.setLevel(logging.INFO)
+        return self.handler.records
+
+    def __exit__(self, *exc):
+        for logger, level in zip(self.loggers, self.levels):
+            logger.removeHandler(self.handler)
+            logger.setLevel(level)
+
+
+class TestJsonFormatter(unittest.TestCase):
+    def test_extra_fields_and_correlation_id(self):
+        record = logging.LogRecord("CPTChecker", logging.INFO, __file__, 1, "CPT %s (%s)", ("7", "EDDM_TWR"), None)
+        record.cpt_id = "7"
+        record.hours_left = 3.5
+        record.correlation_id = "run-abc"
+
+        entry = json.loads(JsonFormatter().format(record))
+
+        self.assertEqual(entry["message"], "CPT 7 (EDDM_TWR)")
+        self.assertEqual(entry["level"], "INFO")
+        self.assertEqual(entry["logger"], "CPTChecker")
+        self.assertEqual((entry["cpt_id"], entry["hours_left"], entry["correlation_id"]), ("7", 3.5, "run-abc"))
+        self.assertNotIn("args", entry)
+
+    def test_setup_writes_json_lines_with_separate_traceback(self):
+        with tempfile.TemporaryDirectory() as log_dir:
+            root_level = logging.getLogger().level
+            token = correlation_id.set("run-json")
+            try:
+                setup_logging(log_dir, console_stream=io.StringIO(), json_format=True)
+                logger = logging.getLogger("CPTChecker")
+                logger.info("Fetched %d CPTs from API", 3, extra={"status": 200})
+                try:
+                    raise ValueError("boom")
+                except ValueError as e:
+                    logger.error("Error fetching CPTs: %s", e, exc_info=True)
+                shutdown_logging()
+            finally:
+                correlation_id.reset(token)
+                logging.getLogger().setLevel(root_level)
+
+            with open(os.path.join(log_dir, "bot.log")) as f:
+                entries = [json.loads(line) for line in f]
+
+        self.assertEqual(entries[0]["message"], "Fetched 3 CPTs from API")
+        self.assertEqual(entries[0]["status"], 200)
+        self.assertEqual(entries[0]["correlation_id"], "run-json")
+        self.assertEqual(entries[1]["message"], "Error fetching CPTs: boom")
+        self.assertIn("ValueError: boom", entries[1]["exc_info"])
+        self.assertEqual(entries[0]["correlation_id"], entries[1]["correlation_id"])
+
+    def test_suppressed_debug_arguments_are_not_formatted(self):
+        calls = []
+
+        class Expensive:
+            def __str__(self):
+                calls.append(1)
+                return "expensive"
+
+        with CollectLogs("CPTChecker"):
+            logging.getLogger("CPTChecker").debug("Raw API response: %s", Expensive())
+        self.assertEqual(calls, [])
+
+
+class TestCPTCheckerLogFields(unittest.IsolatedAsyncioTestCase):
+    async def test_process_cpt_logs_fields_under_one_run_id(self):
+        with patch('discord.ext.tasks.Loop.start'):
+            checker = CPTChecker(MagicMock())
+        checker.send_notification = AsyncMock(return_value=True)
+        date = (datetime.now(timezone.utc) + timedelta(hours=4)).isoformat()
+
+        with CollectLogs("CPTChecker") as records:
+            run_id = new_correlation_id("run-")
+            await checker.process_cpts([{"id": 7, "position": "EDDM_TWR", "date": date}])
+
+        cpt_records = [r for r in records if getattr(r, "cpt_id", None) == "7"]
+        self.assertTrue(cpt_records)
+        self.assertEqual(cpt_records[0].position, "EDDM_TWR")
+        self.assertAlmostEqual(cpt_records[0].hours_left, 4, delta=0.1)
+        self.assertEqual({r.correlation_id for r in records}, {run_id})
+
+
+class TestEventBridgeCorrelation(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.channel = MagicMock()
+        self.channel.send = AsyncMock()
+        bot = MagicMock()
+        bot.get_channel.return_value = self.channel
+        self.cog = EventBridge(bot)
+        self.cog.outbox = Outbox(os.path.join(self.tmpdir.name, "bridge.jsonl"))
+        self.client = TestClient(TestServer(self.cog.app))
+        await self.client.start_server()
+
+    async def asyncTearDown(self):
+        await self.cog.queue.close()
+        await self.client.close()
+        self.tmpdir.cleanup()
+
+    async def test_request_id_is_echoed_and_follows_the_delivery(self):
+        with CollectLogs("EventBridge") as records:
+            resp = await self.client.post("/api/notify", json={"channel_id": 5, "message": "hi"},
+                                          headers={**AUTH, "X-Request-ID": "evt-42"})
+            await self.cog.queue.join()
+
+        self.assertEqual(resp.headers["X-Request-ID"], "evt-42")
+        sent = [r for r in records if r.getMessage().startswith("Notification") and "sent" in r.getMessage()]
+        self.assertEqual(len(sent), 1)
+        self.assertEqual((sent[0].correlation_id, sent[0].channel_id), ("evt-42", 5))
+        self.assertTrue(all(r.correlation_id == "evt-42" for r in records))
+
+    async def test_generates_request_id(self):
+        resp = await self.client.get("/metrics")
+        self.assertTrue(resp.headers["X-Request-ID"].startswith("req-"))
+        self.assertIsNone(correlation_id.get(), "Request IDs must not leak into the caller's context")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+import os
+import sys
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.clock import ManualClock
+from src.cogs.cpt_checker import CPTChecker
+from src.fir_matcher import FIRMatcher
+from src.synthetic_feed import SyntheticFeed, generate_cpts
+
+NOW = datetime(2026, 2, 7, 19, 0, 0, tzinfo=timezone.utc)
+
+
+class TestSyntheticFeed(unittest.TestCase):
+    def test_seeded_and_deterministic(self):
+        self.assertEqual(generate_cpts(200, seed=1, now=NOW), generate_cpts(200, seed=1, now=NOW))
+        self.assertNotEqual(generate_cpts(200, seed=1, now=NOW), generate_cpts(200, seed=2, now=NOW))
+
+    def test_position_mix_and_malformed_share(self):
+        feed = SyntheticFeed(seed=3, now=NOW, fir_prefixes=["EDMM", "EDDM"], fir_share=0.5, malformed_rate=0.05)
+        cpts = list(feed.generate(5000))
+        self.assertEqual([cpt["id"] for cpt in cpts[:3]], [1, 2, 3])
+
+        matcher = FIRMatcher(["EDMM", "EDDM"])
+        in_fir = sum(matcher.matches(cpt.get("position")) for cpt in cpts) / len(cpts)
+        self.assertAlmostEqual(in_fir, 0.5, delta=0.05)
+
+        def well_formed(cpt):
+            try:
+                return bool(cpt.get("position")) and cpt["position"].isupper() and \
+                    datetime.fromisoformat(cpt["date"]).tzinfo is not None
+            except (KeyError, TypeError, ValueError):
+                return False
+        malformed = sum(not well_formed(cpt) for cpt in cpts) / len(cpts)
+        self.assertAlmostEqual(malformed, 0.05, delta=0.02)
+
+
+class TestProcessSyntheticFeed(unittest.IsolatedAsyncioTestCase):
+    async def test_process_cpts_handles_whole_feed(self):
+        with patch('discord.ext.tasks.Loop.start'):
+            checker = CPTChecker(MagicMock(), clock=ManualClock(NOW))
+        checker.store = MagicMock()
+        checker.send_notification = AsyncMock(return_value=True)
+
+        await checker.process_cpts(generate_cpts(2000, seed=0, now=NOW))
+
+        # Some CPTs fall into a notification window, and each stage is sent once
+        keys = [call.kwargs["key"] for call in checker.send_notification.await_args_list]
+        self.assertTrue(keys)
+        self.assertEqual(len(keys), len(set(keys)))
+        self.assertEqual(set(keys), set(checker.cpts_announced))
+
+
+if __name__ == '__main__':
+    unittest.main()
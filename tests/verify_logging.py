@@ -16,6 +16,10 @@ logger = logging.getLogger("DiscordBot")
 test_msg = f"Verification Test Message {time.time()}"
 logger.info(test_msg)
 
+# Records are written by a background thread; flush them before reading the file
+from src.logging_setup import shutdown_logging
+shutdown_logging()
+
 # Check if log file exists and contains message
 log_file = "data/logs/bot.log"
 if os.path.exists(log_file):